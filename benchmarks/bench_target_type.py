@@ -0,0 +1,59 @@
+""" Serializing (.dict()) 1k MGID campaigns - each computing its 'target_type' and 'thrive_id' by its name.
+Compares the memoized target-type classification (precompiled patterns) to building the patterns per row.
+
+Run (from the repo's root): python benchmarks/bench_target_type.py
+"""
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+import services.common.utils as common_utils  # noqa: E402
+from services.common.common_service import TargetType  # noqa: E402
+from services.mgid.schemas import CampaignBaseData  # noqa: E402
+
+NUMBER_CAMPAIGNS = 1000
+REPEATS = 20
+TARGETS = ['MOB', 'Desktop', 'desk mob', '']
+
+
+def get_target_type_per_row(name: str) -> str:
+    """ the classification before memoizing - formatting and compiling its patterns on each call """
+    is_desktop = bool(
+        re.search(f'(?<!\\w)({TargetType.DESK.value}|{TargetType.DESKTOP.value})(?!\\w)', name, re.IGNORECASE))
+    is_mobile = bool(
+        re.search(f'(?<!\\w)({TargetType.MOB.value}|{TargetType.MOBILE.value})(?!\\w)', name, re.IGNORECASE))
+    if not (is_desktop ^ is_mobile):
+        return TargetType.BOTH.value
+    return TargetType.DESKTOP.value if is_desktop else TargetType.MOBILE.value
+
+
+def dict_pass(campaigns):
+    return [campaign.dict() for campaign in campaigns]
+
+
+def best_time(campaigns) -> float:
+    return min(timeit.repeat(lambda: dict_pass(campaigns), number=1, repeat=REPEATS))
+
+
+def main():
+    campaigns = [CampaignBaseData(id=i, name=f'{10000 + i} Campaign {i} {TARGETS[i % len(TARGETS)]}')
+                 for i in range(NUMBER_CAMPAIGNS)]
+    memoized = common_utils.get_target_type_by_name
+    common_utils.get_target_type_by_name = get_target_type_per_row
+    try:
+        per_row_time = best_time(campaigns)
+    finally:
+        common_utils.get_target_type_by_name = memoized
+    dict_pass(campaigns)  # fills the memo
+    memoized_time = best_time(campaigns)
+
+    print(f'{NUMBER_CAMPAIGNS} campaigns .dict() pass (best of {REPEATS}):')
+    print(f'  patterns per row: {per_row_time * 1000:.2f}ms')
+    print(f'  memoized:         {memoized_time * 1000:.2f}ms ({per_row_time / memoized_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
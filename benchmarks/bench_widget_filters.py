@@ -0,0 +1,74 @@
+""" The widgets' threshold filters and bot-traffic metric on 100k synthetic widgets:
+the per-row loops over dicts vs. the columnar (ResultTable) evaluation - vectorized if numpy is installed.
+Checks both select the same widgets.
+
+Run (from the repo's root): python benchmarks/bench_widget_filters.py
+"""
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
+
+from utils import (OPERATORS_MAP, ResultTable, both,  # noqa: E402
+                   bot_traffic_percents, compare, select)
+from utils.vectorized import np  # noqa: E402
+
+NUMBER_WIDGETS = 100_000
+REPEATS = 5
+SPENT_THRESHOLD = 2.5
+CPA_THRESHOLD = 4.0
+BOT_THRESHOLD = 30
+
+
+def make_widgets():
+    random.seed(0)
+    widgets = []
+    for i in range(NUMBER_WIDGETS):
+        platform_clicks = random.randint(1, 500)
+        conversions = random.randint(0, 5)
+        spent = round(random.uniform(0, 20), 2)
+        widgets.append({'widget_id': f'w{i}',
+                        'spent': spent,
+                        'conversions': conversions,
+                        'cpa': spent / conversions if conversions else 0.0,
+                        'platform_clicks': platform_clicks,
+                        'thrive_clicks': random.randint(1, platform_clicks)})
+    return widgets
+
+
+def loops(widgets):
+    longtail = [widget['widget_id'] for widget in widgets if widget['spent'] < SPENT_THRESHOLD]
+    low_cpa = [widget['widget_id'] for widget in widgets if widget['conversions'] > 0
+               if getattr(widget['cpa'], OPERATORS_MAP['le'])(CPA_THRESHOLD)]
+    bots = [widget['widget_id'] for widget in widgets
+            if 100 - (widget['thrive_clicks'] / widget['platform_clicks'] * 100) > BOT_THRESHOLD]
+    return longtail, low_cpa, bots
+
+
+def columnar(table: ResultTable):
+    widgets_ids = table.column('widget_id')
+    longtail = select(widgets_ids, compare(table.column('spent'), 'lt', SPENT_THRESHOLD))
+    low_cpa = select(widgets_ids, both(compare(table.column('conversions'), 'gt', 0),
+                                       compare(table.column('cpa'), 'le', CPA_THRESHOLD)))
+    bots_percents = bot_traffic_percents(table.column('thrive_clicks'), table.column('platform_clicks'))
+    bots = select(widgets_ids, compare(bots_percents, 'gt', BOT_THRESHOLD))
+    return longtail, low_cpa, bots
+
+
+def main():
+    widgets = make_widgets()
+    table = ResultTable.from_rows(widgets)
+    assert [set(ids) for ids in loops(widgets)] == [set(ids) for ids in columnar(table)]
+
+    loops_time = min(timeit.repeat(lambda: loops(widgets), number=1, repeat=REPEATS))
+    columnar_time = min(timeit.repeat(lambda: columnar(table), number=1, repeat=REPEATS))
+    print(f'{NUMBER_WIDGETS} widgets - longtail, low-cpa and bot-traffic filters (best of {REPEATS}):')
+    print(f'  per-row loops: {loops_time * 1000:.1f}ms')
+    print(f'  columnar ({"numpy" if np is not None else "no numpy"}): '
+          f'{columnar_time * 1000:.1f}ms ({loops_time / columnar_time:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -1,15 +1,21 @@
+import asyncio
 import json
 import re
 from enum import Enum
 from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from config import (DEFAULT_ALL_CAMPAIGNS_ALIAS,
+from config import (ACCOUNT_COMMAND_TIMEOUT, DEFAULT_ALL_CAMPAIGNS_ALIAS,
                     DEFAULT_CPA_THRESHOLD_INTERVAL, DEFAULT_OUTPUT_FORMAT,
                     DEFAULT_TIME_INTERVAL)
 from constants import Platforms
-from errors import InvalidCommandError
+from errors import (BaseCustomException, ErrorList, InvalidCommandError,
+                    InvalidCommandFlagError)
 from logger import logger
+from pydantic import BaseModel
 from services import MGid, Thrive, ZeroPark
+from services.common.utils import campaign_name_info
+from utils import Aggregation, GroupBy, ResultTable, RowFilter
+from utils.concurrency import gather_settled, run_settled
 
 from .. import patterns as re_patterns
 
@@ -29,20 +35,108 @@ class Commands(str, Enum):
     widget_kill_bot_traffic = 'widgets-kill-bot'
 
 
-COMMANDS_PATTERNS = [
-    re_patterns.Commands.LIST_CAMPAIGNS,
-    re_patterns.Commands.CAMPAIGN_STATS,
-    re_patterns.Commands.BOT_TRAFFIC,
-    # re_patterns.Commands.LIST_SORCES,
-    re_patterns.Commands.SPENT_CAMPAIGN,
-    re_patterns.Commands.WIDGETS_STATS,
-    re_patterns.Commands.WIDGETS_TOP,
-    re_patterns.Commands.WIDGETS_HIGH_CPA,
-    re_patterns.Commands.WIDGETS_LOW_CPA,
-    re_patterns.Commands.WIDGETS_KILL_LONGTAIL,
-    re_patterns.Commands.WIDGETS_TURN_ON_ALL,
-    re_patterns.Commands.WIDGETS_KILL_BOT_TRAFFIC,
-]
+# '/<platform> <verb> ...' - the verb (2nd token) selects the command's pattern, instead of trying all of them.
+COMMANDS_PATTERNS_BY_VERB = {
+    Commands.list_campaigns.value: re_patterns.Commands.LIST_CAMPAIGNS,
+    Commands.stats_campaign.value: re_patterns.Commands.CAMPAIGN_STATS,
+    Commands.campaign_bot_traffic.value: re_patterns.Commands.BOT_TRAFFIC,
+    Commands.spent_campaign.value: re_patterns.Commands.SPENT_CAMPAIGN,
+    Commands.widgets_stats.value: re_patterns.Commands.WIDGETS_STATS,
+    Commands.widgets_top.value: re_patterns.Commands.WIDGETS_TOP,
+    Commands.widgets_high_cpa.value: re_patterns.Commands.WIDGETS_HIGH_CPA,
+    Commands.widgets_low_cpa.value: re_patterns.Commands.WIDGETS_LOW_CPA,
+    Commands.widgets_kill_longtail.value: re_patterns.Commands.WIDGETS_KILL_LONGTAIL,
+    Commands.widgets_turn_on_all.value: re_patterns.Commands.WIDGETS_TURN_ON_ALL,
+    Commands.widget_kill_bot_traffic.value: re_patterns.Commands.WIDGETS_KILL_BOT_TRAFFIC,
+    'kill-bot': re_patterns.Commands.WIDGETS_KILL_BOT_TRAFFIC,
+}
+
+COMMANDS_ALIASES = {
+    'kill-bot': Commands.widget_kill_bot_traffic,
+}
+
+# commands which pause / resume widgets - their results can't be filtered (or summarized) before the write
+WRITE_COMMANDS = (
+    Commands.widgets_kill_longtail,
+    Commands.widgets_turn_on_all,
+    Commands.widget_kill_bot_traffic,
+)
+
+PLATFORMS_ALIASES = {
+    Platforms.MG: Platforms.MGID,
+    Platforms.ZP: Platforms.ZEROPARK,
+    Platforms.TRACKER: Platforms.THRIVE,
+}
+
+
+# '/mgid* <command>' - runs the command on all the platform's accounts
+ALL_ACCOUNTS_SUFFIX = '*'
+ACCOUNT_KEY = 'account'
+# the compiled '--where' filter and '--group-by' / '--agg' stage of the command's result -
+# applied to it (in this order), not passed to the handler
+WHERE_KEY = 'where'
+GROUP_BY_KEY = 'group_by'
+POST_PROCESSING_KEYS = (WHERE_KEY, GROUP_BY_KEY)
+# results without these fields can still be grouped by them - parsed from the campaign's name
+COMPUTED_FIELDS = {
+    'target_type': ('name', lambda name: campaign_name_info(str(name)).target_type),
+    'thrive_id': ('name', lambda name: campaign_name_info(str(name)).thrive_id),
+}
+
+
+def get_platform_base_name(platform: str) -> str:
+    """ 'mg2' / 'mgid0' / 'mgid*' -> 'mgid', 'zp' -> 'zeropark' """
+    platform = re.sub(r'[\d*]+$', '', platform.lower())
+    return PLATFORMS_ALIASES.get(platform, platform)
+
+
+def _tag_account(resp: Any, account: int) -> List[Dict[str, Any]]:
+    if not isinstance(resp, (list, ResultTable)):
+        resp = [resp]
+    tagged = []
+    for row in resp:
+        if isinstance(row, BaseModel):
+            row = row.dict()
+        if not isinstance(row, dict):
+            row = {'result': row}
+        tagged.append({ACCOUNT_KEY: account, **row})
+    return tagged
+
+
+def _merge_accounts_results(results: List[Tuple[Any, Optional[BaseException]]]) -> Tuple[list, ErrorList]:
+    merged_resp, merged_errors = [], ErrorList()
+    for account, (resp, exception) in enumerate(results):
+        if exception is not None:
+            logger.error(f'[!] Account {account} Failed: {exception!r}')
+            error = exception.dict() if isinstance(exception, BaseCustomException) else {}
+            merged_errors.append({ACCOUNT_KEY: account, 'message': str(exception), **error})
+            continue
+        errors = []
+        if isinstance(resp, tuple):
+            resp, errors = resp
+        merged_resp.extend(_tag_account(resp, account))
+        merged_errors.extend(_tag_account(errors, account))
+    return merged_resp, merged_errors
+
+
+def fan_out_to_accounts(accounts_handlers: List[Callable],
+                        timeout: float = ACCOUNT_COMMAND_TIMEOUT) -> Callable[..., Tuple[list, ErrorList]]:
+    """ A command's handler, running the same command concurrently on all the accounts,
+    and merging the results - each row tagged with its account's index.
+    A failing (or timed out) account is reported in the errors, without failing the others.
+    Async handlers (of the asyncio transport) are awaited concurrently - the fanned-out handler is async too.
+    """
+    if all(asyncio.iscoroutinefunction(account_handler) for account_handler in accounts_handlers):
+        async def async_handler(**kwargs) -> Tuple[list, ErrorList]:
+            return _merge_accounts_results(await gather_settled(
+                [account_handler(**kwargs) for account_handler in accounts_handlers], timeout=timeout))
+        return async_handler
+
+    def handler(**kwargs) -> Tuple[list, ErrorList]:
+        return _merge_accounts_results(run_settled([lambda account_handler=account_handler: account_handler(**kwargs)
+                                                    for account_handler in accounts_handlers],
+                                                   timeout=timeout))
+    return handler
 
 
 class DefaultArgument:
@@ -60,12 +154,13 @@ class CommandParser:
         self.mgid_instances = mgid_instances
         self.zeropark = zeropark
         self.thrive = thrive
+        # the dispatch table is built once - every message just looks its handler up.
+        self.methods_map = self._build_methods_map()
 
-    def get_platform_handler(self, platform: Union[Platforms],
-                             command: Commands):
+    def _build_methods_map(self) -> Dict[str, Dict[Commands, Callable]]:
         def get_mgid_methods_map(mgid: MGid):
             return {
-                Commands.list_campaigns: mgid.list_campaigns,
+                Commands.list_campaigns: mgid.alist_campaigns,  # on the asyncio transport
                 Commands.stats_campaign: mgid.stats_campaign,
                 Commands.spent_campaign: mgid.spent_campaign,
                 Commands.campaign_bot_traffic: mgid.campaign_bot_traffic,
@@ -78,12 +173,17 @@ class CommandParser:
                 Commands.widget_kill_bot_traffic: mgid.widget_kill_bot_traffic,
             }
         mgid_method_map = {}
-        for i, mgid_instance in enumerate(self.mgid_instances):
-            mgid_method_map[f'{Platforms.MGID}{i}'] = mgid_method_map[f'{Platforms.MG}{i}'] = get_mgid_methods_map(
-                mgid_instance)
+        accounts_methods_maps = [get_mgid_methods_map(mgid_instance) for mgid_instance in self.mgid_instances]
+        for i, mgid_methods_map in enumerate(accounts_methods_maps):
+            mgid_method_map[f'{Platforms.MGID.value}{i}'] = mgid_method_map[f'{Platforms.MG.value}{i}'] = mgid_methods_map
+        all_accounts_methods_map = {
+            command: fan_out_to_accounts([methods_map[command] for methods_map in accounts_methods_maps])
+            for command in accounts_methods_maps[0]
+        }
+        mgid_method_map[Platforms.MGID.value + ALL_ACCOUNTS_SUFFIX] = all_accounts_methods_map
+        mgid_method_map[Platforms.MG.value + ALL_ACCOUNTS_SUFFIX] = all_accounts_methods_map
         # the root instance will be the same as the instance0
-        mgid_method_map[Platforms.MGID] = mgid_method_map[Platforms.MG] = get_mgid_methods_map(
-            self.mgid_instances[0])
+        mgid_method_map[Platforms.MGID] = mgid_method_map[Platforms.MG] = accounts_methods_maps[0]
 
         methods_map = {
             **mgid_method_map,
@@ -101,7 +201,7 @@ class CommandParser:
                 # Commands.widget_kill_bot_traffic: self.zeropark.widget_kill_bot_traffic,
             },
             Platforms.THRIVE: {
-                Commands.list_campaigns: self.thrive.list_campaigns,
+                Commands.list_campaigns: self.thrive.alist_campaigns,
                 # Commands.list_sources: self.thrive.list_sources,
                 Commands.stats_campaign: self.thrive.stats_campaigns,
             },
@@ -110,17 +210,27 @@ class CommandParser:
         # methods_map[Platforms.MG] = methods_map[Platforms.MGID]
         methods_map[Platforms.ZP] = methods_map[Platforms.ZEROPARK]
         methods_map[Platforms.TRACKER] = methods_map[Platforms.THRIVE]
-        if platform not in methods_map:
-            raise InvalidCommandError(command=platform)
-        return methods_map[platform][command]
+        # keyed by the plain strings - looked up by the (lower-cased) platform in the message.
+        return {str(getattr(platform, 'value', platform)): platform_methods
+                for platform, platform_methods in methods_map.items()}
+
+    def get_platform_handler(self, platform: Union[Platforms],
+                             command: Commands):
+        platform_methods = self.methods_map.get(platform.lower())
+        command = COMMANDS_ALIASES.get(command.lower(), command.lower())
+        if platform_methods is None or command not in platform_methods:
+            raise InvalidCommandError(command=platform if platform_methods is None else command)
+        return platform_methods[command]
 
     def parse_command(self, message: str) -> Tuple[Callable, Dict[str, Union[str, List[str]]]]:
         command_args = {}
-        for pattern in COMMANDS_PATTERNS:
-            match = pattern.match(message)
-            if match:
-                break
-        else:
+        # removed from the message - so their values aren't matched as other args / flags
+        where, message = self.pop_flag_from_command(re_patterns.Flags.WHERE, message)
+        group_by, message = self.pop_flag_from_command(re_patterns.Flags.GROUP_BY, message)
+        aggregate, message = self.pop_flag_from_command(re_patterns.Flags.AGGREGATE, message)
+        tokens = message.split(' ', 2)
+        verb = tokens[1].lower() if len(tokens) > 1 else ''
+        if (pattern := COMMANDS_PATTERNS_BY_VERB.get(verb)) is None or not (match := pattern.match(message)):
             raise InvalidCommandError(command=message)
 
         group_dict = match.groupdict()
@@ -165,6 +275,24 @@ class CommandParser:
             if (match := pattern.search(message)):
                 arg_name, value = list(match.groupdict().items())[0]
                 command_args[arg_name] = value
+        if any(flag is not None for flag in (where, group_by, aggregate)):
+            command = COMMANDS_ALIASES.get(command_args['command'].lower(), command_args['command'].lower())
+            if command in WRITE_COMMANDS:
+                raise InvalidCommandFlagError(message='--where / --group-by / --agg Not Supported by Write Commands',
+                                              flag=command)
+        if where is not None:
+            command_args[WHERE_KEY] = RowFilter(where)
+        if group_by is not None or aggregate is not None:
+            command_args[GROUP_BY_KEY] = GroupBy(fields=group_by.split(',') if group_by else None,
+                                                 aggregations=[Aggregation.parse(spec)
+                                                               for spec in (aggregate or '').split(',') if spec],
+                                                 computed_fields=COMPUTED_FIELDS)
+        if fields:  # the handler returns just the {fields} - so with the ones filtered / grouped by too
+            source_fields = [*sorted(getattr(command_args.get(WHERE_KEY), 'fields', ())),
+                             *getattr(command_args.get(GROUP_BY_KEY), 'source_fields', ())]
+            lower_fields = {field.lower() for field in fields}
+            command_args['fields'] = fields + [field for field in dict.fromkeys(source_fields)
+                                               if field not in lower_fields]
 
         command_handler = self.get_platform_handler(command_args['platform'], command_args['command'])
         return command_handler, command_args
@@ -176,6 +304,13 @@ class CommandParser:
         fields = match_fields.strip(',').split(',')
         return fields
 
+    def pop_flag_from_command(self, pattern: re.Pattern, command: str) -> Tuple[Optional[str], str]:
+        """ The flag's value (None - if not given), and the {command} without the flag """
+        if not (match := pattern.search(command)):
+            return None, command
+        value = next(value for value in match.groupdict().values() if value is not None)
+        return value, command[:match.start()] + command[match.end():]
+
     def get_output_format_from_command(self, command):
         match = re_patterns.Flags.OUTPUT_FORMAT.search(command)
         if not match:
@@ -1,14 +1,20 @@
+import asyncio
 import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from logger import logger
-from typing import Tuple, Union
+from typing import Callable, Dict, Tuple, Union
 
 from bot.patterns import ignore_errors_keyname
+from config import MAX_COMMAND_WORKERS, MAX_CONCURRENT_COMMANDS_PER_PLATFORM
 from errors import ErrorList, InternalError
-from extensions import OutputFormatTypes, mgid, mgid_instances, thrive, zeropark
+from extensions import (OutputFormatTypes, get_mgid_instances, get_thrive,
+                        get_zeropark)
+from utils.concurrency import run_coroutine
 
 from .. import patterns
-from .command import CommandParser
-from .utils import convert_resp_to_raw_string
+from .command import POST_PROCESSING_KEYS, CommandParser, get_platform_base_name
+from .utils import convert_resp_to_json_string, convert_resp_to_raw_string
 
 DEFAULT_OUTPUT_FORMAT = 'list'
 
@@ -20,13 +26,58 @@ class MessageHandler:
     }
 
     def __init__(self):
-        # self.command_parser = CommandParser(mgid, zeropark, thrive)
-        self.command_parser = CommandParser(mgid_instances, zeropark, thrive)
+        self._command_parser: CommandParser = None
+        # the platforms' handlers are blocking (network) - running them on workers, off the event-loop.
+        self.executor = ThreadPoolExecutor(max_workers=MAX_COMMAND_WORKERS,
+                                           thread_name_prefix='command-handler')
+        self._platforms_semaphores: Dict[str, asyncio.Semaphore] = {}
+
+    @property
+    def command_parser(self) -> CommandParser:
+        # built on first use (with the platforms' services) - not on import.
+        if self._command_parser is None:
+            self._command_parser = CommandParser(get_mgid_instances(), get_zeropark(), get_thrive())
+        return self._command_parser
+
+    def _get_platform_semaphore(self, platform: str) -> asyncio.Semaphore:
+        # created lazily - so it's bound to the running event-loop.
+        platform = get_platform_base_name(platform)
+        if platform not in self._platforms_semaphores:
+            self._platforms_semaphores[platform] = asyncio.Semaphore(MAX_CONCURRENT_COMMANDS_PER_PLATFORM)
+        return self._platforms_semaphores[platform]
 
     def handle_message(self, content: str, format_output: bool = True) -> Tuple[Union[list, dict, str]]:
+        command_handler, command_args = self.command_parser.parse_command(content)
+        return self._run_command(command_handler, command_args, format_output)
 
+    async def handle_message_async(self, content: str, format_output: bool = True) -> Tuple[Union[list, dict, str]]:
+        """ Same as 'handle_message', but runs the command's handler on the workers-pool,
+        limited to {MAX_CONCURRENT_COMMANDS_PER_PLATFORM} concurrent commands per platform.
+        An async handler (of the asyncio transport) is awaited on the event-loop instead. """
         command_handler, command_args = self.command_parser.parse_command(content)
-        resp = command_handler(**command_args)
+        loop = asyncio.get_running_loop()
+        async with self._get_platform_semaphore(command_args['platform']):
+            if asyncio.iscoroutinefunction(command_handler):
+                resp = await command_handler(**self._handler_args(command_args))
+                return await loop.run_in_executor(self.executor,
+                                                  partial(self._process_resp, resp, command_args, format_output))
+            return await loop.run_in_executor(self.executor,
+                                              partial(self._run_command, command_handler,
+                                                      command_args, format_output))
+
+    @staticmethod
+    def _handler_args(command_args: dict) -> dict:
+        return {name: value for name, value in command_args.items() if name not in POST_PROCESSING_KEYS}
+
+    def _run_command(self, command_handler: Callable,
+                     command_args: dict,
+                     format_output: bool = True) -> Tuple[Union[list, dict, str]]:
+        resp = command_handler(**self._handler_args(command_args))
+        if asyncio.iscoroutine(resp):  # an async handler - called off the event-loop
+            resp = run_coroutine(resp)
+        return self._process_resp(resp, command_args, format_output)
+
+    def _process_resp(self, resp, command_args: dict, format_output: bool = True) -> Tuple[Union[list, dict, str]]:
         error_resp: ErrorList = ErrorList()
         if isinstance(resp, tuple):
             if len(resp) != 2:
@@ -36,6 +87,9 @@ class MessageHandler:
                 internal_error = InternalError(
                     type='Internal Warning, Should return Errors in ErrorList type.')
                 logger.warning(str(internal_error))
+        for post_processing_key in POST_PROCESSING_KEYS:  # filtering / summarizing the rows before they're formatted
+            if (stage := command_args.get(post_processing_key)) is not None:
+                resp = stage.apply(resp)
         if ignore_errors_keyname in command_args:
             error_resp.clear()
         if format_output:
@@ -55,7 +109,8 @@ class MessageHandler:
         if not getattr(OutputFormatTypes, format_type):
             # default will be list
             format_type = 'list'
-        # if format_type != OutputFormatTypes.str:
+        if format_type == OutputFormatTypes.json:
+            return convert_resp_to_json_string(resp)
         # TODO: implement other formats to. # not requested for other formats
         new_resp = convert_resp_to_raw_string(resp)
         return new_resp
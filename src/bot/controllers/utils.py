@@ -1,6 +1,9 @@
 import json
 
 from errors.parsers import InvalidResponseFormatTypeError
+from utils import ResultTable
+
+SPECIAL_KEYS_ORDER = ['id', 'name']  # first in a row's "key: value" lines (if have a value)
 
 
 def convert_dict_to_raw_string(resp: list):
@@ -30,7 +33,29 @@ def convert_dict_to_raw_string(resp: list):
     return '\n'.join(raw_resp).strip()
 
 
+def convert_table_to_raw_string(table: ResultTable) -> str:
+    """ Same as 'convert_dict_to_raw_string' for each row - read from the columns, without building the rows """
+    special_fields = [field for field in SPECIAL_KEYS_ORDER if field in table.columns]
+    other_fields = sorted(field for field in table.columns if field not in SPECIAL_KEYS_ORDER)
+    special_columns = [(field, table.columns[field]) for field in special_fields]
+    other_columns = [(field, table.columns[field]) for field in other_fields]
+    raw_rows = []
+    for i in range(len(table)):
+        lines = [f'{field}: {column[i]}' for field, column in special_columns if column[i]]
+        lines.extend(f'{field}: {column[i]}' for field, column in other_columns)
+        raw_rows.append('\n'.join(lines).strip())
+    return '\n\n'.join(raw_rows).strip()
+
+
+def convert_resp_to_json_string(resp) -> str:
+    if isinstance(resp, ResultTable):
+        return resp.to_json()
+    return json.dumps(resp, default=lambda obj: obj.dict() if hasattr(obj, 'dict') else str(obj))
+
+
 def convert_resp_to_raw_string(resp):
+    if isinstance(resp, ResultTable):
+        return convert_table_to_raw_string(resp)
     if isinstance(resp, str):
         # all rest-api results are json type.
         try:
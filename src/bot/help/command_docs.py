@@ -4,6 +4,7 @@ from enum import Enum
 from typing import List
 
 from bot.controllers.command import Commands
+from bot.patterns import Flags
 from config import (DEFAULT_ALL_CAMPAIGNS_ALIAS,
                     DEFAULT_CPA_THRESHOLD_INTERVAL, DEFAULT_TIME_INTERVAL)
 from constants import Platforms
@@ -42,9 +43,13 @@ class FlagsDoc(str, Enum):
     # filter_limit = 'Returns Up to Given Limit of Results. Example Format: /limit:5'
     limit = 'Returns Up to Given Limit of Results. Example Format: --limit 5'
     ignore_errors = 'Ignore Error Results (if any). Example: --ignore-erros'
+    # the fields of --where / --group-by / --agg are added to --fields. not for the pause / resume commands
+    where = 'Returns Just the Results Matching the Expression. Example: --where "cpa>5 and spent>=10"'
+    group_by = 'Returns a Summary Row per Group of Results. Example: --group-by target_type'
+    agg = 'Aggregations (sum|count|min|max|avg) of Each Group. Example: --agg sum:spent,sum:conv'
 
 
-PLATFORMS = [Platforms.MGID.value, Platforms.ZEROPARK.value]
+PLATFORMS = [Platforms.MGID.value, Platforms.MGID.value + '*', Platforms.ZEROPARK.value]
 
 
 class CommandHelpDocumentation:
@@ -59,6 +64,9 @@ class CommandHelpDocumentation:
         self.parser.add_argument('--' + FlagsDoc.limit.name, nargs='?', help=FlagsDoc.limit.value)
         self.parser.add_argument('--' + FlagsDoc.ignore_errors.name,
                                  nargs='?', help=FlagsDoc.ignore_errors.value)
+        self.parser.add_argument('--' + FlagsDoc.where.name, nargs='?', help=FlagsDoc.where.value)
+        self.parser.add_argument('--' + FlagsDoc.group_by.name, nargs='?', help=FlagsDoc.group_by.value)
+        self.parser.add_argument('--' + FlagsDoc.agg.name, nargs='?', help=FlagsDoc.agg.value)
 
         self._inject_positional_options_into_usage(self.parser)
 
@@ -175,6 +183,9 @@ class CommandHelpDocumentation:
         # return fixed_args
 
     def parse_command(self, command: str):
+        # the post-processing flags (the '--where' expression may have spaces) - removed before splitting the args
+        for flag_pattern in (Flags.WHERE, Flags.GROUP_BY, Flags.AGGREGATE):
+            command = flag_pattern.sub('', command)
         args = command.split(' ')
         if (platform := args[0]) in ('/?', '/help'):
             return False, self.program_help()
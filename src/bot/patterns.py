@@ -17,51 +17,51 @@ widget_id = rf'(?: (?P<widget_id>(?:{DEFAULT_ALL_CAMPAIGNS_ALIAS}|[\w-]+)(?!\w))
 
 
 class Commands:
-    LIST_CAMPAIGNS = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>list)'
+    LIST_CAMPAIGNS = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>list)'
                                 + f'{campaign_id}?',
                                 re.IGNORECASE)
-    # LIST_SORCES = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>sources)', re.IGNORECASE)
-    CAMPAIGN_STATS = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>stats)'
+    # LIST_SORCES = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>sources)', re.IGNORECASE)
+    CAMPAIGN_STATS = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>stats)'
                                 + f'{campaign_id}?'
                                 + f'{date_interval_combined}?',
                                 re.IGNORECASE)
-    SPENT_CAMPAIGN = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>spent)'
+    SPENT_CAMPAIGN = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>spent)'
                                 + f'{campaign_id}?'
                                 + f'{date_interval_combined}?',
                                 re.IGNORECASE)
-    BOT_TRAFFIC = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>bot-traffic)'
+    BOT_TRAFFIC = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>bot-traffic)'
                              + f'{campaign_id}?'
                              + f'{date_interval_combined}?',
                              re.IGNORECASE)
-    WIDGETS_STATS = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>widgets-stats)'
+    WIDGETS_STATS = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>widgets-stats)'
                                + f'{campaign_id}'
                                + f'{widget_id}?'
                                + f'{filter_limit}?'
                                + f'{date_interval_combined}?',
                                re.IGNORECASE)
-    WIDGETS_TOP = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>widgets-top)'
+    WIDGETS_TOP = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>widgets-top)'
                              + f'{campaign_id}'
                              + f'{filter_limit}?'
                              + f'{date_interval_combined}?',
                              re.IGNORECASE)
-    WIDGETS_HIGH_CPA = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>widgets-high-cpa)'
+    WIDGETS_HIGH_CPA = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>widgets-high-cpa)'
                                   + f'{campaign_id}'
                                   + f'{threshold}'
                                   + f'{date_interval_combined}?',
                                   re.IGNORECASE)
-    WIDGETS_LOW_CPA = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>widgets-low-cpa)'
+    WIDGETS_LOW_CPA = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>widgets-low-cpa)'
                                  + f'{campaign_id}'
                                  + f'{date_interval_combined}?'
                                  + f'{threshold}?',
                                  re.IGNORECASE)
-    WIDGETS_KILL_LONGTAIL = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>widgets-kill-longtail)'
+    WIDGETS_KILL_LONGTAIL = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>widgets-kill-longtail)'
                                        + f'{campaign_id}'
                                        + f'{threshold}',
                                        re.IGNORECASE)
-    WIDGETS_TURN_ON_ALL = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>widgets-turn-on-all)'
+    WIDGETS_TURN_ON_ALL = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>widgets-turn-on-all)'
                                      + f'{campaign_id}',
                                      re.IGNORECASE)
-    WIDGETS_KILL_BOT_TRAFFIC = re.compile(r'^/(?P<platform>\w+?) (?P<cmd>widgets-kill-bot|kill-bot)'
+    WIDGETS_KILL_BOT_TRAFFIC = re.compile(r'^/(?P<platform>\w+?\*?) (?P<cmd>widgets-kill-bot|kill-bot)'
                                           + f'{campaign_id}'
                                           + f'{threshold}'
                                           + f'{date_interval_combined}',
@@ -79,6 +79,12 @@ class Flags:
     FILTER_LIMIT = re.compile(rf' {PREFIX_FLAG}limit[: =]{filter_limit}', re.IGNORECASE)
     IGNORE_ERRORS = re.compile(rf' {PREFIX_FLAG}(?P<{ignore_errors_keyname}>ie|ignore(?:[-_]errors)?)',
                                re.IGNORECASE)
+    # the expression - quoted (if has spaces), e.g. --where "cpa>5 and spent>=10"
+    WHERE = re.compile(rf' {PREFIX_FLAG}where[: =](?:"(?P<where>[^"]*)"|“(?P<where_smart_quoted>[^”]*)”'
+                       rf"|'(?P<where_single_quoted>[^']*)'|(?P<where_unquoted>\S+))", re.IGNORECASE)
+    GROUP_BY = re.compile(rf' {PREFIX_FLAG}group[-_]?by[: =](?P<group_by>\w+(?:,\w+)*)', re.IGNORECASE)
+    # <function>:<field> (e.g. sum:spent,avg:cpa) - the 'count' of each group's rows is always added
+    AGGREGATE = re.compile(rf' {PREFIX_FLAG}agg(?:regate)?[: =](?P<aggregate>\w+:\w+(?:,\w+:\w+)*)', re.IGNORECASE)
     FIELDS_OPTIONS = re.compile(rf' {PREFIX_FLAG}(?P<{GET_FIELDS_OPTIONS_KEYNAME}>{FIELDS_OPTIONS_FLAG})',
                                 re.IGNORECASE)
 
@@ -1,7 +1,10 @@
+import os
 import socket
+from pathlib import Path
 
 from utils.helpers import is_valid_uuid4
 
+REPO_DIR = Path(__file__).resolve().parent.parent
 HOSTNAME = socket.gethostname()
 RUNNING_ON_SERVER = is_valid_uuid4(HOSTNAME)
 DEFAULT_OUTPUT_FORMAT = 'list'
@@ -12,3 +15,36 @@ MAX_BODY_SIZE = 10000
 DEFAULT_ALL_CAMPAIGNS_ALIAS = 'all'
 DEBUG_COMMAND_FLAG = '--debug'
 DEFAULT_FILTER_NUMBER = 5
+MAX_COMMAND_WORKERS = int(os.getenv('MAX_COMMAND_WORKERS', 8))
+MAX_CONCURRENT_COMMANDS_PER_PLATFORM = int(os.getenv('MAX_CONCURRENT_COMMANDS_PER_PLATFORM', 3))
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 10))
+MGID_HTTP_POOL_SIZE = int(os.getenv('MGID_HTTP_POOL_SIZE', HTTP_POOL_SIZE))
+ZEROPARK_HTTP_POOL_SIZE = int(os.getenv('ZEROPARK_HTTP_POOL_SIZE', HTTP_POOL_SIZE))
+# the tracker is queried by all platforms
+THRIVE_HTTP_POOL_SIZE = int(os.getenv('THRIVE_HTTP_POOL_SIZE', 2 * HTTP_POOL_SIZE))
+MAX_IO_WORKERS = int(os.getenv('MAX_IO_WORKERS', 16))
+MAX_PARALLEL_PAGES_REQUESTS = int(os.getenv('MAX_PARALLEL_PAGES_REQUESTS', 4))
+# stats of the last days may still change (late conversions, timezones) - older days are cached
+STATS_CACHE_OPEN_DAYS = int(os.getenv('STATS_CACHE_OPEN_DAYS', 2))
+STATS_CACHE_MAX_BUCKETS = int(os.getenv('STATS_CACHE_MAX_BUCKETS', 256))
+# GET responses cache - opt-in, by setting RESPONSE_CACHE_ENABLED=1
+RESPONSE_CACHE_ENABLED = bool(int(os.getenv('RESPONSE_CACHE_ENABLED', 0)))
+RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 128))
+RESPONSE_CACHE_STATS_TTL = int(os.getenv('RESPONSE_CACHE_STATS_TTL', 60))
+RESPONSE_CACHE_LIST_TTL = int(os.getenv('RESPONSE_CACHE_LIST_TTL', 300))
+# a command on all the accounts (e.g. '/mgid* spent') - waiting up to this for each account
+ACCOUNT_COMMAND_TIMEOUT = int(os.getenv('ACCOUNT_COMMAND_TIMEOUT', 180))
+# widgets pause/resume: chunks written concurrently, under each platform's rate-limit (writes per second)
+MAX_PARALLEL_WRITE_REQUESTS = int(os.getenv('MAX_PARALLEL_WRITE_REQUESTS', 4))
+WRITE_REQUEST_RETRIES = int(os.getenv('WRITE_REQUEST_RETRIES', 2))
+MGID_WRITES_PER_SECOND = float(os.getenv('MGID_WRITES_PER_SECOND', 5))
+ZEROPARK_WRITES_PER_SECOND = float(os.getenv('ZEROPARK_WRITES_PER_SECOND', 5))
+# creating the services in the background once connected - instead of on the first command
+WARM_UP_ON_READY = bool(int(os.getenv('WARM_UP_ON_READY', 1)))
+# local store of the campaigns' indexes - loaded on boot, revalidated in the background. Empty - disabled.
+# the server's filesystem is wiped on restart - disabled there, unless set to a persistent path.
+METADATA_STORE_PATH = os.getenv('METADATA_STORE_PATH', '' if RUNNING_ON_SERVER else str(REPO_DIR / 'metadata.sqlite3'))
+# seconds after which a campaigns index is refreshed in the background (stale-while-revalidate). 0 - never.
+CAMPAIGNS_REFRESH_INTERVAL = int(os.getenv('CAMPAIGNS_REFRESH_INTERVAL', 15 * 60))
+# campaigns' names whose target-type is memoized
+TARGET_TYPE_CACHE_SIZE = int(os.getenv('TARGET_TYPE_CACHE_SIZE', 4096))
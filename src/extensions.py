@@ -1,30 +1,76 @@
 import os
 from enum import Enum
+from typing import List, Union
 
-import logger
 from bot.help import CommandHelpDocumentation
+from logger import logger
 from services import MGid, Thrive, ZeroPark
+from utils.concurrency import run_once, run_settled
 
 MAX_MGID_ACCOUNTS = int(os.getenv('MAX_MGID_ACCOUNTS', 5))
 
-thrive = Thrive(os.getenv('THRIVE_APIKEY'), os.getenv('THRIVE_INSTALLEDID'))
-mgid_instances = []
-for i in range(MAX_MGID_ACCOUNTS):
-    mgid_client_id = os.getenv(f'MGID_{i}_CLIENT_ID', '')
-    mgid_token = os.getenv(f'MGID_{i}_TOKEN', '')
-    mgid_email = os.getenv(f'MGID_{i}_USERNAME', '')
-    mgid_password = os.getenv(f'MGID_{i}_PASSWORD', '')
-    if mgid_client_id and mgid_token:
-        mgid_instances.append(MGid(mgid_client_id,
-                                   mgid_token,
-                                   thrive,
-                                   email=mgid_email,
-                                   password=mgid_password))
-mgid = mgid_instances[0]
-
-zeropark = ZeroPark(os.getenv('ZEROPARK_TOKEN'), thrive)
-
-helper_docs = CommandHelpDocumentation()
+# the services (with their sessions) and the help-parser are created lazily, on first use -
+# so importing doesn't delay connecting to discord.
+
+
+@run_once
+def get_thrive() -> Thrive:
+    return Thrive(os.getenv('THRIVE_APIKEY'), os.getenv('THRIVE_INSTALLEDID'))
+
+
+@run_once
+def get_mgid_instances() -> List[MGid]:
+    mgid_instances = []
+    for i in range(MAX_MGID_ACCOUNTS):
+        mgid_client_id = os.getenv(f'MGID_{i}_CLIENT_ID', '')
+        mgid_token = os.getenv(f'MGID_{i}_TOKEN', '')
+        mgid_email = os.getenv(f'MGID_{i}_USERNAME', '')
+        mgid_password = os.getenv(f'MGID_{i}_PASSWORD', '')
+        if mgid_client_id and mgid_token:
+            mgid_instances.append(MGid(mgid_client_id,
+                                       mgid_token,
+                                       get_thrive(),
+                                       email=mgid_email,
+                                       password=mgid_password))
+    return mgid_instances
+
+
+def get_mgid() -> MGid:
+    return get_mgid_instances()[0]
+
+
+@run_once
+def get_zeropark() -> ZeroPark:
+    return ZeroPark(os.getenv('ZEROPARK_TOKEN'), get_thrive())
+
+
+@run_once
+def get_helper_docs() -> CommandHelpDocumentation:
+    return CommandHelpDocumentation()
+
+
+def warm_up_campaigns_indexes():
+    """ Loads all the platforms' campaigns indexes (and the tracker's campaigns map) concurrently.
+    A command needing an index while it's loading waits for that load ('campaigns' is single-flight).
+    """
+    services: List[Union[Thrive, MGid, ZeroPark]] = [get_thrive(), *get_mgid_instances(), get_zeropark()]
+    results = run_settled([lambda service=service: service.campaigns for service in services])
+    for service, (_, exception) in zip(services, results):
+        if exception is not None:
+            logger.error(f'[!] Warm-up of {type(service).__name__} campaigns Failed: {exception!r}')
+
+
+def refresh_stale_campaigns_indexes():
+    """ Triggers a background refresh of the (created) services' campaigns indexes that are stale. """
+    services: List[Union[Thrive, MGid, ZeroPark]] = []
+    if get_thrive.is_created():
+        services.append(get_thrive())
+    if get_mgid_instances.is_created():
+        services.extend(get_mgid_instances())
+    if get_zeropark.is_created():
+        services.append(get_zeropark())
+    for service in services:
+        service.refresh_campaigns_if_stale()
 
 
 class OutputFormatTypes(str, Enum):
@@ -1,27 +1,35 @@
+import asyncio
 import os
+import time
 import traceback
 import uuid
 from datetime import datetime
 from json import dump, dumps
 from tempfile import NamedTemporaryFile
-from time import sleep
 from typing import Dict, List, Tuple, Union
 
 import discord
+from discord.ext import tasks
 
 from bot.controllers.message import MessageHandler, OutputFormatTypes
-from config import DEBUG_COMMAND_FLAG, RUNNING_ON_SERVER
+from config import (CAMPAIGNS_REFRESH_INTERVAL, DEBUG_COMMAND_FLAG,
+                    RUNNING_ON_SERVER, WARM_UP_ON_READY)
 from constants import DEBUG, DEV
 from errors import (BaseCustomException, ErrorList, InternalError,
                     InvalidCommandError, PydanticParseObjError)
 from errors.network import APIError, AuthError
 from errors.platforms import (CampaignNameMissingTrackerIDError,
                               InvalidCampaignIDError)
-from extensions import helper_docs
+from extensions import (get_helper_docs, refresh_stale_campaigns_indexes,
+                        warm_up_campaigns_indexes)
 from logger import logger
 from utils import (GENERAL_RESP_TYPE, convert_list_dicts_to_csv_file,
                    groupify_list_strings)
 
+# startup-time measurement - the imports' (cpu) time, then the time until connected to discord.
+IMPORTS_CPU_TIME = time.process_time()
+STARTED_AT = time.perf_counter()
+
 TOKEN = os.environ['DISCORD_TOKEN']
 GUILD = os.environ['DISCORD_GUILD']
 GUILD_DEV = os.environ['DISCORD_GUILD_DEV']
@@ -30,11 +38,35 @@ client = discord.Client()
 MAX_NUMBER_LINES = 2000
 
 
+def warm_up():
+    """ Creates the services and the help-parser, and loads the campaigns indexes - ahead of the first command. """
+    started_at = time.perf_counter()
+    try:
+        MESSAGE_HANDLER.command_parser
+        get_helper_docs()
+        warm_up_campaigns_indexes()
+    except Exception as e:
+        logger.error(f'[!] Warm-up Failed: {e!r}')
+        return
+    logger.info(f'Warm-up done in {time.perf_counter() - started_at:.2f}s')
+
+
+@tasks.loop(seconds=CAMPAIGNS_REFRESH_INTERVAL or 60)
+async def refresh_campaigns_indexes():
+    refresh_stale_campaigns_indexes()
+
+
 @client.event
 async def on_ready():
     start_msg = 'STARTED BOT LISTENING ON ' + ('DEV' if DEV else 'PROD')
     print(start_msg)
     logger.info(start_msg)
+    logger.info(f'Startup: imports took {IMPORTS_CPU_TIME:.2f}s (cpu), '
+                f'ready {time.perf_counter() - STARTED_AT:.2f}s after imports')
+    if WARM_UP_ON_READY:
+        asyncio.get_running_loop().run_in_executor(MESSAGE_HANDLER.executor, warm_up)
+    if CAMPAIGNS_REFRESH_INTERVAL and not refresh_campaigns_indexes.is_running():
+        refresh_campaigns_indexes.start()
 
     guild = discord.utils.get(client.guilds, name=GUILD)
     guild_dev = discord.utils.get(client.guilds, name=GUILD_DEV)
@@ -92,14 +124,14 @@ def format_error_resp(list_error_resp: Union[str, List[Union[str, Dict[str, str]
 async def handle_content(command: str) -> Tuple[str]:
     try:
 
-        is_valid_command, args = helper_docs.parse_command(command)
+        is_valid_command, args = get_helper_docs().parse_command(command)
         if not is_valid_command:
             help_message = args
             return help_message, ErrorList()
 
         resp: Union[dict, list, str]
         output_format: OutputFormatTypes
-        resp, error_resp, output_format = MESSAGE_HANDLER.handle_message(command, format_output=False)
+        resp, error_resp, output_format = await MESSAGE_HANDLER.handle_message_async(command, format_output=False)
         # for now - not doing anything with output_format, and asuming all responses are in str format.
     except InvalidCommandError as err:
         resp = ''
@@ -202,7 +234,7 @@ async def on_message(message):
     if result['resp']:
         await send_msg(message.channel, result['resp'], result['orig_resp'])
     if result['error_resp']:
-        sleep(0.5)
+        await asyncio.sleep(0.5)
         await send_msg(message.channel, '__*ERRORS:*__\n' + result['error_resp'], result['orig_error_resp'])
 
 
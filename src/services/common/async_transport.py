@@ -0,0 +1,102 @@
+import asyncio
+import json
+from typing import Literal, Optional
+
+import aiohttp
+from constants import DEFAULT_TIMEOUT_API_REQUEST
+
+KEEPALIVE_TIMEOUT = 60  # Seconds
+
+
+class AsyncResponse:
+    """ Minimal 'requests.Response'-like object, so the same response
+    validations work for both transports. """
+
+    def __init__(self, url: str, status_code: int, reason: str, headers: dict, content: bytes):
+        self.url = url
+        self.status_code = status_code
+        self.reason = reason
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class AsyncTransport:
+    """ asyncio transport for a CommonService, with the same surface as the sync one:
+        resp = await service.aio.get(url, params=...)
+    url_hooks and session headers of the service are applied the same way. """
+
+    def __init__(self, service: 'CommonService', pool_size: int):
+        self.service = service
+        self.pool_size = pool_size
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # aiohttp sessions are bound to the event-loop they were created in.
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._loop is not loop:
+            self._release_session()
+            connector = aiohttp.TCPConnector(limit=self.pool_size,
+                                             keepalive_timeout=KEEPALIVE_TIMEOUT)
+            self._session = aiohttp.ClientSession(connector=connector)
+            self._loop = loop
+        return self._session
+
+    def _release_session(self):
+        """ Closes the session of another event-loop - in its loop if it's still running, else right away """
+        session, loop = self._session, self._loop
+        self._session = self._loop = None
+        if session is None or session.closed:
+            return
+        if loop is not None and loop.is_running() and not loop.is_closed():
+            asyncio.run_coroutine_threadsafe(session.close(), loop)
+            return
+        connector = session.connector
+        session.detach()
+        connector.close()
+
+    async def request(self,
+                      method: Literal['get', 'post', 'put', 'patch', 'delete'],
+                      url: str,
+                      headers: dict = None,
+                      timeout: float = DEFAULT_TIMEOUT_API_REQUEST,
+                      **kwargs) -> AsyncResponse:
+        session = self._get_session()
+        async with session.request(method.upper(), url,
+                                   headers=headers,
+                                   timeout=aiohttp.ClientTimeout(total=timeout),
+                                   **kwargs) as resp:
+            content = await resp.read()
+            return AsyncResponse(url=str(resp.url),
+                                 status_code=resp.status,
+                                 reason=resp.reason,
+                                 headers=resp.headers,
+                                 content=content)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = self._loop = None
+
+    # keyword arguments only (aiohttp's 'params', 'json', 'data', 'headers', ...)
+    async def get(self, url: str, **kwargs):
+        return await self.service._areq(url, 'get', **kwargs)
+
+    async def post(self, url: str, **kwargs):
+        return await self.service._areq(url, 'post', **kwargs)
+
+    async def put(self, url: str, **kwargs):
+        return await self.service._areq(url, 'put', **kwargs)
+
+    async def patch(self, url: str, **kwargs):
+        return await self.service._areq(url, 'patch', **kwargs)
+
+    async def delete(self, url: str, **kwargs):
+        return await self.service._areq(url, 'delete', **kwargs)
@@ -0,0 +1,160 @@
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from config import CAMPAIGNS_REFRESH_INTERVAL
+from logger import logger
+
+from utils.concurrency import SingleFlight, run_in_background
+
+from .metadata_store import metadata_store
+from .utils import CampaignIDsDict, campaign_name_info
+
+
+class CampaignsDiff(NamedTuple):
+    added: List[str]
+    removed: List[str]
+    renamed: List[str]
+
+    def __bool__(self):
+        return bool(self.added or self.removed or self.renamed)
+
+    def __str__(self):
+        return f'+{len(self.added)} -{len(self.removed)} renamed {len(self.renamed)}'
+
+
+def campaign_name(campaign: Any) -> str:
+    """ the name of an index's value - a campaign object, or its name """
+    return campaign if isinstance(campaign, str) else campaign['name']
+
+
+def diff_campaigns(old: Dict[str, Any], new: Dict[str, Any]) -> CampaignsDiff:
+    return CampaignsDiff(added=[id for id in new if id not in old],
+                         removed=[id for id in old if id not in new],
+                         renamed=[id for id in new if id in old and campaign_name(new[id]) != campaign_name(old[id])])
+
+
+class CampaignRef(NamedTuple):
+    id: str
+    name: str
+    thrive_id: Optional[str]
+    target_type: str
+
+
+class CampaignNamesIndex:
+    """ The campaigns of an index by their names - each with its thrive-id and target-type, parsed once
+    (when the index is loaded). Looked up by the exact name, or by a name's prefix (case-insensitive).
+    """
+
+    def __init__(self, campaigns: Dict[str, Any]):
+        refs = []
+        for id, campaign in campaigns.items():
+            name = campaign_name(campaign)
+            refs.append(CampaignRef(str(id), name, *campaign_name_info(name)))
+        refs.sort(key=lambda ref: ref.name.lower())
+        self._refs = refs
+        self._lower_names = [ref.name.lower() for ref in refs]
+        self._by_name: Dict[str, CampaignRef] = {}
+        for ref in refs:
+            self._by_name.setdefault(ref.name, ref)
+
+    def __len__(self):
+        return len(self._refs)
+
+    def get(self, name: str) -> Optional[CampaignRef]:
+        return self._by_name.get(name)
+
+    def by_prefix(self, prefix: str) -> List[CampaignRef]:
+        prefix = prefix.lower()
+        start = end = bisect_left(self._lower_names, prefix)
+        while end < len(self._lower_names) and self._lower_names[end].startswith(prefix):
+            end += 1
+        return self._refs[start:end]
+
+
+class CampaignsIndexed:
+    """ Mixin of a service with a campaigns' index ({id: campaign}): loaded on first use -
+    from the metadata-store if saved (revalidated in the background), else from the API.
+    Once older than CAMPAIGNS_REFRESH_INTERVAL it's still served, and refreshed in the background
+    (stale-while-revalidate). A refresh swaps in a new snapshot - the current one is never changed in place -
+    and only if campaigns were added, removed or renamed. Listing the campaigns (e.g. by a command) doesn't change it.
+    Each snapshot has its campaigns by name, in 'campaigns.names' (CampaignNamesIndex).
+
+    Child-classes set 'metadata_key', and implement '_list_campaigns_index'.
+    """
+    metadata_key: str
+    _in_flight: SingleFlight
+    _campaigns: Optional[CampaignIDsDict] = None
+    _campaigns_updated_at: Optional[float] = None  # unix-time
+    _campaigns_refresh: Optional[Future] = None
+
+    def get_campaign(self, campaign_id_or_name: str) -> Any:
+        """ The index's campaign by its id, or by its exact name (raises InvalidCampaignIDError if neither) """
+        campaigns = self.campaigns
+        if str(campaign_id_or_name) not in campaigns and (ref := campaigns.names.get(campaign_id_or_name)):
+            return campaigns[ref.id]
+        return campaigns[campaign_id_or_name]
+
+    def _list_campaigns_index(self) -> Dict[str, Any]:
+        # implement in child-classes: {id: campaign (with 'name') or its name}
+        raise NotImplementedError
+
+    def _make_campaigns_index(self, campaigns: Dict[str, Any]) -> CampaignIDsDict:
+        index = CampaignIDsDict(campaigns)
+        index.names = CampaignNamesIndex(index)
+        return index
+
+    @property
+    def campaigns(self) -> CampaignIDsDict:
+        campaigns = self._campaigns
+        if campaigns is None:  # concurrent callers wait for a single load (an empty index is loaded too)
+            self._in_flight.do('campaigns', self._load_campaigns)
+            return self._campaigns
+        self.refresh_campaigns_if_stale()
+        return campaigns
+
+    @property
+    def campaigns_age(self) -> Optional[float]:
+        """ seconds since the campaigns' index was listed (None - not loaded yet) """
+        if self._campaigns_updated_at is None:
+            return None
+        return time.time() - self._campaigns_updated_at
+
+    def _load_campaigns(self):
+        if self._campaigns is not None:
+            return
+        stored = metadata_store.load(f'{self.metadata_key}:campaigns')
+        if stored is not None:
+            logger.info(f'{self.metadata_key}: loaded {len(stored.data)} campaigns from the metadata-store '
+                        f'(saved {stored.age:.0f}s ago)')
+            self._campaigns = self._make_campaigns_index(stored.data)
+            self._campaigns_updated_at = stored.updated_at
+            self._campaigns_refresh = run_in_background(self._refresh_campaigns)
+            return
+        self.reload_campaigns()
+
+    def reload_campaigns(self) -> CampaignsDiff:
+        """ Lists the campaigns' index from the API, swaps it in (if changed) and saves it to the metadata-store. """
+        current = self._campaigns
+        # the APIs' ids may be ints - the index's keys are strings
+        campaigns = {str(id): campaign for id, campaign in self._list_campaigns_index().items()}
+        diff = diff_campaigns(current or {}, campaigns)
+        if diff or current is None:
+            self._campaigns = self._make_campaigns_index(campaigns)
+            if current is not None:
+                logger.info(f'{self.metadata_key}: campaigns index refreshed: {diff}')
+        self._campaigns_updated_at = time.time()
+        metadata_store.save(f'{self.metadata_key}:campaigns', self._campaigns)
+        return diff
+
+    def _refresh_campaigns(self):
+        # a single refresh at a time - by the schedule or by a stale access
+        return self._in_flight.do('campaigns-refresh', self.reload_campaigns)
+
+    def refresh_campaigns_if_stale(self, max_age: float = CAMPAIGNS_REFRESH_INTERVAL):
+        """ Refreshes the campaigns' index in the background, if older than {max_age} seconds (0 - never) """
+        if not max_age or self._campaigns is None or (self.campaigns_age or 0) < max_age:
+            return
+        if self._campaigns_refresh is None or self._campaigns_refresh.done():
+            self._campaigns_refresh = run_in_background(self._refresh_campaigns)
@@ -1,13 +1,21 @@
 import json
 import re
 from enum import Enum
-from typing import Callable, List, Literal, Optional, Union
+from functools import lru_cache
+from typing import Callable, Dict, List, Literal, Optional, Union
 
 import requests
+from config import (HTTP_POOL_SIZE, RESPONSE_CACHE_ENABLED,
+                    TARGET_TYPE_CACHE_SIZE)
 from constants import DEFAULT_TIMEOUT_API_REQUEST
 from errors import APIError
 from errors.network import AuthError
 from logger import logger
+from requests.adapters import HTTPAdapter
+from utils.concurrency import SingleFlight
+
+from .async_transport import AsyncResponse, AsyncTransport
+from .response_cache import ResponseCache, copy_response
 
 
 class TargetType(str, Enum):
@@ -18,10 +26,15 @@ class TargetType(str, Enum):
     BOTH = 'BOTH'
 
 
+DESKTOP_NAME_RE = re.compile(f'(?<!\\w)({TargetType.DESK.value}|{TargetType.DESKTOP.value})(?!\\w)', re.IGNORECASE)
+MOBILE_NAME_RE = re.compile(f'(?<!\\w)({TargetType.MOB.value}|{TargetType.MOBILE.value})(?!\\w)', re.IGNORECASE)
+
+
+# called for each row serialized (a campaign's 'target_type') - memoized by the campaign's name.
+@lru_cache(maxsize=TARGET_TYPE_CACHE_SIZE)
 def get_target_type_by_name(name: str) -> TargetType:
-    is_desktop = bool(
-        re.search(f'(?<!\\w)({TargetType.DESK}|{TargetType.DESKTOP})(?!\\w)', name, re.IGNORECASE))
-    is_mobile = bool(re.search(f'(?<!\\w)({TargetType.MOB}|{TargetType.MOBILE})(?!\\w)', name, re.IGNORECASE))
+    is_desktop = bool(DESKTOP_NAME_RE.search(name))
+    is_mobile = bool(MOBILE_NAME_RE.search(name))
     if not (is_desktop ^ is_mobile):  # either both true or both false
         return TargetType.BOTH.value
     elif is_desktop:
@@ -30,6 +43,10 @@ def get_target_type_by_name(name: str) -> TargetType:
         return TargetType.MOBILE.value
 
 
+# cheap check on the raw body - if matched, the body is decoded to check for errors with 'error_in_keys'.
+ERROR_KEY_RAW_PATTERN = re.compile(rb'"errors?"', re.IGNORECASE)
+
+
 def error_in_keys(d: dict) -> Optional[str]:
     if not isinstance(d, dict):
         return None
@@ -42,16 +59,36 @@ def error_in_keys(d: dict) -> Optional[str]:
 
 
 class CommonService:
-    def __init__(self, base_url: str, url_hooks: Optional[List[Callable[[str], str]]] = None):
+    def __init__(self, base_url: str,
+                 url_hooks: Optional[List[Callable[[str], str]]] = None,
+                 pool_size: int = HTTP_POOL_SIZE,
+                 cache_ttls: Optional[Dict[str, int]] = None):
+        """ cache_ttls -- {url template: seconds} of GET responses to cache (if RESPONSE_CACHE_ENABLED). """
         self.base_url = base_url
+        self.pool_size = pool_size
         self.session = self.__init_session()
         self.url_hooks = url_hooks if url_hooks else []
+        self._aio: Optional[AsyncTransport] = None
+        self.response_cache: Optional[ResponseCache] = None
+        self._in_flight = SingleFlight()
+        if RESPONSE_CACHE_ENABLED and cache_ttls:
+            self.response_cache = ResponseCache(cache_ttls)
 
     def __init_session(self):
         session = requests.Session()
         session.headers.update({'Accept': 'application/json'})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
         return session
 
+    @property
+    def aio(self) -> AsyncTransport:
+        """ asyncio transport, with the same 'get/post/...' methods: 'await service.aio.get(url)' """
+        if self._aio is None:
+            self._aio = AsyncTransport(self, pool_size=self.pool_size)
+        return self._aio
+
     def _validate_resp(self, resp: requests.models.Response):
         if not resp.is_json:
             logger.error('[!] unexpected resp: is not json')
@@ -81,15 +118,79 @@ class CommonService:
              *args: list,
              **kwargs: dict):
         kwargs.setdefault('timeout', DEFAULT_TIMEOUT_API_REQUEST)
+        decode_json = kwargs.pop('decode_json', True)
+        url = self._prepare_url(url, method)
+        if method != 'get' or kwargs.get('stream'):
+            if method != 'get' and self.response_cache is not None:
+                self.response_cache.invalidate_by_write(url)
+            return self._send(url, method, decode_json, *args, **kwargs)
+
+        request_key = self._request_key(url, decode_json, *args, **kwargs)
+        cache_ttl = self.response_cache.ttl_for(url) if self.response_cache is not None else None
+        if cache_ttl and (cached_resp := self.response_cache.get(request_key)) is not None:
+            logger.debug(f'[CACHE] hit: {url[:200]}')
+            return cached_resp
+
+        def send():
+            resp = self._send(url, method, decode_json, *args, **kwargs)
+            if cache_ttl:
+                self.response_cache.set(request_key, url, resp, cache_ttl)
+            return resp
+        # identical GETs already in flight (e.g. by another command) are waited for, instead of sent again
+        return self._in_flight.do(request_key, send, share=copy_response)
+
+    def _send(self, url: str, method: str, decode_json: bool, *args, **kwargs):
+        resp = getattr(self.session, method)(self.base_url + url, *args, **kwargs)
+        self._prepare_resp(resp, decode_json=decode_json, stream=kwargs.get('stream', False))
+        return resp
+
+    def _request_key(self, url: str, decode_json: bool, *args, **kwargs) -> str:
+        """ The request, normalized: the url after the 'url_hooks', with the session's (and request's) headers. """
+        headers = {**self.session.headers, **(kwargs.get('headers') or {})}
+        return json.dumps([url, decode_json, sorted(headers.items()), args, kwargs.get('params')],
+                          sort_keys=True, default=str)
+
+    async def _areq(self,
+                    url: str,
+                    method: Literal['get', 'post', 'put', 'patch', 'delete'],
+                    **kwargs: dict):
+        decode_json = kwargs.pop('decode_json', True)
+        url = self._prepare_url(url, method)
+        if method != 'get' and self.response_cache is not None:
+            self.response_cache.invalidate_by_write(url)
+        # the request's headers over the session's (e.g. the api-keys)
+        headers = {**self.session.headers, **(kwargs.pop('headers', None) or {})}
+        resp = await self.aio.request(method, self.base_url + url, headers=headers, **kwargs)
+        self._prepare_resp(resp, decode_json=decode_json)
+        return resp
+
+    def _prepare_url(self, url: str, method: str) -> str:
         for url_hook in self.url_hooks:
             url = url_hook(url)
         logger.info(f"[REQ] [{method.upper()}] "
                     f"{self.base_url + url[:200] + '...' if len(url) > 200 else ''} ")
-        resp = getattr(self.session, method)(self.base_url + url, *args, **kwargs)
-        resp.is_json = 'application/json' in resp.headers['Content-Type']
-        resp.json_content = resp.json() if resp.is_json else {}
+        return url
+
+    def _prepare_resp(self, resp: Union[requests.models.Response, AsyncResponse],
+                      decode_json: bool = True,
+                      stream: bool = False):
+        """ Decodes the response's body ONCE, into 'resp.json_content' - callers use it instead of 'resp.json()'.
+        decode_json -- if False, the body is left for the caller to decode from the raw 'resp.content'
+                       ('resp.json_content' is then None), unless it's needed for the errors' validation.
+        stream -- (with decode_json=False) the body is not read at all (if the response is ok),
+                  it's left for the caller to stream from 'resp.raw' - and to check it for errors.
+        """
+        resp.is_json = 'application/json' in resp.headers.get('Content-Type', '')
+        if not resp.is_json:
+            resp.json_content = {}
+        elif resp.ok and stream and not decode_json:
+            resp.json_content = None
+            return
+        elif decode_json or not resp.ok or ERROR_KEY_RAW_PATTERN.search(resp.content):
+            resp.json_content = resp.json()
+        else:
+            resp.json_content = None
         self._validate_resp(resp)
-        return resp
 
     def get(self, url: str, *args, **kwargs):
         return self._req(url, 'get', *args, **kwargs)
@@ -0,0 +1,84 @@
+from collections.abc import Mapping
+from typing import (Any, Callable, Dict, Hashable, Iterable, Iterator, Literal,
+                    Union)
+
+KeyType = Union[str, Callable[[Any], Hashable]]
+
+_MISSING = object()
+
+
+def _key_getter(key: KeyType) -> Callable[[Any], Hashable]:
+    if callable(key):
+        return key
+    return lambda obj: obj[key]
+
+
+class HashIndex(Mapping):
+    """ Read-only hash-index over a list of objects (the 'build' side of a join).
+    Built once, then the other side is probed through it in O(1) per object.
+
+    keep -- which object to index when several objects have the same key.
+    """
+
+    def __init__(self,
+                 objects: Union[Iterable[Any], Mapping],
+                 key: KeyType = 'id',
+                 keep: Literal['first', 'last'] = 'first'):
+        if isinstance(objects, Mapping):
+            self._index: Dict[Hashable, Any] = dict(objects)
+            return
+        get_key = _key_getter(key)
+        index = {}
+        for obj in objects:
+            if not obj:
+                continue
+            obj_key = get_key(obj)
+            if keep == 'first' and obj_key in index:
+                continue
+            index[obj_key] = obj
+        self._index = index
+
+    def __getitem__(self, key):
+        return self._index[key]
+
+    def __iter__(self):
+        return iter(self._index)
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+
+def hash_join(probe: Union[Iterable[Any], Mapping],
+              index: HashIndex,
+              probe_key: KeyType = 'id',
+              merge: Callable[[Any, Any], Any] = lambda probe_obj, build_obj: {**build_obj, **probe_obj},
+              how: Literal['inner', 'left', 'outer'] = 'inner',
+              ) -> Iterator[Any]:
+    """ Streams the {probe} objects through the {index}, yielding merge(probe_obj, build_obj) per match.
+    If {probe} is a mapping - its keys are used as the objects' keys.
+    how -- 'inner': just the matched objects.
+           'left': also the unmatched probe objects (as is).
+           'outer': also the unmatched probe objects, and then the unmatched indexed objects.
+    """
+    if isinstance(probe, Mapping):
+        probe_items = probe.items()
+    else:
+        get_key = _key_getter(probe_key)
+        probe_items = ((get_key(probe_obj), probe_obj) for probe_obj in probe)
+    matched_keys = set()
+    for obj_key, probe_obj in probe_items:
+        build_obj = index.get(obj_key, _MISSING)
+        if build_obj is _MISSING:
+            if how != 'inner':
+                yield probe_obj
+            continue
+        if how == 'outer':
+            matched_keys.add(obj_key)
+        yield merge(probe_obj, build_obj)
+    if how == 'outer':
+        for obj_key, build_obj in index.items():
+            if obj_key not in matched_keys:
+                yield build_obj
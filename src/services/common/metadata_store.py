@@ -0,0 +1,78 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Mapping, NamedTuple, Optional
+
+from config import METADATA_STORE_PATH
+from logger import logger
+from pydantic import BaseModel
+
+
+class StoredIndex(NamedTuple):
+    data: dict
+    updated_at: float  # unix-time
+
+    @property
+    def age(self) -> float:
+        """ seconds since saved """
+        return time.time() - self.updated_at
+
+
+def _to_json(obj: Any):
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    return str(obj)
+
+
+class MetadataStore:
+    """ Local (SQLite) store of metadata indexes - e.g. the campaigns' ids-names maps - with their update time,
+    so they survive restarts instead of being re-listed from the APIs.
+    It's a cache: failures are logged (and the index is fetched from the API), never raised.
+
+    path -- of the database file (created if missing). Empty - the store is disabled.
+    """
+
+    def __init__(self, path: str = METADATA_STORE_PATH):
+        self.path = path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn.execute('CREATE TABLE IF NOT EXISTS indexes '
+                               '(key TEXT PRIMARY KEY, data TEXT NOT NULL, updated_at REAL NOT NULL)')
+            self._conn.commit()
+        return self._conn
+
+    def load(self, key: str) -> Optional[StoredIndex]:
+        if not self.path or (self._conn is None and not os.path.exists(self.path)):
+            return None
+        try:
+            with self._lock:
+                row = self._connection().execute('SELECT data, updated_at FROM indexes WHERE key = ?',
+                                                 (key,)).fetchone()
+        except sqlite3.Error as e:
+            logger.error(f'[!] Metadata-Store: failed loading {key}: {e!r}')
+            return None
+        if row is None:
+            return None
+        data, updated_at = row
+        return StoredIndex(json.loads(data), updated_at)
+
+    def save(self, key: str, data: Mapping):
+        if not self.path:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                conn.execute('INSERT OR REPLACE INTO indexes (key, data, updated_at) VALUES (?, ?, ?)',
+                             (key, json.dumps(dict(data), default=_to_json), time.time()))
+                conn.commit()
+        except (sqlite3.Error, TypeError, ValueError) as e:
+            logger.error(f'[!] Metadata-Store: failed saving {key}: {e!r}')
+
+
+metadata_store = MetadataStore()
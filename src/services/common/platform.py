@@ -1,45 +1,82 @@
-from typing import Any, Dict, List, Literal, Optional, Tuple, Union
+from collections.abc import Mapping
+from typing import (Any, Callable, Dict, List, Literal, Optional, Tuple,
+                    Union)
 
-from config import RUNNING_ON_SERVER
+import requests
+from config import (MAX_PARALLEL_WRITE_REQUESTS, MAX_URL_PARAMS_SIZE,
+                    RUNNING_ON_SERVER, WRITE_REQUEST_RETRIES)
 from constants import DEBUG
-from errors import CampaignNameMissingTrackerIDError, ErrorList
+from errors import APIError, CampaignNameMissingTrackerIDError, ErrorList
+from logger import logger
 from pydantic import BaseModel
 
-from utils import merge_objs
+from utils import chunks, merge_objs
+from utils.concurrency import TokenBucket, parallel_map
 
 from ..thrive import Thrive
 from .common_service import CommonService
+from .campaigns_index import CampaignsIndexed
+from .join import HashIndex, hash_join
+from .stats_cache import DailyStatsCache
 from .utils import CampaignIDsDict, get_thrive_id_from_camp
 
 
-class PlatformService(CommonService):
+class PlatformService(CampaignsIndexed, CommonService):
     def __init__(self, thrive: Thrive,
                  platform: str = '',
                  email: str = '',
                  password: str = '',
+                 writes_per_second: float = 5,
+                 metadata_key: str = '',
                  *args, **kargs):
         super().__init__(*args, **kargs)
         self.thrive = thrive
         self.thrive.platforms.append(self)
-        self._campaigns: Dict[str, Any] = None
         self.platform = platform
         self.email = email
         self.password = password
+        self.metadata_key = metadata_key or platform.lower()
+        self.stats_cache = DailyStatsCache()
+        self.writes_rate_limiter = TokenBucket(rate=writes_per_second)
 
-    @property
-    def campaigns(self):
-        # implement in child-classes
-        return self._campaigns
+    def _make_campaigns_index(self, campaigns: Dict[str, Any]) -> CampaignIDsDict:
+        index = super()._make_campaigns_index(campaigns)
+        index.platform = self.platform
+        return index
 
-    @campaigns.setter
+    @CampaignsIndexed.campaigns.setter
     def campaigns(self, d: dict):
-        self._campaigns = CampaignIDsDict(d, platform=self.platform)
+        self._campaigns = self._make_campaigns_index(d)
 
-    def _update_campaigns(self, campaigns: List[BaseModel]):
-        if self._campaigns is None:
-            self._campaigns = CampaignIDsDict(platform=self.platform)
-        self._campaigns.update({campaign['id']: campaign for campaign in campaigns})
-        return self._campaigns
+    def _write_in_chunks(self,
+                         write_chunk: Callable[[List[str]], Any],
+                         items: List[str],
+                         chunk_size: int = MAX_URL_PARAMS_SIZE) -> Tuple[List[str], ErrorList]:
+        """ Writes {items} (e.g. widgets to pause) in chunks of {chunk_size}, by {write_chunk}:
+        up to MAX_PARALLEL_WRITE_REQUESTS chunks concurrently, under the platform's writes rate-limit.
+        A failing chunk is retried (up to WRITE_REQUEST_RETRIES times), then reported in the errors -
+        without aborting the other chunks.
+        Return: (the items of the succeeded chunks, errors)
+        """
+        def write_chunk_with_retries(chunk: List[str]) -> Tuple[List[str], Optional[dict]]:
+            for attempt in range(1, WRITE_REQUEST_RETRIES + 2):
+                self.writes_rate_limiter.acquire()
+                try:
+                    write_chunk(chunk)
+                    return chunk, None
+                except (APIError, requests.RequestException) as e:
+                    logger.warning(f'[!] {self.platform}: writing chunk of {len(chunk)} failed '
+                                   f'(attempt {attempt}): {e!r}')
+                    error = e.dict() if isinstance(e, APIError) else {'message': str(e)}
+            return [], {**error, 'attempts': attempt, 'chunk_size': len(chunk)}
+
+        written_items, errors = [], ErrorList()
+        for chunk_items, error in parallel_map(write_chunk_with_retries, list(chunks(items, chunk_size)),
+                                               max_workers=MAX_PARALLEL_WRITE_REQUESTS):
+            written_items.extend(chunk_items)
+            if error is not None:
+                errors.append(error)
+        return written_items, errors
 
     def get_thrive_id(self, campaign: Union[BaseModel, Dict[Literal['id', 'name'], Union[str, int]]],
                       raise_=not RUNNING_ON_SERVER) -> Optional[str]:
@@ -62,21 +99,21 @@ class PlatformService(CommonService):
         error_stats = ErrorList()
         if len(thrive_results) == 1 and not thrive_results[0]:
             return stats, error_stats
+        # indexing the tracker's side once (by its id), then streaming the platform's stats through it.
+        thrive_results_index = HashIndex(thrive_results, key=lambda thrive_result: str(thrive_result['id']))
         for stat in stats:
             try:
                 stat_thrive_id = self.get_thrive_id(stat, raise_=raise_)
             except CampaignNameMissingTrackerIDError as e:
                 error_stats.append(e.dict())
                 continue
-            for thrive_result in thrive_results:
-                if not thrive_result:
-                    continue
-                if stat_thrive_id == str(thrive_result['id']):
-                    if isinstance(stat, BaseModel):
-                        stat = stat.dict()
-                    merged_dict = {**thrive_result, **stat}
-                    merged.append(MergedStatsModel.parse_obj(merged_dict))
-                    break
+            thrive_result = thrive_results_index.get(stat_thrive_id)
+            if thrive_result is None:
+                continue
+            if isinstance(stat, BaseModel):
+                stat = stat.dict()
+            merged_dict = {**thrive_result, **stat}
+            merged.append(MergedStatsModel.parse_obj(merged_dict))
         return merged, error_stats
 
     def _merge_and_update_list_objects(self,
@@ -86,28 +123,12 @@ class PlatformService(CommonService):
                                        key='id',
                                        just_common=False,
                                        ) -> List[Dict]:
-        if isinstance(list_objects_1, list):
-            # 'key' in obj-dict will be the keys in the new dict (to allow merging object-dict)
-            dict_1 = {obj[key]: obj for obj in list_objects_1}
-            dict_2 = {obj[key]: obj for obj in list_objects_2}
-        elif isinstance(list_objects_1, dict):
-            dict_1 = list_objects_1
-            dict_2 = list_objects_2
-        else:
+        if not isinstance(list_objects_1, (list, Mapping)):
             raise ValueError("Must Pass Type Dict | List[Dict]. Passed " + str(type(list_objects_1)))
-
-        set_d1_keys = set(dict_1)
-        set_d2_keys = set(dict_2)
-        if set_d1_keys == set_d2_keys:
-            return [merge_objs(dict_1[key], dict_2[key]) for key in set_d1_keys]
-
-        unique_keys_1 = set_d1_keys - set_d2_keys
-        unique_keys_2 = set_d2_keys - set_d1_keys
-        common_keys = set_d2_keys & set_d1_keys
-        merged_list = [merge_objs(dict_1[key], dict_2[key]) for key in common_keys]
-        if just_common:
-            return merged_list
-        # Adds the objects which have UNIQUE 'key' from each list of objects.
-        merged_list.extend(dict_1[key] for key in unique_keys_1)
-        merged_list.extend(dict_2[key] for key in unique_keys_2)
-        return merged_list
+        # 'key' in obj-dict will be the keys in the index (to allow merging object-dict)
+        index_1 = HashIndex(list_objects_1, key=key, keep='last')
+        objects_2 = HashIndex(list_objects_2, key=key, keep='last')
+        # Adds the objects which have UNIQUE 'key' from each list of objects - unless {just_common}.
+        return list(hash_join(objects_2, index_1,
+                              merge=lambda obj_2, obj_1: merge_objs(obj_1, obj_2),
+                              how='inner' if just_common else 'outer'))
@@ -0,0 +1,97 @@
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Pattern, Tuple
+
+from config import RESPONSE_CACHE_MAX_ENTRIES
+from logger import logger
+
+# the campaign a write request changes: '/campaigns/123', '/campaign/123/targets/pause'
+WRITE_CAMPAIGN_ID_RE = re.compile(r'/campaigns?/(?P<campaign_id>[^/?]+)')
+URL_TEMPLATE_PARAM_RE = re.compile(r'\\{+[^/]*?\\}+')
+CAMPAIGN_ID_TEMPLATE_PARAM = '{campaign_id}'
+
+
+def url_template_pattern(url_template: str) -> Pattern:
+    """ '/clients/{client_id}/campaigns' -> matches the path '/clients/123/campaigns' """
+    return re.compile(URL_TEMPLATE_PARAM_RE.sub('[^/]+', re.escape(url_template)))
+
+
+def copy_response(resp: Any) -> Any:
+    """ Copy of a response, with its own 'json_content' """
+    resp_copy = copy.copy(resp)
+    resp_copy.is_json = resp.is_json
+    resp_copy.json_content = copy.deepcopy(resp.json_content)
+    return resp_copy
+
+
+class ResponseCache:
+    """ Size-bounded LRU cache of GET responses, each expiring after its endpoint's TTL.
+
+    ttls -- {url template: seconds}, e.g. {urls.CAMPAIGNS.LIST: 300}. Endpoints not listed are not cached.
+            Templates without a '{campaign_id}' are of lists / aggregates (of all the campaigns).
+    """
+
+    def __init__(self, ttls: Dict[str, int], max_entries: int = RESPONSE_CACHE_MAX_ENTRIES):
+        self.ttls = [(url_template_pattern(template), ttl) for template, ttl in ttls.items()]
+        self.campaign_patterns = [url_template_pattern(template) for template in ttls
+                                  if CAMPAIGN_ID_TEMPLATE_PARAM in template]
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[float, str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def ttl_for(self, url: str) -> Optional[int]:
+        path = url.split('?', 1)[0]
+        for pattern, ttl in self.ttls:
+            if pattern.fullmatch(path):
+                return ttl
+        return None
+
+    def _is_of_campaign(self, url: str) -> bool:
+        path = url.split('?', 1)[0]
+        return any(pattern.fullmatch(path) for pattern in self.campaign_patterns)
+
+    def get(self, key: Hashable) -> Any:
+        """ A copy of the cached response (callers may change its 'json_content'), or None. """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, _, resp = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy_response(resp)
+
+    def set(self, key: Hashable, url: str, resp: Any, ttl: int):
+        resp = copy_response(resp)  # the caller may change the original's 'json_content'
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, url, resp)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def invalidate_by_write(self, url: str):
+        """ Drops the entries of the campaign changed by a write request to {url},
+        and the lists / aggregates (which include it). If there's no campaign in the url - drops all entries.
+        """
+        match = WRITE_CAMPAIGN_ID_RE.search(url)
+        if match is None:
+            self.clear()
+            return
+        campaign_id = match.group('campaign_id')
+        campaign_re = re.compile(f'[/=]{re.escape(campaign_id)}(?=[/?&]|$)')
+        with self._lock:
+            invalidated = [key for key, (_, entry_url, _) in self._entries.items()
+                           if campaign_re.search(entry_url) or not self._is_of_campaign(entry_url)]
+            for key in invalidated:
+                del self._entries[key]
+        if invalidated:
+            logger.debug(f'[CACHE] invalidated {len(invalidated)} responses of (or including) campaign {campaign_id}')
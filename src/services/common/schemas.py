@@ -1,8 +1,49 @@
 import re
-from typing import Any, List, Type
+from typing import Any, Dict, List, Optional, Tuple, Type
 
 from errors import PydanticParseObjError
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+from pydantic.error_wrappers import ErrorWrapper
+from pydantic.errors import MissingError
+from pydantic.fields import SHAPE_SINGLETON, ModelField
+from pydantic.utils import lenient_issubclass
+
+SCALAR_TYPES = (int, float, str, bool)
+
+
+class Projection:
+    """ Builds just {fields} of a model from a raw (decoded) object - validating only them, without the model.
+    The result is keyed by the fields in lowercase - as 'filter_result_by_fields' keys them.
+    """
+
+    def __init__(self, model: Type[BaseModel], fields: List[Tuple[str, ModelField]]):
+        self.model = model
+        self.fields = fields
+
+    @property
+    def raw_keys(self) -> List[str]:
+        """ the keys of the raw objects needed """
+        return [field.alias for _, field in self.fields]
+
+    def __call__(self, raw: Dict[str, Any]) -> Dict[str, Any]:
+        projected, errors = {}, []
+        for name, field in self.fields:
+            if field.alias in raw:
+                value = raw[field.alias]
+            elif field.required:
+                errors.append(ErrorWrapper(MissingError(), loc=field.alias))
+                continue
+            else:
+                value = field.get_default()
+                if not field.validate_always:
+                    projected[name] = value
+                    continue
+            projected[name], error = field.validate(value, projected, loc=field.alias, cls=self.model)
+            if error:
+                errors.append(error)
+        if errors:
+            raise PydanticParseObjError(data=str(ValidationError(errors, self.model)))
+        return projected
 
 
 class BaseModelSubscriptable(BaseModel):
@@ -25,6 +66,21 @@ class BaseModelSubscriptable(BaseModel):
         except Exception as e:
             raise PydanticParseObjError(data=str(e))
 
+    @classmethod
+    def projection(cls, fields: List[str]) -> Optional[Projection]:
+        """ Projection of the model's {fields} (case-insensitive) from raw objects.
+        None - if one of them isn't a plain (scalar) field of the model, so the whole model is needed.
+        """
+        model_fields = {name.lower(): field for name, field in cls.__fields__.items()}
+        projected_fields = []
+        for name in dict.fromkeys(field.lower() for field in fields):
+            field = model_fields.get(name)
+            if field is None or field.shape != SHAPE_SINGLETON or field.sub_fields \
+                    or not lenient_issubclass(field.type_, SCALAR_TYPES):
+                return None
+            projected_fields.append((name, field))
+        return Projection(cls, projected_fields)
+
     @classmethod
     def fields_list(cls) -> List[str]:
         from services.common.utils import extract_fields_from_class
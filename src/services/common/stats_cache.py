@@ -0,0 +1,142 @@
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from functools import reduce
+from typing import (Any, Callable, Dict, Hashable, Iterable, List, Optional,
+                    Tuple)
+
+from config import (MAX_PARALLEL_PAGES_REQUESTS, STATS_CACHE_MAX_BUCKETS,
+                    STATS_CACHE_OPEN_DAYS)
+from logger import logger
+from utils.concurrency import parallel_map
+
+DateRange = Tuple[date, date]
+
+
+def _month_end(day: date) -> date:
+    next_month = day.replace(day=28) + timedelta(days=4)
+    return next_month - timedelta(days=next_month.day)
+
+
+def split_to_month_buckets(from_date: date, to_date: date) -> List[DateRange]:
+    """ Splits [from_date, to_date] on calendar months' edges:
+        (2021-01-20, 2021-03-05) -> [(01-20, 01-31), (02-01, 02-28), (03-01, 03-05)]
+    Full months are the same buckets for any interval containing them - so they're reused across days.
+    """
+    buckets = []
+    start = from_date
+    while start <= to_date:
+        end = min(_month_end(start), to_date)
+        buckets.append((start, end))
+        start = end + timedelta(days=1)
+    return buckets
+
+
+def _to_float(value: Any) -> float:
+    return float(value) if value is not None else 0.0
+
+
+def safe_div(numerator: float, denominator: float) -> float:
+    if not denominator:
+        return 0
+    return numerator / denominator
+
+
+def combine_stats(older: Dict[str, Any],
+                  newer: Dict[str, Any],
+                  additive: Iterable[str],
+                  derived: Dict[str, Callable[[Dict[str, Any]], float]] = None,
+                  ) -> Dict[str, Any]:
+    """ Combines the stats of the same entity over 2 consecutive date-ranges.
+    {additive} fields are summed, {derived} fields (ratios) are recomputed from the combined object,
+    and any other field (e.g. name, status) is taken from the {newer} range.
+    """
+    combined = {**older, **newer}
+    for field in additive:
+        if field in older or field in newer:
+            combined[field] = _to_float(older.get(field)) + _to_float(newer.get(field))
+            if isinstance(older.get(field, 0), int) and isinstance(newer.get(field, 0), int):
+                combined[field] = int(combined[field])
+    for field, compute in (derived or {}).items():
+        if field in combined:
+            combined[field] = compute(combined)
+    return combined
+
+
+def weighted_average(field: str, weight: str, older: Dict[str, Any], newer: Dict[str, Any]) -> Optional[float]:
+    """ Average of {field} over 2 ranges, weighted by the (not yet combined) {weight} field of each. """
+    if field not in older and field not in newer:
+        return None
+    total_weight = _to_float(older.get(weight)) + _to_float(newer.get(weight))
+    if not total_weight:
+        return newer.get(field, older.get(field))
+    return (_to_float(older.get(field)) * _to_float(older.get(weight)) +
+            _to_float(newer.get(field)) * _to_float(newer.get(weight))) / total_weight
+
+
+class DailyStatsCache:
+    """ Cache of stats responses over closed days (which never change again),
+    so that an N-days query only fetches the open day(s) fresh.
+
+    The closed days of the interval are split into calendar-months buckets,
+    each fetched once (by a single ranged request) and cached by (key, start, end).
+    The open days - the last {open_days} days, including today - are always fetched.
+    Then the responses are combined (oldest to newest) with the platform's {combine}.
+
+    open_days -- days back which may still change (e.g. late conversions, timezones differences).
+    """
+
+    def __init__(self,
+                 open_days: int = STATS_CACHE_OPEN_DAYS,
+                 max_buckets: int = STATS_CACHE_MAX_BUCKETS):
+        self.open_days = open_days
+        self.max_buckets = max_buckets
+        self._buckets: 'OrderedDict[Hashable, Any]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_bucket(self, bucket_key: Hashable) -> Any:
+        with self._lock:
+            if bucket_key not in self._buckets:
+                return None
+            self._buckets.move_to_end(bucket_key)
+            return self._buckets[bucket_key]
+
+    def _set_bucket(self, bucket_key: Hashable, content: Any):
+        with self._lock:
+            self._buckets[bucket_key] = content
+            self._buckets.move_to_end(bucket_key)
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def fetch(self,
+              key: Hashable,
+              from_date: date,
+              to_date: date,
+              fetch_range: Callable[[date, date], Any],
+              combine: Callable[[Any, Any], Any]) -> Any:
+        """ Stats of [from_date, to_date] - the closed days from the cache, the open days fresh.
+        fetch_range -- fetches the (decoded) stats response of a date-range.
+        combine -- combines 2 responses of consecutive date-ranges (older, newer).
+        """
+        first_open_day = date.today() - timedelta(days=self.open_days - 1)
+        if from_date >= first_open_day:
+            return fetch_range(from_date, to_date)
+        closed_buckets = split_to_month_buckets(from_date, min(to_date, first_open_day - timedelta(days=1)))
+
+        def fetch_bucket(bucket: DateRange) -> Any:
+            bucket_key = (key, *bucket)
+            content = self._get_bucket(bucket_key)
+            if content is None:
+                logger.debug(f'Stats cache miss: {bucket_key}')
+                content = fetch_range(*bucket)
+                self._set_bucket(bucket_key, content)
+            return content
+
+        parts = parallel_map(fetch_bucket, closed_buckets, max_workers=MAX_PARALLEL_PAGES_REQUESTS)
+        if to_date >= first_open_day:
+            parts.append(fetch_range(first_open_day, to_date))
+        return reduce(combine, parts)
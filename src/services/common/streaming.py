@@ -0,0 +1,118 @@
+import json
+from io import BytesIO
+from typing import (Any, BinaryIO, Iterable, Iterator, Optional, Tuple,
+                    Union)
+
+from errors import APIError
+
+try:
+    import ijson
+except ImportError:  # falling back to decoding the whole body at once
+    ijson = None
+
+ERROR_KEYS = ('error', 'errors')
+_START_EVENTS = ('start_map', 'start_array')
+_END_EVENTS = ('end_map', 'end_array')
+
+
+def _raise_on_error_key(key: str, value: Any, platform: str):
+    if key.lower() in ERROR_KEYS and value:
+        raise APIError(platform=platform, message=f"'{key}' in Response", data={
+            'resp_content': {key: value},
+        })
+
+
+def _iter_nested_items_decoded(obj: Any, depth: int, path: Tuple[str, ...] = ()
+                               ) -> Iterator[Tuple[Tuple[str, ...], Any]]:
+    if not isinstance(obj, dict):
+        return
+    for key, value in obj.items():
+        if len(path) + 1 == depth:
+            yield (*path, key), value
+        else:
+            yield from _iter_nested_items_decoded(value, depth, (*path, key))
+
+
+def _iter_nested_items_streamed(events: Iterable[Tuple[str, Any]],
+                                depth: int,
+                                skip_keys: Iterable[str],
+                                platform: str,
+                                keep_keys: Optional[Iterable[str]] = None,
+                                ) -> Iterator[Tuple[Tuple[str, ...], Any]]:
+    path = []
+    builder = None  # builds just the current object at {depth}
+    nested = 0  # nesting level inside the currently built object
+    skipping = None  # nesting level inside a skipped (not built) value
+    for event, value in events:
+        if skipping is not None:
+            if event in _START_EVENTS:
+                skipping += 1
+            elif event in _END_EVENTS:
+                skipping -= 1
+            if skipping == 0:
+                skipping = None
+            continue
+        if builder is not None:
+            if nested == 1 and event == 'map_key' and (
+                    value in skip_keys
+                    # (not an error object on the top level)
+                    or keep_keys is not None and len(path) == depth and value not in keep_keys):
+                skipping = 0
+                continue
+            builder.event(event, value)
+            if event in _START_EVENTS:
+                nested += 1
+            elif event in _END_EVENTS:
+                nested -= 1
+            if nested == 0:
+                if len(path) == depth:
+                    yield tuple(path), builder.value
+                else:
+                    _raise_on_error_key(path[0], builder.value, platform)
+                builder = None
+            continue
+        if event == 'start_map':
+            path.append(None)
+        elif event == 'end_map':
+            path.pop()
+        elif event == 'start_array':  # not a nested object (e.g. an empty '[]') - nothing to yield inside.
+            skipping = 1
+        elif event == 'map_key':
+            path[-1] = value
+            if len(path) == depth or (len(path) == 1 and value.lower() in ERROR_KEYS):
+                builder = ijson.ObjectBuilder()
+
+
+def iter_nested_items(body: Union[bytes, BinaryIO],
+                      depth: int,
+                      skip_keys: Iterable[str] = (),
+                      platform: str = '',
+                      keep_keys: Optional[Iterable[str]] = None,
+                      ) -> Iterator[Tuple[Tuple[str, ...], Any]]:
+    """ Streams a JSON body of nested objects (dicts in dicts) - yielding every object at {depth},
+    with the path of keys leading to it:
+        {'a': {'b': {...}, 'c': {...}}}, depth=2 -> (('a', 'b'), {...}), (('a', 'c'), {...})
+    Only the current object is built at a time (when 'ijson' is installed), so the whole tree is never in memory.
+
+    body -- raw bytes, or a file-like object (e.g. 'resp.raw' of a streamed response).
+    skip_keys -- keys of the yielded objects which are skipped without being built.
+    keep_keys -- if given, just these keys of the yielded objects are built (projection) - the rest are skipped.
+    Raises APIError if there's an 'error'/'errors' key on the top level.
+    """
+    skip_keys = frozenset(skip_keys)
+    keep_keys = frozenset(keep_keys) if keep_keys is not None else None
+    if ijson is None:
+        decoded = json.loads(body if isinstance(body, bytes) else body.read())
+        if isinstance(decoded, dict):
+            for key, value in decoded.items():
+                _raise_on_error_key(key, value, platform)
+        for path, obj in _iter_nested_items_decoded(decoded, depth):
+            if (skip_keys or keep_keys is not None) and isinstance(obj, dict):
+                obj = {key: value for key, value in obj.items()
+                       if key not in skip_keys and (keep_keys is None or key in keep_keys)}
+            yield path, obj
+        return
+    if isinstance(body, bytes):
+        body = BytesIO(body)
+    yield from _iter_nested_items_streamed(ijson.basic_parse(body, use_float=True),
+                                           depth, skip_keys, platform, keep_keys)
@@ -1,8 +1,10 @@
+import asyncio
 import os
 import re
 from datetime import date, timedelta
-from functools import wraps
-from typing import Any, Callable, Dict, List, Literal, Optional, Union
+from functools import lru_cache, wraps
+from typing import (Any, Callable, Dict, List, Literal, NamedTuple, Optional,
+                    Tuple, Union)
 
 from bot.patterns import (DATE_DAYS_INTERVAL_RE, GET_FIELDS_OPTIONS_KEYNAME,
                           NON_BASE_DATE_INTERVAL_RE)
@@ -13,8 +15,12 @@ from logger import logger
 
 from utils import AbstractDictForcedKey
 
+from .common_service import get_target_type_by_name
 from .schemas import BaseModel
 
+THRIVE_ID_RE = re.compile(r'(?P<thrive_camp_id>\d+) ')
+CAMPAIGN_NAMES_CACHE_SIZE = 16384  # the parsed names - about the campaigns of all the indexes
+
 
 class CampaignIDsDict(AbstractDictForcedKey):
     def __init__(self, d=None, /, platform: str = '', **kwargs) -> None:
@@ -28,10 +34,27 @@ class CampaignIDsDict(AbstractDictForcedKey):
             raise InvalidCampaignIDError(key, self.platform)
 
 
+class CampaignNameInfo(NamedTuple):
+    thrive_id: Optional[str]
+    target_type: str
+
+
+def parse_campaign_name(name: str) -> CampaignNameInfo:
+    """ '1234 Campaign MOB' -> ('1234', 'MOBILE') """
+    match = THRIVE_ID_RE.match(name)
+    return CampaignNameInfo(match.group('thrive_camp_id') if match else None, get_target_type_by_name(name))
+
+
+@lru_cache(maxsize=CAMPAIGN_NAMES_CACHE_SIZE)
+def campaign_name_info(name: str) -> CampaignNameInfo:
+    """ The parsed name - cached (bounded), renamed and removed campaigns' names are evicted in time """
+    return parse_campaign_name(name)
+
+
 def get_thrive_id_from_camp(campaign: Dict[Literal['id', 'name'], Union[str, int]],
                             raise_=not RUNNING_ON_SERVER,
                             platform='') -> Optional[str]:
-    if not (match := re.match(r'(?P<thrive_camp_id>\d+) ', campaign['name'])):
+    if (thrive_id := campaign_name_info(campaign['name']).thrive_id) is None:
         err_msg = f"Campaign {campaign['id']} Named '{campaign['name']}' Missing Tracker ID Reference."
         if raise_:
             logger.warning(f'{err_msg}')
@@ -41,7 +64,16 @@ def get_thrive_id_from_camp(campaign: Dict[Literal['id', 'name'], Union[str, int
                 platform=platform,
             )
         return None
-    return match.group('thrive_camp_id')
+    return thrive_id
+
+
+def interval_to_dates(time_interval: str) -> Tuple[date, date]:
+    """ '3d' -> (the date 3 days back - including today, today) """
+    match = DATE_DAYS_INTERVAL_RE.match(time_interval)
+    days_back = int(match.groups()[0])
+    today = date.today()
+    from_date = today - timedelta(days=days_back - 1)
+    return from_date, today
 
 
 # decorator
@@ -77,11 +109,7 @@ def add_interval_startend_dates(converted_date_interval,
                     end_date_param: None,
                 })
             else:
-                match = DATE_DAYS_INTERVAL_RE.match(kwargs[original_time_interval])
-                days_back = int(match.groups()[0])
-
-                today = date.today()
-                from_date = today - timedelta(days=days_back - 1)
+                from_date, today = interval_to_dates(kwargs[original_time_interval])
                 startDate = from_date.strftime(strftime)
                 endDate = today.strftime(strftime)
 
@@ -114,15 +142,26 @@ def fields_list_hook(cls: Union[type, BaseModel],
     """ Adds options to return list of field-types,
     if specific arguments passed {GET_FIELDS_OPTIONS_KEYNAME} into **kwargs """
 
+    def fields_options():
+        fields = extract_fields_from_class(cls)
+        if extra_fields:
+            fields.extend(extra_fields)
+        return format_result(fields)
+
     def decorator(func):
+        if asyncio.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if kwargs.get(GET_FIELDS_OPTIONS_KEYNAME):
+                    return fields_options()
+                return await func(*args, **kwargs)
+            return async_wrapper
+
         @wraps(func)
         def wrapper(*args, **kwargs):
             # result from func: fix_date_interval_value
             if kwargs.get(GET_FIELDS_OPTIONS_KEYNAME):
-                fields = extract_fields_from_class(cls)
-                if extra_fields:
-                    fields.extend(extra_fields)
-                return format_result(fields)
+                return fields_options()
             return func(*args, **kwargs)
         return wrapper
     allowed_objs_type = (list, dict, type(BaseModel), type)
@@ -135,24 +174,17 @@ def filter_result_by_fields(list_obj: List[Union[BaseModel, Dict[str, Any]]],
                             fields: List[str],
                             case_sensitive=False,
                             ) -> List[Dict]:
-    def get_fixed_case_obj(obj) -> Dict[str, Any]:
-        if case_sensitive:
-            return obj
-        if isinstance(obj, BaseModel):
-            obj = obj.dict()
-        dict_forced_lowercase_keys = AbstractDictForcedKey(obj, on_key_hook=lambda key: str(key).lower())
-        return dict_forced_lowercase_keys
-
     if not fields:
         return list_obj
-    if not case_sensitive:
-        fields = [field.lower() for field in fields]
+    if case_sensitive:
+        return [{field: obj[field] for field in fields if field in obj} for obj in list_obj]
+    fields = [field.lower() for field in fields]
     result = []
+    keys_maps: Dict[tuple, Dict[str, Any]] = {}  # {keys: {key in lowercase: key}} - objects of a model share keys
     for obj in list_obj:
-        filterd_obj = {}
-        obj = get_fixed_case_obj(obj)
-        for field in fields:
-            if field in obj:
-                filterd_obj[field] = obj[field]
-        result.append(filterd_obj)
+        if isinstance(obj, BaseModel):
+            obj = obj.dict()
+        if (keys_map := keys_maps.get(obj_keys := tuple(obj))) is None:
+            keys_map = keys_maps[obj_keys] = {str(key).lower(): key for key in obj_keys}
+        result.append({field: obj[keys_map[field]] for field in fields if field in keys_map})
     return result
@@ -1,8 +1,9 @@
+import asyncio
 import json
 from typing import Any, Callable, Dict, List, Literal, Optional, Tuple, Union
 
-from config import (DEFAULT_FILTER_NUMBER, MAX_URL_PARAMS_SIZE,
-                    RUNNING_ON_SERVER)
+from config import (DEFAULT_FILTER_NUMBER, MGID_HTTP_POOL_SIZE,
+                    MGID_WRITES_PER_SECOND, RUNNING_ON_SERVER)
 from constants import DEBUG
 from errors import APIError, ErrorList, InvalidEmailPasswordError
 from errors.network import AuthError
@@ -13,14 +14,18 @@ from logger import logger
 from pydantic.main import BaseModel
 
 # from services.thrive import Thrive
-from utils import (OPERATORS_MAP, alias_param, append_url_params, chunks,
-                   format_float, update_url_params)
+from utils import (ResultTable, alias_param, append_url_params, both,
+                   bot_traffic_percents, compare, format_float, select, sort_top,
+                   update_url_params)
+from utils.concurrency import run_parallel
 
 from ..common.common_service import TargetType, get_target_type_by_name
+from ..common.join import HashIndex
 from ..common.platform import PlatformService
 from ..common.schemas import BaseModel
+from ..common.streaming import iter_nested_items
 from ..common.utils import (add_interval_startend_dates, fields_list_hook,
-                            filter_result_by_fields)
+                            filter_result_by_fields, interval_to_dates)
 # from ..thrive.schemas import CampaignExtendedInfoStats
 from . import urls
 from .parameter_enums import DateIntervalParams
@@ -30,8 +35,8 @@ from .schemas import (CampaignBaseData, CampaignData, CampaignGETResponse,
                       CampaignStatsBySiteGETResponse, MergedWithThriveStats,
                       StatsAllCampaignGETResponse, WidgetSourceStats,
                       WidgetStats)
-from .utils import (add_token_to_url, fix_date_interval_value,
-                    update_client_id_in_url)
+from .utils import (add_token_to_url, combine_campaigns_stats,
+                    fix_date_interval_value, update_client_id_in_url)
 
 
 def adjust_dateInterval_params(func):
@@ -63,6 +68,10 @@ class MGid(PlatformService):
                          platform='MGID',
                          email=email,
                          password=password,
+                         pool_size=MGID_HTTP_POOL_SIZE,
+                         writes_per_second=MGID_WRITES_PER_SECOND,
+                         cache_ttls=urls.CACHE_TTLS,
+                         metadata_key=f'mgid-{client_id}',
                          *args, **kwargs)
 
     def renew_token(self):
@@ -73,7 +82,7 @@ class MGid(PlatformService):
                 explain='Token Error')
         url = urls.TOKEN.GET_CURRENT
         url = update_url_params(url, {'email': self.email, 'password': self.password})
-        result = self.post(url).json()
+        result = self.post(url).json_content
         self.token = result['token']
 
     def _req(self, *args, **kwargs):
@@ -85,13 +94,19 @@ class MGid(PlatformService):
                 return super()._req(*args, **kwargs)
             raise e
 
-    @property
-    def campaigns(self):
-        if not self._campaigns:
-            campaigns = self.list_campaigns(fields=['id', 'name', 'status',
-                                                    'statistics', 'spent', 'target_type'])
-            self._campaigns = self._update_campaigns(campaigns)
-        return self._campaigns
+    async def _areq(self, *args, **kwargs):
+        try:
+            return await super()._areq(*args, **kwargs)
+        except APIError as e:
+            if 'ERROR_AUTHENTICATION_SIGNING_IN_ERROR' in json.dumps(e.data):
+                await asyncio.get_running_loop().run_in_executor(None, self.renew_token)
+                return await super()._areq(*args, **kwargs)
+            raise e
+
+    def _list_campaigns_index(self):
+        # just what the index is used for - stats (e.g. 'spent') would go stale in it
+        campaigns = self.list_campaigns(fields=['id', 'name'])
+        return {campaign['id']: {'id': str(campaign['id']), 'name': campaign['name']} for campaign in campaigns}
 
     def _removed_disabled(self, campaigns: List[Union[CampaignBaseData, Dict['id', str]]]) -> Tuple[list, list]:
         active_camps = []
@@ -117,6 +132,22 @@ class MGid(PlatformService):
                        case_sensitive=False,
                        **kwargs) -> List[CampaignData]:
         """ returns the ACTIVE campaigns """
+        resp = self.get(self._list_campaigns_url(limit, start, campaign_id, fields)).json_content
+        return self._parse_campaigns(resp, campaign_id, fields, case_sensitive)
+
+    @fields_list_hook(CampaignData)
+    async def alist_campaigns(self,
+                              limit: int = None,
+                              start: int = None,
+                              campaign_id: int = None,
+                              fields: List[str] = ['name', 'id'],
+                              case_sensitive=False,
+                              **kwargs) -> List[CampaignData]:
+        """ 'list_campaigns' - on the asyncio transport """
+        resp = await self.aio.get(self._list_campaigns_url(limit, start, campaign_id, fields))
+        return self._parse_campaigns(resp.json_content, campaign_id, fields, case_sensitive)
+
+    def _list_campaigns_url(self, limit: int, start: int, campaign_id: int, fields: List[str]) -> str:
         url = urls.CAMPAIGNS.LIST
         if campaign_id:
             url = urls.CAMPAIGNS.LIST + '/' + str(campaign_id)
@@ -124,7 +155,9 @@ class MGid(PlatformService):
             url = update_url_params(url, {'limit': limit, 'start': start})
         if fields:
             url = append_url_params(url, {'fields':  json.dumps(fields, separators=(',', ':'))})
-        resp = self.get(url).json()
+        return url
+
+    def _parse_campaigns(self, resp: dict, campaign_id: int, fields: List[str], case_sensitive: bool) -> List[dict]:
         if campaign_id is not None:
             resp_model = CampaignData(**resp)
             campaigns = [resp_model]
@@ -132,7 +165,6 @@ class MGid(PlatformService):
             resp_model = CampaignGETResponse.parse_obj(resp)
             campaigns = resp_model.__root__.values()
             campaigns = [camp for camp in campaigns]
-            self._update_campaigns(campaigns)
         result = filter_result_by_fields(campaigns, fields, case_sensitive=case_sensitive)
         return result
 
@@ -145,7 +177,7 @@ class MGid(PlatformService):
                           **kwargs) -> dict:
         url = urls.CAMPAIGNS.STATS_DAILY_DETAILED.format(campaign_id=campaign_id)
         url = update_url_params(url, {'type': type, 'date': date})
-        resp = self.get(url).json()
+        resp = self.get(url).json_content
         resp_model = CampaignStatDayDetailsGETResponse(**resp)
         summary = resp_model.statistics.summary.dict()
         result = summary
@@ -162,11 +194,22 @@ class MGid(PlatformService):
                                      endDate: str = '',
                                      as_json=True,
                                      **kwargs) -> List[CampaignStat]:
-        url = urls.CAMPAIGNS.STATS_DAILY
-        url = update_url_params(url, {'dateInterval': dateInterval,
-                                      'startDate': startDate,
-                                      'endDate': endDate})
-        resp = self.get(url).json()
+        def fetch_stats(dateInterval: str, startDate: str = '', endDate: str = '') -> dict:
+            url = update_url_params(urls.CAMPAIGNS.STATS_DAILY, {'dateInterval': dateInterval,
+                                                                 'startDate': startDate,
+                                                                 'endDate': endDate})
+            return self.get(url).json_content
+
+        if dateInterval == 'interval':  # closed days are taken from the cache
+            from_date, to_date = interval_to_dates(kwargs['time_interval'])
+            resp = self.stats_cache.fetch(
+                key='campaigns-stat',
+                from_date=from_date,
+                to_date=to_date,
+                fetch_range=lambda start, end: fetch_stats('interval', str(start), str(end)),
+                combine=combine_campaigns_stats)
+        else:
+            resp = fetch_stats(dateInterval, startDate, endDate)
         resp_model = StatsAllCampaignGETResponse(**resp)
         all_stats = resp_model.campaigns_stat.values()
         stats, disabled_camps = self._removed_disabled(all_stats)
@@ -197,25 +240,23 @@ class MGid(PlatformService):
                                                           time_interval=kwargs.get('time_interval'))
             return tracker_results
 
-        stats: List[CampaignStat] = self.stats_campaign_pure_platform(campaign_id=campaign_id, **kwargs)
+        def platform_stats() -> List[CampaignStat]:
+            return self.stats_campaign_pure_platform(campaign_id=campaign_id, **kwargs)
+
+        def tracker_stats() -> List['thrive.CampaignStats']:
+            if campaign_id:
+                return thrive_stats_by_campaign(campaign_id)
+            return self.thrive.stats_campaigns(time_interval=kwargs.get('time_interval'))
+
         ret_error_stats = ErrorList()
-        # query_campaigns = [campaign_id] if campaign_id else list(self.campaigns.keys())
-        # if campaign_id or fetch_stats_by_campaign:  # all campaigns
-        #     tracker_results = []
-        #     for campaign_id in query_campaigns:
-        #         try:
-        #             cur_tracker_result = thrive_stats_by_campaign(campaign_id)
-        #             if cur_tracker_result:
-        #                 tracker_results.append(cur_tracker_result)
-        #         except CampaignNameMissingTrackerIDError as e:
-        #             ret_error_stats.append(e.dict())
         if campaign_id:
-            try:
-                tracker_results = thrive_stats_by_campaign(campaign_id)
-            except CampaignNameMissingTrackerIDError as e:
-                return [], ErrorList([e.dict()])
-        else:
-            tracker_results = self.thrive.stats_campaigns(time_interval=kwargs.get('time_interval'))
+            # both requests need the campaigns' index - loading it once, before fetching concurrently.
+            self.campaigns
+        # the platform's and the tracker's stats are independent - joining them only on merge.
+        try:
+            stats, tracker_results = run_parallel(platform_stats, tracker_stats)
+        except CampaignNameMissingTrackerIDError as e:
+            return [], ErrorList([e.dict()])
 
         merged_stats, error_stats = self._merge_thrive_stats(stats, tracker_results, MergedWithThriveStats)
         result = filter_result_by_fields(merged_stats, fields)
@@ -280,7 +321,7 @@ class MGid(PlatformService):
                       sort_key: str = 'conversions',
                       fields: List[str] = ['widget_id', 'spent', 'conversions', 'cpa'],
                       **kwargs,
-                      ) -> List[WidgetStats]:
+                      ) -> ResultTable:
         """
         Get top widgets (sites) {filter_limit} conversions (buy) by {campaign_id}
         """
@@ -293,21 +334,38 @@ class MGid(PlatformService):
         url = update_url_params(url, {'dateInterval': dateInterval,
                                       'startDate': startDate,
                                       'endDate': endDate})
-        resp = self.get(url).json()
-        resp_model = CampaignStatsBySiteGETResponse.parse_obj(resp).__root__
-
-        widget_stats: List[WidgetStats] = []
-        for camp_widget_stats in resp_model.values():
-            for stats in camp_widget_stats.values():
-                for site_id, cur_widget_stats in stats.items():
-                    widget_with_id = WidgetStats(widget_id=site_id,
-                                                 id=campaign_id,
-                                                 **cur_widget_stats.dict(exclude={'widget_id', 'id'}))
-                    widget_stats.append(widget_with_id)
-
-        widget_stats.sort(key=lambda widget: widget[sort_key], reverse=True)
-        filtered_widgets = widget_stats[:int(filter_limit)] if filter_limit else widget_stats
-        result = filter_result_by_fields(filtered_widgets, fields)
+        # streaming the widgets out of the body ({campaign: {interval: {widget: stats}}}),
+        # building each widget's model once - without the whole response tree in memory.
+        resp = self.get(url, stream=True, decode_json=False)
+        if not resp.is_json:
+            body = resp.content.decode(errors='replace')
+            resp.close()
+            raise APIError(platform='MGID',
+                           message='Unexpected (Not JSON) Widgets Response',
+                           data={'status_code': resp.status_code, 'body': body[:500]})
+        resp.raw.decode_content = True
+        # with {fields} (of plain values) - projecting while decoding: just their values are built
+        # and validated (as dicts, keyed in lowercase), without the widgets' models.
+        projection = WidgetStats.projection([*fields, sort_key]) if fields else None
+        skip_keys = ['sources'] if fields and 'sources' not in [field.lower() for field in fields] else []
+        widgets_records = iter_nested_items(resp.raw,
+                                            depth=3,
+                                            skip_keys=skip_keys,
+                                            keep_keys=projection.raw_keys if projection else None,
+                                            platform='MGID')
+        parse_widget = projection or WidgetStats.parse_obj
+        widget_stats: List[Union[WidgetStats, dict]] = [
+            parse_widget({**widget_record, 'widget_id': site_id, 'id': campaign_id})
+            for (_, _, site_id), widget_record in widgets_records
+        ]
+        resp.close()
+
+        sort_field = sort_key.lower() if projection else sort_key
+        filtered_widgets = sort_top(widget_stats,
+                                    key=lambda widget: widget[sort_field],
+                                    limit=int(filter_limit) if filter_limit else None,
+                                    reverse=True)
+        result = ResultTable.from_rows(filtered_widgets, fields)
 
         # Checking if Given WidgetID Exists:
         if widget_id is not None and widget_id.lower() not in [str(e['widget_id']).lower() for e in result]:
@@ -316,7 +374,7 @@ class MGid(PlatformService):
         return result
 
     @fields_list_hook(WidgetStats)
-    def widgets_top(self, filter_limit: int = '', **kwargs) -> List[WidgetStats]:
+    def widgets_top(self, filter_limit: int = '', **kwargs) -> ResultTable:
         """
         Get top widgets (sites) {filter_limit} conversions (buy) by {campaign_id}
         """
@@ -330,34 +388,31 @@ class MGid(PlatformService):
                            operator: Literal['eq', 'ne', 'lt', 'gt', 'le', 'ge'] = 'le',
                            fields: List[str] = ['widget_id', 'spent', 'conversions', 'cpa'],
                            **kwargs,
-                           ) -> List[WidgetStats]:
+                           ) -> ResultTable:
         """
         Get list of all the widgets (Where Conversions > 1) of a given {campaignNameOrId}
         which had CPA of less than {threshold}
         """
-        widgets_stats = self.widgets_stats(sort_key='cpa', **kwargs)
-        filtered_by_conversions = [stat for stat in widgets_stats if stat['conversions'] > 0]
-        filtered_by_cpa = [stat for stat in filtered_by_conversions
-                           # the operator is used here:
-                           if getattr(stat['cpa'], OPERATORS_MAP[operator])(float(threshold))]
-        result = filter_result_by_fields(filtered_by_cpa, fields)
-        return result
+        widgets_stats: ResultTable = self.widgets_stats(sort_key='cpa', **kwargs)
+        with_conversions = compare(widgets_stats.column('conversions'), 'gt', 0)
+        by_cpa = compare(widgets_stats.column('cpa'), operator, float(threshold))
+        return widgets_stats.filter(both(with_conversions, by_cpa)).select(fields)
 
     @fields_list_hook(WidgetStats)
-    def widgets_high_cpa(self, **kwargs) -> List[WidgetStats]:
+    def widgets_high_cpa(self, **kwargs) -> ResultTable:
         return self.widgets_filter_cpa(operator='ge', **kwargs)
 
     @fields_list_hook(WidgetStats)
-    def widgets_low_cpa(self, **kwargs) -> List[WidgetStats]:
+    def widgets_low_cpa(self, **kwargs) -> ResultTable:
         return self.widgets_filter_cpa(operator='le', **kwargs)
 
     def _validate_widget_filter_resp(self, resp):
         if not resp.is_json or 'id' not in resp.json_content:
             raise APIError(platform='MGID',
-                           data={**resp.json(),
+                           data={**resp.json_content,
                                     'url': resp.url,
                                     'reason': resp.reason,
-                                    'errors': (resp.json().get('errors', '')
+                                    'errors': (resp.json_content.get('errors', '')
                                                if resp.is_json else resp.content),
                                     'status_code': resp.status_code},
                            explain=resp.reason)
@@ -398,19 +453,16 @@ class MGid(PlatformService):
         # CLEANING CURRENT FILTER ON WIDGETS IF IS NOT BLACKLIST
         # if is already blacklist ('except') - method does nothing
         cur_blacklist = self._widgets_init_filter_to_blacklist(campaign_id=campaign_id)
-        error_list = ErrorList()
-
+        cur_blacklist = set(cur_blacklist)
         widgets_to_pause = [widget for widget in list_widgets if widget not in cur_blacklist]
         url = urls.WIDGETS.PAUSE.format(campaign_id=campaign_id)
-        for chunk_widgets in chunks(widgets_to_pause, MAX_URL_PARAMS_SIZE):
-            url = update_url_params(url, {'widgetsFilterUid': "include,except,{ids}"
-                                          .format(ids=','.join(chunk_widgets))})
-            try:
-                resp = self.patch(url)
-                self._validate_widget_filter_resp(resp)
-            except APIError as e:
-                error_list.append(e.dict())
-        return widgets_to_pause, error_list
+
+        def pause_chunk(chunk_widgets: List[str]):
+            # 'include' adds to the blacklist - so the chunks are independent of each other.
+            resp = self.patch(update_url_params(url, {'widgetsFilterUid': "include,except,{ids}"
+                                                      .format(ids=','.join(chunk_widgets))}))
+            self._validate_widget_filter_resp(resp)
+        return self._write_in_chunks(pause_chunk, widgets_to_pause)
 
     @adjust_dateInterval_params
     def widgets_kill_longtail(self, *,
@@ -418,13 +470,13 @@ class MGid(PlatformService):
                               threshold: int,
                               dateInterval: DateIntervalParams = 'today',
                               **kwargs) -> Tuple[dict, ErrorList]:
-        widgets_stats = self.widgets_stats(campaign_id=campaign_id,
-                                           sort_key='spent',
-                                           fields=['id', 'widget_id', 'spent'],
-                                           dateInterval=dateInterval,
-                                           **kwargs)
-        filtered_widgets: List[str] = [widget['widget_id'] for widget in widgets_stats
-                                       if widget['spent'] < float(threshold)]
+        widgets_stats: ResultTable = self.widgets_stats(campaign_id=campaign_id,
+                                                        sort_key='spent',
+                                                        fields=['id', 'widget_id', 'spent'],
+                                                        dateInterval=dateInterval,
+                                                        **kwargs)
+        filtered_widgets: List[str] = select(widgets_stats.column('widget_id'),
+                                             compare(widgets_stats.column('spent'), 'lt', float(threshold)))
 
         widgets_paused_ids, error_list = self._widgets_pause(campaign_id=campaign_id,
                                                              list_widgets=filtered_widgets)
@@ -464,14 +516,14 @@ class MGid(PlatformService):
             }
         self.thrive._remove_unknown_ids(tracker_widgets)
         tracker_widgets = self.thrive._convert_subids_to_uids(tracker_widgets)
-        tracker_widgets_dict = {w['widget_id']: w for w in tracker_widgets}
+        tracker_widgets_index = HashIndex(tracker_widgets, key='widget_id', keep='last')
 
         widgets = self.widgets_stats(campaign_id=campaign_id,
                                      sort_key='platform_clicks',
                                      fields=['id', 'widget_id', 'platform_clicks', 'spent'],
                                      **kwargs)
         widgets = [w for w in widgets if w['platform_clicks'] != 0]
-        widgets_dict = {w['widget_id']: w for w in widgets}
+        widgets_index = HashIndex(widgets, key='widget_id', keep='last')
         if not widgets:  # => No Clicks in Time-Range in Platform.
             return {
                 'Success': False,
@@ -485,29 +537,19 @@ class MGid(PlatformService):
         * then all the widgets which are in platform-widgets but not in tracker - they are bot traffic.
         TODO figure out what to do with those bot-traffic-widgets.
         """
-        widgets_ids = set(widgets_dict)
-        tracker_widgets_ids = set(tracker_widgets_dict)
-        # common_ids = widgets_ids & tracker_widgets_ids
-
-        just_in_platform = widgets_ids - tracker_widgets_ids
-        just_in_platform_widgets = [w for w in widgets if w['widget_id'] in just_in_platform]
-        just_in_platform_widgets_sum_spent = sum(widget['spent'] for widget in just_in_platform_widgets)
-
-        just_in_tracker = tracker_widgets_ids - widgets_ids
-        # logger.info('[MGID] [widget_kill_bot_traffic] Platform Widgets & Tracker Widgets Differences: '
-        #             #   f'len(just_in_platform):{len(just_in_platform)}\nlen(just_in_tracker):{len(just_in_tracker)}')
-        #             f'{just_in_platform=}\n{just_in_tracker=}')
+        just_in_platform = [widget_id for widget_id in widgets_index if widget_id not in tracker_widgets_index]
+        just_in_platform_widgets_sum_spent = sum(widgets_index[widget_id]['spent']
+                                                 for widget_id in just_in_platform)
 
-        merged_widget_data = self._merge_and_update_list_objects(tracker_widgets_dict,
-                                                                 widgets_dict,
+        merged_widget_data = self._merge_and_update_list_objects(tracker_widgets_index,
+                                                                 widgets_index,
                                                                  just_common=True)
 
-        bot_widgets_ids = []
-        for widget in merged_widget_data:
-            # Assuming thrive_clicks is over 0 (if was 0 - it would not have returned from tracker.)
-            bot_percent = 100 - (widget['thrive_clicks'] / widget['platform_clicks'] * 100)
-            if bot_percent > int(threshold):
-                bot_widgets_ids.append(widget['widget_id'])
+        merged_widgets = ResultTable.from_rows(merged_widget_data, ['widget_id', 'thrive_clicks', 'platform_clicks'])
+        # Assuming thrive_clicks is over 0 (if was 0 - it would not have returned from tracker.)
+        bots_percents = bot_traffic_percents(merged_widgets.column('thrive_clicks'),
+                                             merged_widgets.column('platform_clicks'))
+        bot_widgets_ids = select(merged_widgets.column('widget_id'), compare(bots_percents, 'gt', int(threshold)))
         widgets_paused_ids, error_list = self._widgets_pause(campaign_id=campaign_id,
                                                              list_widgets=bot_widgets_ids)
         widgets_paused_stats = [
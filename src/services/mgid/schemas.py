@@ -2,9 +2,8 @@ from typing import Dict, List, Optional, Union
 
 from pydantic import Field, validator
 
-from ..common.common_service import get_target_type_by_name
-from ..common.platform import get_thrive_id_from_camp
 from ..common.schemas import BaseModel
+from ..common.utils import campaign_name_info, get_thrive_id_from_camp
 
 
 class CampaignBaseData(BaseModel):
@@ -14,7 +13,7 @@ class CampaignBaseData(BaseModel):
 
     @property
     def target_type(self) -> str:
-        return get_target_type_by_name(self.name)
+        return campaign_name_info(self.name).target_type
 
     @property
     def thrive_id(self):
@@ -203,14 +202,9 @@ class WidgetSourceStats(BaseModel):
     interest: int = None
     interestCost: float = None
 
-    def __init__(self, *args, **kwargs):
-        for field in ['buy',
-                      'conversions',
-                      'cpa',
-                      'buyCost']:
-            if kwargs.get(field, None) is None:
-                kwargs[field] = 0
-        super().__init__(*args, **kwargs)
+    @validator('buy', 'conversions', 'buyCost', 'cpa', pre=True, always=True)
+    def none_to_zero(cls, value):
+        return 0 if value is None else value
 
 
 class WidgetStats(WidgetSourceStats):
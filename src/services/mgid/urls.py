@@ -1,3 +1,4 @@
+from config import RESPONSE_CACHE_LIST_TTL, RESPONSE_CACHE_STATS_TTL
 
 
 class CAMPAIGNS:
@@ -15,3 +16,11 @@ class WIDGETS:
     PAUSE = '/goodhits/clients/{{client_id}}/campaigns/{campaign_id}'
     RESUME = '/goodhits/clients/{{client_id}}/campaigns/{campaign_id}'
     LIST = '/goodhits/campaigns/{campaign_id}/quality-analysis'
+
+
+# seconds to cache the GET responses of an endpoint (if RESPONSE_CACHE_ENABLED)
+CACHE_TTLS = {
+    CAMPAIGNS.LIST: RESPONSE_CACHE_LIST_TTL,
+    CAMPAIGNS.STATS_DAILY: RESPONSE_CACHE_STATS_TTL,
+    CAMPAIGNS.STATS_DAILY_DETAILED: RESPONSE_CACHE_STATS_TTL,
+}
@@ -5,6 +5,17 @@ from urllib.parse import parse_qsl, urlencode, urlparse, urlsplit
 from bot.patterns import DATE_DAYS_INTERVAL_RE, NON_BASE_DATE_INTERVAL_RE
 from errors import InvalidCommandFlagError
 
+from ..common.stats_cache import safe_div, combine_stats
+
+CAMPAIGN_STATS_ADDITIVE_FIELDS = ('imps', 'clicks', 'spent', 'interest', 'decision', 'buying', 'revenue', 'profit')
+CAMPAIGN_STATS_DERIVED_FIELDS = {
+    'avcpc': lambda stat: safe_div(stat['spent'], stat['clicks']),
+    'interestCost': lambda stat: safe_div(stat['spent'], stat['interest']),
+    'decisionCost': lambda stat: safe_div(stat['spent'], stat['decision']),
+    'buyingCost': lambda stat: safe_div(stat['spent'], stat['buying']),
+    'epc': lambda stat: safe_div(stat['revenue'], stat['clicks']),
+}
+
 
 def add_token_to_url(url: str, token: str) -> str:
     """ add token to url """
@@ -55,3 +66,17 @@ def fix_date_interval_value(date_interval: str) -> str:
     if (match := DATE_DAYS_INTERVAL_RE.match(date_interval)):
         return 'interval'
     raise InvalidCommandFlagError(flag='time_range')
+
+
+def combine_campaigns_stats(older: dict, newer: dict) -> dict:
+    """ Combines 2 'STATS_DAILY' responses of consecutive date-ranges into one. """
+    # an empty range is returned as an empty list
+    older_stats = older.get('campaigns-stat') or {}
+    newer_stats = newer.get('campaigns-stat') or {}
+    combined_stats = {**older_stats, **newer_stats}
+    for campaign_id in older_stats.keys() & newer_stats.keys():
+        combined_stats[campaign_id] = combine_stats(older_stats[campaign_id],
+                                                    newer_stats[campaign_id],
+                                                    additive=CAMPAIGN_STATS_ADDITIVE_FIELDS,
+                                                    derived=CAMPAIGN_STATS_DERIVED_FIELDS)
+    return {**newer, 'campaigns-stat': combined_stats}
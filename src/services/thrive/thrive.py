@@ -1,6 +1,7 @@
 # import os
-from typing import Dict, List, Literal, Optional, Union
+from typing import Dict, List, Literal, Optional
 
+from config import THRIVE_HTTP_POOL_SIZE
 from errors import ErrorDict
 from logger import logger
 from pydantic.main import BaseModel
@@ -10,18 +11,24 @@ from utils import alias_param, append_url_params, update_url_params
 from utils.helpers import merge_objs
 
 from ..common import CommonService
-from ..common.utils import (CampaignIDsDict, add_interval_startend_dates,
-                            filter_result_by_fields)
+from ..common.campaigns_index import CampaignsIndexed
+from ..common.metadata_store import metadata_store
+from ..common.stats_cache import DailyStatsCache
+from ..common.utils import (add_interval_startend_dates,
+                            filter_result_by_fields, interval_to_dates)
 from . import urls
 from .config import CAMP_STATS_VARIABLE_TYPES, STATS_BY_VARIABLE_MAPPER
 from .schemas import (CampaignBasicInfo, CampaignGeneralInfo,
                       CampaignGETResponse, CampaignInfoAndStats,
                       CampaignInfoAndStatsResponse,
-                      CampaignMetricsStatsResponse, CampaignNameID,
+                      CampaignMetricsStatsResponse,
                       CampaignStats, CampaignStatsByDevice,
                       CampaignStatsResponse, CampaignWidgetsStats, Source,
                       SourceGETResponse)
-from .utils import fix_date_interval_value, subids_to_uids
+from .utils import (combine_campaigns_stats, fix_date_interval_value,
+                    subids_to_uids)
+
+STATS_DATE_FORMAT = r'%m/%d/%Y'
 
 
 def adjust_interval_params(func):
@@ -33,50 +40,56 @@ def adjust_interval_params(func):
     add_startend_dates_by_interval = add_interval_startend_dates(
         'interval',
         custom_date_key='interval',
-        strftime=r'%m/%d/%Y')
+        strftime=STATS_DATE_FORMAT)
     return alias_param_interval(add_startend_dates_by_interval(func))
 
 
-class Thrive(CommonService):
+class Thrive(CampaignsIndexed, CommonService):
+    metadata_key = 'thrive'
+
     def __init__(self, apiKey: str, installId: str):
-        super().__init__(base_url=urls.CAMPAIGNS.BASE_URL)
+        super().__init__(base_url=urls.CAMPAIGNS.BASE_URL,
+                         pool_size=THRIVE_HTTP_POOL_SIZE,
+                         cache_ttls=urls.CACHE_TTLS)
         self.session.headers.update({'apiKey': apiKey, 'installId': installId})
-        self._campaigns: Dict[str, str] = {}
-        self.sources: Dict[int, str] = {}
+        self.sources: Dict[int, str] = self._load_stored_sources()
         self.platforms: List[CommonService] = []  # : List[PlatformService]
+        self.stats_cache = DailyStatsCache()
 
-    def _update_campaigns_cache(self, updated_campaigns: List[Union[dict, CampaignNameID]]):
-        if not self._campaigns:
-            self._campaigns = CampaignIDsDict()
-        for campaign in updated_campaigns:
-            self._campaigns[campaign['id']] = campaign['name']
-        return self._campaigns
-
-    @property
-    def campaigns(self):
-        if not self._campaigns:
-            campaigns = self.list_campaigns()
-            # if still:
-            if not self._campaigns:
-                self._campaigns = self._update_campaigns_cache(campaigns)
-        return self._campaigns
+    def _list_campaigns_index(self):
+        return {campaign['id']: campaign['name'] for campaign in self.list_campaigns()}
+
+    def _load_stored_sources(self) -> Dict[int, str]:
+        stored = metadata_store.load('thrive:sources')
+        if stored is None:
+            return {}
+        return {int(source_id): name for source_id, name in stored.data.items()}
 
     def _update_sources_cache(self, updated_sources: List[Source]):
         for source in updated_sources:
             self.sources[source.id] = source.name
+        metadata_store.save('thrive:sources', self.sources)
 
     def list_campaigns(self,
                        search: str = None,
                        fields: CampaignBasicInfo.fields_list() = ['name', 'id', 'source'],
                        **kwargs) -> list:
+        resp = self.get(self._list_campaigns_url(search)).json_content
+        return filter_result_by_fields(CampaignGETResponse(**resp).data, fields)
+
+    async def alist_campaigns(self,
+                              search: str = None,
+                              fields: CampaignBasicInfo.fields_list() = ['name', 'id', 'source'],
+                              **kwargs) -> list:
+        """ 'list_campaigns' - on the asyncio transport """
+        resp = await self.aio.get(self._list_campaigns_url(search))
+        return filter_result_by_fields(CampaignGETResponse(**resp.json_content).data, fields)
+
+    def _list_campaigns_url(self, search: str = None) -> str:
         url = urls.CAMPAIGNS.LIST_CAMPAIGNS
         if search:
             url = update_url_params(url, {'search': search})
-        resp = self.get(url).json()
-        resp_model = CampaignGETResponse(**resp)
-        self._update_campaigns_cache(resp_model.data)
-        result = filter_result_by_fields(resp_model.data, fields)
-        return result
+        return url
 
     def list_sources(self, *,
                      search: str = '',
@@ -94,7 +107,7 @@ class Thrive(CommonService):
             'camps': camps,
             'all': all,
         })
-        resp = self.get(url).json()
+        resp = self.get(url).json_content
         resp_model = SourceGETResponse(**resp)
         self._update_sources_cache(resp_model.data)
         result = filter_result_by_fields(resp_model.data, fields)
@@ -106,12 +119,38 @@ class Thrive(CommonService):
                       **kwargs) -> list:
         url = urls.CAMPAIGNS.GENERAL_INFO
         url = update_url_params(url, {'campId': campaign_id})
-        resp = self.get(url).json()
+        resp = self.get(url).json_content
         resp_model = CampaignGeneralInfo(**resp)
         # self._update_sources_cache(resp_model.data)
         result = filter_result_by_fields(resp_model.data, fields)
         return result
 
+    def _fetch_campaigns_stats(self,
+                               campaign_id: Optional[str],
+                               interval: str,
+                               startDate: str,
+                               endDate: str,
+                               time_interval: Optional[str]) -> dict:
+        """ The campaigns' info-and-stats response - of a time-interval: its closed days taken from the cache """
+        def fetch_stats(startDate: str, endDate: str) -> dict:
+            url = urls.CAMPAIGNS.GENERAL_INFO_WITH_STATS
+            if campaign_id:
+                url = update_url_params(url, {'camps': campaign_id})
+            url = append_url_params(url, {'range[from]': startDate,
+                                          'range[to]': endDate})
+            return self.get(url).json_content
+
+        if interval != 'interval' or not time_interval:
+            return fetch_stats(startDate, endDate)
+        from_date, to_date = interval_to_dates(time_interval)
+        return self.stats_cache.fetch(
+            key=('campaigns-stats', campaign_id),
+            from_date=from_date,
+            to_date=to_date,
+            fetch_range=lambda start, end: fetch_stats(start.strftime(STATS_DATE_FORMAT),
+                                                       end.strftime(STATS_DATE_FORMAT)),
+            combine=combine_campaigns_stats)
+
     @adjust_interval_params
     def info_and_stats_campaign(self, *,
                                 campaign_id: str = None,
@@ -121,14 +160,7 @@ class Thrive(CommonService):
                                 fields: List[str] = ['name', 'id', 'clicks', 'thrive_clicks',
                                                      'cost', 'conv', 'ctr', 'roi', 'rev', 'profit', 'cpa'],
                                 **kwargs) -> List[CampaignInfoAndStats]:
-        url = urls.CAMPAIGNS.GENERAL_INFO_WITH_STATS
-        if campaign_id:
-            url = update_url_params(url, {'camps': campaign_id})
-        url = append_url_params(url, {'range[from]': startDate,
-                                      'range[to]': endDate})
-        # TODO implement the 'time_range' for request.
-
-        resp = self.get(url).json()
+        resp = self._fetch_campaigns_stats(campaign_id, interval, startDate, endDate, kwargs.get('time_interval'))
         resp_model = CampaignInfoAndStatsResponse(**resp)
         result = filter_result_by_fields(resp_model.data, fields)
         return result
@@ -141,14 +173,7 @@ class Thrive(CommonService):
                         endDate: str,
                         fields: List[str] = CampaignStats.fields_list(),
                         **kwargs) -> List[CampaignStats]:
-        url = urls.CAMPAIGNS.GENERAL_INFO_WITH_STATS
-        if campaign_id:
-            url = update_url_params(url, {'camps': campaign_id})
-        url = append_url_params(url, {'range[from]': startDate,
-                                      'range[to]': endDate})
-        # TODO implement the 'time_range' for request.
-
-        resp = self.get(url).json()
+        resp = self._fetch_campaigns_stats(campaign_id, interval, startDate, endDate, kwargs.get('time_interval'))
         resp_model = CampaignInfoAndStatsResponse(**resp)
         result = filter_result_by_fields(resp_model.data, fields)
         return result
@@ -183,7 +208,7 @@ class Thrive(CommonService):
                                       'range[to]': endDate,
                                       'key': STATS_BY_VARIABLE_MAPPER[key.lower()]})
 
-        resp = self.get(url).json()
+        resp = self.get(url).json_content
 
         list_stats_model = ResponseModelType.parse_obj(resp).__root__
         if not list_stats_model:
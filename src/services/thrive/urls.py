@@ -1,3 +1,4 @@
+from config import RESPONSE_CACHE_LIST_TTL, RESPONSE_CACHE_STATS_TTL
 
 
 class CAMPAIGNS:
@@ -8,3 +9,14 @@ class CAMPAIGNS:
     STATS = '/campaigns/getMetricsTable'
     GENERAL_INFO_WITH_STATS = '/campaigns/getWithMetrics'
     STATS_BY_VAR = '/otherVariables/getMetrics'
+
+
+# seconds to cache the GET responses of an endpoint (if RESPONSE_CACHE_ENABLED)
+CACHE_TTLS = {
+    CAMPAIGNS.LIST_CAMPAIGNS: RESPONSE_CACHE_LIST_TTL,
+    CAMPAIGNS.LIST_SOURCES: RESPONSE_CACHE_LIST_TTL,
+    CAMPAIGNS.GENERAL_INFO: RESPONSE_CACHE_LIST_TTL,
+    CAMPAIGNS.STATS: RESPONSE_CACHE_STATS_TTL,
+    CAMPAIGNS.GENERAL_INFO_WITH_STATS: RESPONSE_CACHE_STATS_TTL,
+    CAMPAIGNS.STATS_BY_VAR: RESPONSE_CACHE_STATS_TTL,
+}
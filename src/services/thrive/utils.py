@@ -8,6 +8,19 @@ from logger import logger
 
 from utils import merge_objs
 
+from ..common.join import HashIndex, hash_join
+from ..common.stats_cache import combine_stats, safe_div
+
+STATS_ADDITIVE_FIELDS = ('clicks', 'cost', 'thru', 'conv', 'rev', 'profit')
+STATS_DERIVED_FIELDS = {
+    'cpc': lambda stats: safe_div(stats['cost'], stats['clicks']),
+    'ctr': lambda stats: safe_div(stats['thru'], stats['clicks']) * 100,
+    'roi': lambda stats: safe_div(stats['profit'], stats['cost']) * 100,
+    'epc': lambda stats: safe_div(stats['rev'], stats['clicks']),
+    'cvr': lambda stats: safe_div(stats['conv'], stats['clicks']) * 100,
+    'epa': lambda stats: safe_div(stats['rev'], stats['conv']),
+}
+
 PATTERN_GET_UID = re.compile(r'^(?P<uid>\d+?)s(?P<subid>\d+)$', re.IGNORECASE)
 
 
@@ -68,3 +81,19 @@ def subids_to_uids(list_objects: List[Dict[Literal['widget_id'], str]]
                     obj['widget_id'] = uid
         new_objects[uid] = obj
     return list(new_objects.values())
+
+
+def combine_campaigns_stats(older: dict, newer: dict) -> dict:
+    """ Combines 2 'GENERAL_INFO_WITH_STATS' responses of consecutive date-ranges into one. """
+    older_index = HashIndex(older.get('data') or [], key=lambda camp: str(camp['id']))
+    data = list(hash_join(newer.get('data') or [], older_index,
+                          probe_key=lambda camp: str(camp['id']),
+                          merge=lambda newer_camp, older_camp: combine_stats(older_camp, newer_camp,
+                                                                             additive=STATS_ADDITIVE_FIELDS,
+                                                                             derived=STATS_DERIVED_FIELDS),
+                          how='outer'))
+    sidecar = {**(older.get('sidecar') or {}), **(newer.get('sidecar') or {})}
+    for field in ('from', 'start'):  # the combined range starts at the older range
+        if field in (older.get('sidecar') or {}):
+            sidecar[field] = older['sidecar'][field]
+    return {**newer, 'data': data, 'sidecar': sidecar}
@@ -3,9 +3,8 @@ from typing import Callable, List, Literal, Optional, Union
 
 from pydantic import Field, validator
 
-from ..common.common_service import get_target_type_by_name
-from ..common.platform import get_thrive_id_from_camp
 from ..common.schemas import BaseModel
+from ..common.utils import campaign_name_info, get_thrive_id_from_camp
 
 
 class CampaignBaseData(BaseModel):
@@ -14,7 +13,7 @@ class CampaignBaseData(BaseModel):
 
     @property
     def target_type(self) -> str:
-        return get_target_type_by_name(self.name)
+        return campaign_name_info(self.name).target_type
 
     @property
     def thrive_id(self):
@@ -64,10 +63,9 @@ class Stats(BaseModel):
     winRatio: float = None
     ecpa: float = None
 
-    @validator('ecpa')
+    @validator('ecpa', pre=True, always=True)
     def prevent_none(cls, v):
-        if v is None:
-            return 0
+        return 0 if v is None else v
 
 
 class CampaignElement(BaseModel):
@@ -104,10 +102,9 @@ class ExtendedStats(Details):
     winRatio: float = None
     ecpa: float = None
 
-    @validator('ecpa')
+    @validator('ecpa', pre=True, always=True)
     def prevent_none(cls, v):
-        if v is None:
-            return 0
+        return 0 if v is None else v
 
 
 class ListExtendedStats(BaseModel):
@@ -160,10 +157,9 @@ class TargetStats(BaseModel):
     returnOfInvestment: float = None
     ecpa: float = None
 
-    @validator('ecpa')
+    @validator('ecpa', pre=True, always=True)
     def prevent_none(cls, v):
-        if v is None:
-            return 0
+        return 0 if v is None else v
 
 
 class BidPosition(BaseModel):
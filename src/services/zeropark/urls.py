@@ -1,3 +1,4 @@
+from config import RESPONSE_CACHE_STATS_TTL
 
 
 class CAMPAIGNS:
@@ -10,3 +11,10 @@ class WIDGETS:
     PAUSE = '/campaign/{campaign_id}/targets/pause'
     RESUME = '/campaign/{campaign_id}/targets/resume'
     LIST = '/stats/campaign/{campaign_id}/targets'
+
+
+# seconds to cache the GET responses of an endpoint (if RESPONSE_CACHE_ENABLED)
+CACHE_TTLS = {
+    CAMPAIGNS.STATS: RESPONSE_CACHE_STATS_TTL,
+    CAMPAIGNS.LIST_WIDGETS: RESPONSE_CACHE_STATS_TTL,
+}
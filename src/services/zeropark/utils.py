@@ -1,6 +1,15 @@
 from bot.patterns import DATE_DAYS_INTERVAL_RE, NON_BASE_DATE_INTERVAL_RE
 from errors import InvalidCommandFlagError
 
+from ..common.join import HashIndex, hash_join
+from ..common.stats_cache import combine_stats, safe_div, weighted_average
+
+STATS_ADDITIVE_FIELDS = ('spent', 'payout', 'redirects', 'conversions', 'clicks', 'impressions')
+STATS_DERIVED_FIELDS = {
+    'ecpa': lambda stats: safe_div(stats['spent'], stats['conversions']),
+    'returnOfInvestment': lambda stats: safe_div(stats['payout'] - stats['spent'], stats['spent']) * 100,
+}
+
 
 def fix_date_interval_value(date_interval: str) -> str:
     r""" @date_interval: \d[dwmy] """
@@ -25,3 +34,30 @@ def fix_date_interval_value(date_interval: str) -> str:
     if (match := DATE_DAYS_INTERVAL_RE.match(date_interval)):
         return 'CUSTOM'
     raise InvalidCommandFlagError(flag='time_range')
+
+
+def _combine_stats(older: dict, newer: dict) -> dict:
+    combined = combine_stats(older, newer, additive=STATS_ADDITIVE_FIELDS, derived=STATS_DERIVED_FIELDS)
+    for field in ('averageBid', 'winRatio'):
+        if field in combined:
+            combined[field] = weighted_average(field, 'redirects', older, newer)
+    return combined
+
+
+def combine_campaigns_stats(older: dict, newer: dict) -> dict:
+    """ Combines 2 'CAMPAIGNS.STATS' responses of consecutive date-ranges into one. """
+    def combine_elements(newer_elem: dict, older_elem: dict) -> dict:
+        return {**older_elem, **newer_elem, 'stats': _combine_stats(older_elem['stats'], newer_elem['stats'])}
+
+    older_index = HashIndex(older.get('elements') or [], key=lambda elem: elem['details']['id'])
+    elements = list(hash_join(newer.get('elements') or [], older_index,
+                              probe_key=lambda elem: elem['details']['id'],
+                              merge=combine_elements,
+                              how='outer'))
+    summary = None
+    if older.get('summary') and newer.get('summary'):
+        summary = _combine_stats(older['summary'], newer['summary'])
+    return {**newer,
+            'summary': summary or newer.get('summary') or older.get('summary'),
+            'total': len(elements),
+            'elements': elements}
@@ -3,24 +3,29 @@ from os import stat
 from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
 from config import (DEFAULT_FILTER_NUMBER, DEFAULT_TIME_INTERVAL,
-                    MAX_BODY_SIZE, MAX_URL_PARAMS_SIZE, RUNNING_ON_SERVER)
+                    MAX_BODY_SIZE, MAX_PARALLEL_PAGES_REQUESTS,
+                    RUNNING_ON_SERVER, ZEROPARK_HTTP_POOL_SIZE,
+                    ZEROPARK_WRITES_PER_SECOND)
 from constants import DEBUG
 from errors import APIError, ErrorList
 from errors.platforms import CampaignNameMissingTrackerIDError
 from logger import logger
 
 # from extensions import Thrive
-from utils import (OPERATORS_MAP, alias_param, append_url_params, chunks,
-                   format_float, update_url_params)
+from utils import (ResultTable, alias_param, append_url_params, both,
+                   compare, format_float, select, sort_top, update_url_params)
+from utils.concurrency import parallel_map, run_parallel
 
 from ..common.platform import PlatformService
 from ..common.utils import (add_interval_startend_dates, fields_list_hook,
-                            filter_result_by_fields)
+                            filter_result_by_fields, interval_to_dates)
 from . import urls
 from .schemas import (CampaignStatsResponse, ExtendedStats, ListExtendedStats,
                       MergedWithThriveStats, TargetStatsByCampaignResponse,
                       TargetStatsMergedData)
-from .utils import fix_date_interval_value
+from .utils import combine_campaigns_stats, fix_date_interval_value
+
+STATS_DATE_FORMAT = r'%d/%m/%Y'
 
 
 def adjust_interval_params(func):
@@ -32,7 +37,7 @@ def adjust_interval_params(func):
     add_startend_dates_by_interval = add_interval_startend_dates(
         'interval',
         custom_date_key='CUSTOM',
-        strftime=r'%d/%m/%Y')
+        strftime=STATS_DATE_FORMAT)
     return alias_param_interval(add_startend_dates_by_interval(func))
 
 
@@ -55,16 +60,16 @@ class ZeroPark(PlatformService):
         super().__init__(thrive=thrive,
                          base_url=urls.CAMPAIGNS.BASE_URL,
                          platform='ZeroPark',
+                         pool_size=ZEROPARK_HTTP_POOL_SIZE,
+                         writes_per_second=ZEROPARK_WRITES_PER_SECOND,
+                         cache_ttls=urls.CACHE_TTLS,
                          *args, **kwargs)
         self.session.headers.update({'api-token': token})
 
-    @property
-    def campaigns(self):
-        if self._campaigns is None:
-            campaigns = self.list_campaigns(fields=['id', 'name', 'clicks',
-                                                    'spent', 'bid', 'target_type'])
-            self._campaigns = self._update_campaigns(campaigns)
-        return self._campaigns
+    def _list_campaigns_index(self):
+        # just what the index is used for - stats (e.g. 'spent') would go stale in it
+        campaigns = self.list_campaigns(fields=['id', 'name'])
+        return {campaign['id']: {'id': str(campaign['id']), 'name': campaign['name']} for campaign in campaigns}
 
     @fields_list_hook(ExtendedStats)
     def list_campaigns(self,
@@ -83,21 +88,32 @@ class ZeroPark(PlatformService):
                                      interval: str = "TODAY",
                                      as_json=True,
                                      **kwargs) -> List[ExtendedStats]:
-        url = urls.CAMPAIGNS.STATS
-        url = update_url_params(url, {'interval': interval,
-                                      'startDate': kwargs.get('startDate', ''),
-                                      'endDate': kwargs.get('endDate', '')})
-        if campaignNameOrId is not None:
-            url = update_url_params(url, {'campaignNameOrId': campaignNameOrId})
-        resp = self.get(url).json()
+        def fetch_stats(interval: str, startDate: str = '', endDate: str = '') -> dict:
+            url = update_url_params(urls.CAMPAIGNS.STATS, {'interval': interval,
+                                                           'startDate': startDate,
+                                                           'endDate': endDate})
+            if campaignNameOrId is not None:
+                url = update_url_params(url, {'campaignNameOrId': campaignNameOrId})
+            return self.get(url).json_content
+
+        if interval == 'CUSTOM':  # closed days are taken from the cache
+            from_date, to_date = interval_to_dates(kwargs['time_interval'])
+            resp = self.stats_cache.fetch(
+                key=('campaigns-stats', campaignNameOrId),
+                from_date=from_date,
+                to_date=to_date,
+                fetch_range=lambda start, end: fetch_stats('CUSTOM',
+                                                           start.strftime(STATS_DATE_FORMAT),
+                                                           end.strftime(STATS_DATE_FORMAT)),
+                combine=combine_campaigns_stats)
+        else:
+            resp = fetch_stats(interval, kwargs.get('startDate', ''), kwargs.get('endDate', ''))
         resp_model = CampaignStatsResponse(**resp)
         result = extended_stats = ListExtendedStats.parse_obj([ExtendedStats(**elem.stats.dict(), **elem.details.dict())
                                                                for elem in resp_model.elements]).__root__
         if campaignNameOrId is not None:  # returning specific campaign
             result = [stat for stat in extended_stats
                       if campaignNameOrId in (stat['id'], stat['name'])]
-        else:
-            self._update_campaigns(result)
         if as_json:
             result = [stat.dict() for stat in result]
         return result
@@ -114,17 +130,19 @@ class ZeroPark(PlatformService):
             'campaignNameOrId': campaignNameOrId,
             'as_json': False,
         })
-        stats = self.stats_campaign_pure_platform(**kwargs)
         # * spent -> from platfrom, cost -> from thrive
         if campaignNameOrId:
             try:
-                thrive_id = self.get_thrive_id(self.campaigns[campaignNameOrId], raise_=raise_)
+                thrive_id = self.get_thrive_id(self.get_campaign(campaignNameOrId), raise_=raise_)
             except CampaignNameMissingTrackerIDError as e:
                 return [], ErrorList([e.dict()])
         else:
             thrive_id = None
-        tracker_result = self.thrive.stats_campaigns(campaign_id=thrive_id,
-                                                     time_interval=kwargs.get('time_interval'))
+        # the platform's and the tracker's stats are independent - joining them only on merge.
+        stats, tracker_result = run_parallel(
+            lambda: self.stats_campaign_pure_platform(**kwargs),
+            lambda: self.thrive.stats_campaigns(campaign_id=thrive_id,
+                                                time_interval=kwargs.get('time_interval')))
         merged_stats, error_stats = self._merge_thrive_stats(stats, tracker_result, MergedWithThriveStats)
         result = filter_result_by_fields(merged_stats, fields)
         return result, error_stats
@@ -197,7 +215,7 @@ class ZeroPark(PlatformService):
                                       'targetAddresses': widget_name,
                                       })
 
-        resp = self.get(url).json()
+        resp = self.get(url).json_content
         resp_model = TargetStatsByCampaignResponse.parse_obj(resp)
         if not resp_model.elements:
             return False
@@ -215,7 +233,7 @@ class ZeroPark(PlatformService):
                       sort_key: str = 'CONVERSIONS',
                       state: Union[Literal['ACTIVE', 'PAUSED']] = None,
                       fields: List[str] = ['target', 'spent', 'conversions', 'ecpa'],
-                      **kwargs) -> List[TargetStatsMergedData]:
+                      **kwargs) -> ResultTable:
         """
         Get top widgets (sites) {filter_limit} conversions (buy) by {campaign_id}
         """
@@ -223,13 +241,10 @@ class ZeroPark(PlatformService):
         assert sort_key in (allowed := ['SPENT', 'NAME', 'GEO', 'TYPE', 'BUDGET', 'STATE',
                                         'REDIRECTS', 'CONVERSIONS', 'PAYOUT']), f"'sort_key' allowed values: {allowed}"
 
-        def calc_num_pages(url):
-            check_limit = 2  # just to get total
-            url = update_url_params(url, {'limit': check_limit})
-            resp = self.get(url).json()
-            resp_model: TargetStatsByCampaignResponse = TargetStatsByCampaignResponse.parse_obj(resp)
-            pages = resp_model.total / MAX_BODY_SIZE
-            return math.ceil(pages)
+        def fetch_page(page_num: int) -> TargetStatsByCampaignResponse:
+            page_url = update_url_params(url, {'page': page_num})
+            resp = self.get(page_url).json_content
+            return TargetStatsByCampaignResponse(**resp)
         url = urls.WIDGETS.LIST.format(campaign_id=campaignNameOrId)
         url = update_url_params(url, {'campaignId': campaignNameOrId,
                                       'interval': interval,
@@ -245,7 +260,7 @@ class ZeroPark(PlatformService):
         # Checking if Given WidgetID Exists:
         if widget_name is not None:
             url = update_url_params(url, {'targetAddresses': widget_name})
-            resp = self.get(url).json()
+            resp = self.get(url).json_content
             resp_model = TargetStatsByCampaignResponse(**resp)
             if not resp_model.elements \
                     and not self._widget_exists(
@@ -257,26 +272,30 @@ class ZeroPark(PlatformService):
             else:
                 all_widgets_stats = resp_model.elements
         else:
+            # the first page also gives the 'total' - the rest of the pages are fetched concurrently.
+            first_page = fetch_page(0)
+            num_pages_needed = math.ceil((first_page.total or 0) / MAX_BODY_SIZE)
+            rest_pages = parallel_map(fetch_page, range(1, num_pages_needed),
+                                      max_workers=MAX_PARALLEL_PAGES_REQUESTS)
             all_widgets_stats = []
-            num_pages_needed = calc_num_pages(url)
-            for page_num in range(num_pages_needed):
-                url = update_url_params(url, {'page': page_num})
-                resp = self.get(url).json()
-                resp_model = TargetStatsByCampaignResponse(**resp)
+            for resp_model in [first_page, *rest_pages]:  # merging in pages order
                 # todo validate that only the currect state is returning results
-                all_widgets_stats.extend(resp_model.elements)
-
-        merged_widget_data = [TargetStatsMergedData(**widget_data.dict(include={'id', 'target',
-                                                                                'source', 'sourceId',
-                                                                                'trafficSourceType', 'state'}),
-                                                    **widget_data.stats.dict())
-                              for widget_data in all_widgets_stats]
-        merged_widget_data.sort(key=lambda widget: widget.conversions, reverse=True)
-        filtered_sites = merged_widget_data[:int(filter_limit or 1)] if filter_limit else merged_widget_data
-        result = filter_result_by_fields(filtered_sites, fields)
+                all_widgets_stats.extend(resp_model.elements or [])
+
+        # selecting the top widgets first - merging the data just for them.
+        top_widgets_stats = sort_top(all_widgets_stats,
+                                     key=lambda widget_data: widget_data.stats.conversions,
+                                     limit=int(filter_limit) if filter_limit else None,
+                                     reverse=True)
+        filtered_sites = [TargetStatsMergedData(**widget_data.dict(include={'id', 'target',
+                                                                            'source', 'sourceId',
+                                                                            'trafficSourceType', 'state'}),
+                                                **widget_data.stats.dict())
+                          for widget_data in top_widgets_stats]
+        result = ResultTable.from_rows(filtered_sites, fields)
         return result
 
-    def widgets_top(self, filter_limit: int = DEFAULT_FILTER_NUMBER, **kwargs) -> List[TargetStatsMergedData]:
+    def widgets_top(self, filter_limit: int = DEFAULT_FILTER_NUMBER, **kwargs) -> ResultTable:
         """
         Get top widgets (sites) {filter_limit} conversions (buy) by {campaign_id}
         """
@@ -288,32 +307,29 @@ class ZeroPark(PlatformService):
                            operator: Literal['eq', 'ne', 'lt', 'gt', 'le', 'ge'] = 'le',
                            fields: List[str] = ['target', 'spent', 'conversions', 'ecpa'],
                            **kwargs,
-                           ) -> List[TargetStatsMergedData]:
+                           ) -> ResultTable:
         """
         Get list of all the widgets (Where Conversions > 1) of a given {campaignNameOrId}
         which had CPA of less than {threshold}
         """
         if 'filter_limit' in kwargs:
             del kwargs['filter_limit']
-        widgets_stats = self.widgets_stats(sort_key='SPENT', **kwargs)
-        filtered_by_conversions = [stat for stat in widgets_stats if stat['conversions'] > 0]
-        filtered_by_cpa = [stat for stat in filtered_by_conversions
-                           # the operator is used here:
-                           if getattr(stat['ecpa'], OPERATORS_MAP[operator])(float(threshold))]
-        result = filter_result_by_fields(filtered_by_cpa, fields)
-        return result
+        widgets_stats: ResultTable = self.widgets_stats(sort_key='SPENT', **kwargs)
+        with_conversions = compare(widgets_stats.column('conversions'), 'gt', 0)
+        by_cpa = compare(widgets_stats.column('ecpa'), operator, float(threshold))
+        return widgets_stats.filter(both(with_conversions, by_cpa)).select(fields)
 
-    def widgets_high_cpa(self, **kwargs) -> List[TargetStatsMergedData]:
+    def widgets_high_cpa(self, **kwargs) -> ResultTable:
         return self.widgets_filter_cpa(operator='ge', **kwargs)
 
-    def widgets_low_cpa(self, **kwargs) -> List[TargetStatsMergedData]:
+    def widgets_low_cpa(self, **kwargs) -> ResultTable:
         return self.widgets_filter_cpa(operator='le', **kwargs)
 
     def _validate_widget_filter_resp(self, resp):
         if not resp.is_json:
             raise APIError(
                 platform='ZeroPark',
-                data={**resp.json(),
+                data={**resp.json_content,
                       'url': resp.url,
                       'reason': resp.reason,
                       'errors': resp.content,
@@ -322,7 +338,7 @@ class ZeroPark(PlatformService):
             )
 
     @alias_param_campaignNameOrId
-    def widgets_turn_on_all(self, campaignNameOrId: str, **kwargs) -> dict:
+    def widgets_turn_on_all(self, campaignNameOrId: str, **kwargs) -> Tuple[dict, ErrorList]:
         kwargs.update({
             'campaignNameOrId': campaignNameOrId,
             'fields': ['target'],
@@ -332,41 +348,43 @@ class ZeroPark(PlatformService):
         paused_widgets = self.widgets_stats(**kwargs)
         widgets_names = [w['target'] for w in paused_widgets]
         url = urls.WIDGETS.RESUME.format(campaign_id=campaignNameOrId)
-        for chunk_widgets_names in chunks(widgets_names, MAX_URL_PARAMS_SIZE):
-            url = update_url_params(url, {'hashOrAddress': ','.join(chunk_widgets_names)})
-            resp = self.post(url)
+
+        def resume_chunk(chunk_widgets_names: List[str]):
+            resp = self.post(update_url_params(url, {'hashOrAddress': ','.join(chunk_widgets_names)}))
             self._validate_widget_filter_resp(resp)
+        resumed_widgets, error_list = self._write_in_chunks(resume_chunk, widgets_names)
         return {
-            'Success': True,
-            'Action': f'Turned On {len(paused_widgets)} Widgets',
+            'Success': not error_list,
+            'Action': f'Turned On {len(resumed_widgets)} Widgets',
             'Data': f'Campaign: {campaignNameOrId}',
-        }
+        }, error_list
 
     @alias_param_campaignNameOrId
     def widgets_kill_longtail(self, *,
                               campaignNameOrId: str,
                               threshold: float,
                               **kwargs,
-                              ) -> dict:
+                              ) -> Tuple[dict, ErrorList]:
         kwargs.update({
             'campaignNameOrId': campaignNameOrId,
             'fields': ['target', 'spent', 'state'],
             'time_interval': DEFAULT_TIME_INTERVAL,
         })
-        active_widgets_stats = self.widgets_stats(sort_key='SPENT', state='ACTIVE', **kwargs)
-        widgets_names_filtered_by_spent = [widget['target'] for widget in active_widgets_stats
-                                           if widget['spent'] < float(threshold)]
+        active_widgets_stats: ResultTable = self.widgets_stats(sort_key='SPENT', state='ACTIVE', **kwargs)
+        widgets_names_filtered_by_spent = select(active_widgets_stats.column('target'),
+                                                 compare(active_widgets_stats.column('spent'), 'lt', float(threshold)))
 
         url = urls.WIDGETS.PAUSE.format(campaign_id=campaignNameOrId)
-        for chunk_widgets_names in chunks(widgets_names_filtered_by_spent, MAX_URL_PARAMS_SIZE):
-            url = update_url_params(url, {'hashOrAddress': ','.join(chunk_widgets_names)})
-            resp = self.post(url)
+
+        def pause_chunk(chunk_widgets_names: List[str]):
+            resp = self.post(update_url_params(url, {'hashOrAddress': ','.join(chunk_widgets_names)}))
             self._validate_widget_filter_resp(resp)
+        paused_widgets, error_list = self._write_in_chunks(pause_chunk, widgets_names_filtered_by_spent)
         return {
-            'Success': True,
-            'Action': f'Paused {len(active_widgets_stats)} Widgets',
+            'Success': not error_list,
+            'Action': f'Paused {len(paused_widgets)} Widgets',
             'Data': f'Campaign: {campaignNameOrId}',
-        }
+        }, error_list
 
     def widget_kill_bot_traffic(self, *,
                                 campaignNameOrId: str,
@@ -1,5 +1,9 @@
+from .aggregate import Aggregation, GroupBy
 from .classes import AbstractDictForcedKey
+from .expressions import RowFilter
 from .helpers import (GENERAL_RESP_TYPE, OPERATORS_MAP, alias_param, chunks,
                       convert_list_dicts_to_csv_file, groupify_list_strings,
-                      merge_objs, format_float)
+                      merge_objs, format_float, sort_top)
 from .network import append_url_params, update_url_params
+from .table import ResultTable
+from .vectorized import both, bot_traffic_percents, compare, select
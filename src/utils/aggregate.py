@@ -0,0 +1,134 @@
+from itertools import repeat
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from errors import InvalidCommandFlagError
+
+from .helpers import as_number
+from .table import ResultTable
+
+AGGREGATE_FUNCTIONS = ('sum', 'count', 'min', 'max', 'avg')
+COUNT_FIELD = 'count'  # the number of rows in each group - always in the result
+
+# a field computed (if a row doesn't have it) from another field: (source field, computed from its value)
+ComputedField = Tuple[str, Callable[[Any], Any]]
+
+
+class Aggregation(NamedTuple):
+    function: str  # one of AGGREGATE_FUNCTIONS
+    field: str  # lowercase
+
+    @classmethod
+    def parse(cls, spec: str) -> 'Aggregation':
+        """ 'sum:spent' -> Aggregation('sum', 'spent') """
+        function, _, field = spec.lower().partition(':')
+        if function not in AGGREGATE_FUNCTIONS or not field:
+            raise InvalidCommandFlagError(message='Invalid --agg (Expected <function>:<field>, '
+                                                  f'function one of: {", ".join(AGGREGATE_FUNCTIONS)})',
+                                          flag=spec)
+        return cls(function, field)
+
+    @property
+    def name(self) -> str:
+        return f'{self.function}_{self.field}'
+
+
+class _Accumulator:
+    """ The running count, sum, min and max of a group's (numbers) values of a field """
+    __slots__ = ('count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.count, self.total, self.min, self.max = 0, 0, None, None
+
+    def add(self, value: Any):
+        if (value := as_number(value)) is None:
+            return
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+
+    def result(self, function: str) -> Optional[float]:
+        if function == 'avg':
+            return self.total / self.count if self.count else None
+        if function == 'sum':
+            return self.total
+        return getattr(self, function)
+
+
+class GroupBy:
+    """ Group-by / aggregate stage of a command's result (--group-by target_type --agg sum:spent,sum:conv):
+    its rows summarized in a row per group - the group's fields, its rows' count and the aggregations.
+    Aggregated in a single pass over the columns, with a hash-table of the groups (in the order first seen).
+    No {fields} - a single group (totals). Non-number values are skipped by the aggregations.
+
+    computed_fields -- {field: (source field, computed from its value)}, for grouping results without the field,
+                       e.g. the target-type - computed from the campaign's name.
+    """
+
+    def __init__(self, fields: Optional[List[str]] = None,
+                 aggregations: Iterable[Aggregation] = (),
+                 computed_fields: Optional[Dict[str, ComputedField]] = None):
+        self.fields = [field.lower() for field in fields or []]
+        self.aggregations = list(aggregations)
+        self.computed_fields = computed_fields or {}
+
+    def __repr__(self):
+        return f'GroupBy(fields={self.fields}, aggregations={[agg.name for agg in self.aggregations]})'
+
+    @property
+    def source_fields(self) -> List[str]:
+        """ The result's fields it's computed from - with a computed field's source (if the result lacks it) """
+        fields = []
+        for field in self.fields:
+            fields.append(field)
+            if field in self.computed_fields:
+                fields.append(self.computed_fields[field][0])
+        fields.extend(agg.field for agg in self.aggregations)
+        return list(dict.fromkeys(fields))
+
+    def _key_columns(self, columns: Dict[str, Any]) -> List[Iterable[Any]]:
+        key_columns, unknown = [], []
+        for field in self.fields:
+            if field in columns:
+                key_columns.append(columns[field])
+            elif field in self.computed_fields and (source := self.computed_fields[field][0]) in columns:
+                key_columns.append(map(self.computed_fields[field][1], columns[source]))  # computed in the pass
+            else:
+                unknown.append(field)
+        unknown.extend(agg.field for agg in self.aggregations if agg.field not in columns)
+        if unknown:
+            raise InvalidCommandFlagError(message='Unknown --group-by / --agg Fields',
+                                          flag=', '.join(dict.fromkeys(unknown)))
+        return key_columns
+
+    def aggregate(self, table: ResultTable) -> ResultTable:
+        columns = {field.lower(): column for field, column in table.columns.items()}
+        key_columns = self._key_columns(columns)
+        keys = zip(*key_columns) if key_columns else repeat((), len(table))
+        value_columns = [columns[agg.field] for agg in self.aggregations]
+        values = zip(*value_columns) if value_columns else repeat((), len(table))
+
+        groups: Dict[tuple, List[Any]] = {}  # {key: [rows count, an accumulator per aggregation]}
+        for key, row_values in zip(keys, values):
+            if (group := groups.get(key)) is None:
+                group = groups[key] = [0, *(_Accumulator() for _ in self.aggregations)]
+            group[0] += 1
+            for accumulator, value in zip(group[1:], row_values):
+                accumulator.add(value)
+
+        result = {field: [key[i] for key in groups] for i, field in enumerate(self.fields)}
+        result[COUNT_FIELD] = [group[0] for group in groups.values()]
+        for i, agg in enumerate(self.aggregations, start=1):
+            result[agg.name] = [group[i].result(agg.function) for group in groups.values()]
+        return ResultTable(result)
+
+    def apply(self, resp: Any) -> Any:
+        """ {resp} of a command's handler - aggregated (if it's rows) """
+        if isinstance(resp, ResultTable):
+            return self.aggregate(resp) if len(resp) else resp
+        if isinstance(resp, list):
+            if (rows := [row for row in resp if isinstance(row, dict) or hasattr(row, 'dict')]):
+                return self.aggregate(ResultTable.from_rows(rows))
+        return resp
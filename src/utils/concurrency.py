@@ -0,0 +1,193 @@
+import asyncio
+import threading
+import time
+from functools import wraps
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                TimeoutError, wait)
+from typing import (Any, Awaitable, Callable, Dict, Hashable, Iterable, List,
+                    Optional, Tuple, TypeVar)
+
+from config import MAX_COMMAND_WORKERS, MAX_IO_WORKERS
+from logger import logger
+
+T = TypeVar('T')
+
+_io_executor = ThreadPoolExecutor(max_workers=MAX_IO_WORKERS, thread_name_prefix='io-worker')
+# whole commands (each may use the io-workers itself) - e.g. the same command on several accounts
+_fan_out_executor = ThreadPoolExecutor(max_workers=MAX_COMMAND_WORKERS, thread_name_prefix='fan-out')
+_thread_local = threading.local()
+_event_loop: Optional[asyncio.AbstractEventLoop] = None  # of the async handlers called off the bot's loop
+_event_loop_lock = threading.Lock()
+
+
+def _in_io_worker() -> bool:
+    return getattr(_thread_local, 'in_io_worker', False)
+
+
+def parallel_map(func: Callable[[T], Any],
+                 items: Iterable[T],
+                 max_workers: int = MAX_IO_WORKERS) -> List[Any]:
+    """ Like 'map', but runs the (blocking) {func} on the io-workers pool,
+    with at most {max_workers} items in flight. Results are in the order of {items}.
+    If any call raised - the first exception (by items order) is re-raised.
+
+    Nested calls (from inside an io-worker) run sequentially, so the pool can't deadlock on itself.
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1 or _in_io_worker():
+        return [func(item) for item in items]
+
+    def run_in_worker(item: T):
+        _thread_local.in_io_worker = True
+        try:
+            return func(item)
+        finally:
+            _thread_local.in_io_worker = False
+
+    futures: List[Future] = []
+    in_flight = set()
+    for item in items:
+        if len(in_flight) >= max_workers:
+            _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+        future = _io_executor.submit(run_in_worker, item)
+        futures.append(future)
+        in_flight.add(future)
+    wait(in_flight)
+    return [future.result() for future in futures]
+
+
+def run_parallel(*funcs: Callable[[], Any]) -> List[Any]:
+    """ Runs independent (blocking) calls concurrently, and joins their results - in the same order. """
+    return parallel_map(lambda func: func(), funcs)
+
+
+def run_settled(funcs: Iterable[Callable[[], Any]],
+                timeout: Optional[float] = None) -> List[Tuple[Any, Optional[BaseException]]]:
+    """ Runs independent (blocking) calls concurrently, waiting up to {timeout} seconds for all of them.
+    Unlike 'run_parallel' - a failing or a slow call doesn't fail the others:
+    returns (result, None) or (None, exception) per call, in the same order.
+    (a timed out call gets a 'TimeoutError', and is left to finish in the background)
+    """
+    futures = [_fan_out_executor.submit(func) for func in funcs]
+    done, _ = wait(futures, timeout=timeout)
+    results = []
+    for future in futures:
+        if future not in done:
+            future.cancel()
+            results.append((None, TimeoutError(f'Timed out after {timeout} seconds')))
+        elif future.exception() is not None:
+            results.append((None, future.exception()))
+        else:
+            results.append((future.result(), None))
+    return results
+
+
+async def gather_settled(awaitables: Iterable[Awaitable[Any]],
+                         timeout: Optional[float] = None) -> List[Tuple[Any, Optional[BaseException]]]:
+    """ Same as 'run_settled', for awaitables (e.g. of the asyncio transport) - awaited concurrently """
+    async def settle(awaitable: Awaitable[Any]) -> Tuple[Any, Optional[BaseException]]:
+        try:
+            return await asyncio.wait_for(awaitable, timeout), None
+        except asyncio.TimeoutError:
+            return None, TimeoutError(f'Timed out after {timeout} seconds')
+        except Exception as e:
+            return None, e
+    return list(await asyncio.gather(*(settle(awaitable) for awaitable in awaitables)))
+
+
+def run_coroutine(coroutine: Awaitable[T]) -> T:
+    """ Runs a {coroutine} (e.g. an async handler) from blocking code - on a single background event-loop,
+    so the asyncio transport's sessions (bound to their loop) are kept between the calls. """
+    global _event_loop
+    with _event_loop_lock:
+        if _event_loop is None:
+            _event_loop = asyncio.new_event_loop()
+            threading.Thread(target=_event_loop.run_forever, name='async-handlers', daemon=True).start()
+    return asyncio.run_coroutine_threadsafe(coroutine, _event_loop).result()
+
+
+def run_in_background(func: Callable[[], Any]) -> Future:
+    """ Runs a (blocking) call without waiting for it - its failure is logged. """
+    def run():
+        try:
+            return func()
+        except Exception as e:
+            logger.error(f'[!] Background {getattr(func, "__qualname__", func)} Failed: {e!r}')
+    return _fan_out_executor.submit(run)
+
+
+class SingleFlight:
+    """ Coalesces concurrent calls with the same key: while a call is in flight,
+    identical calls wait for it and get its result (or its exception) instead of calling again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+
+    def do(self,
+           key: Hashable,
+           func: Callable[[], T],
+           share: Callable[[T], T] = lambda result: result) -> T:
+        """ share -- applied on the result handed to the waiting callers (e.g. to copy it). """
+        with self._lock:
+            future = self._in_flight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = self._in_flight[key] = Future()
+        if not is_leader:
+            return share(future.result())
+        try:
+            result = func()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+
+class TokenBucket:
+    """ Rate-limiter: {rate} calls per second on average, with bursts of up to {capacity} calls.
+    'acquire' blocks until a token is available - shared by all the threads using the bucket.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait_time = (1 - self._tokens) / self.rate
+            time.sleep(wait_time)
+
+
+def run_once(factory: Callable[[], T]) -> Callable[[], T]:
+    """ Decorator for a (no-args) factory: it's called once, on first use (thread-safe),
+    and later calls return the same object. 'factory.is_created()' - whether it's already created.
+    """
+    lock = threading.Lock()
+    created = []
+
+    @wraps(factory)
+    def wrapper() -> T:
+        if not created:
+            with lock:
+                if not created:
+                    created.append(factory())
+        return created[0]
+    wrapper.is_created = lambda: bool(created)
+    return wrapper
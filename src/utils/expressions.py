@@ -0,0 +1,224 @@
+import operator as operators
+import re
+from array import array
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Set, Union
+
+from errors import InvalidCommandFlagError
+
+from .helpers import OPERATORS_MAP, as_number
+from .table import ResultTable
+from .vectorized import NUMPY_DTYPES, Mask, both, compare, either, negate
+
+# 'cpa>5 and (spent>=10 or target_type=mob)' - comparisons of a field and a number / string
+TOKEN_RE = re.compile(r'\s*(?:(?P<number>-?\d+(?:\.\d+)?(?![\w.]))'
+                      r'|(?P<string>"[^"]*"|\'[^\']*\')'
+                      r'|(?P<operator>>=|<=|!=|==|=|>|<)'
+                      r'|(?P<paren>[()])'
+                      r'|(?P<word>[\w.-]+))')
+EXPRESSION_OPERATORS = {
+    '>': 'gt',
+    '>=': 'ge',
+    '<': 'lt',
+    '<=': 'le',
+    '=': 'eq',
+    '==': 'eq',
+    '!=': 'ne',
+}
+KEYWORDS = ('and', 'or', 'not')
+EXPECTED_TOKENS_NAMES = {
+    'word': 'a field',
+    'operator': f'an operator ({" ".join(EXPRESSION_OPERATORS)})',
+    'paren': '")"',
+    'value': 'a value',
+}
+
+
+def _invalid(expression: str, reason: str) -> InvalidCommandFlagError:
+    return InvalidCommandFlagError(message='Invalid --where Expression', flag=f'"{expression}" ({reason})')
+
+
+def _matches(cell: Any, compare_values: Callable[[Any, Any], bool], value: Union[float, str]) -> bool:
+    """ a cell of any type - compared as a number to a number, else as a (case-insensitive) string.
+    None (or a non-number compared to a number) never matches. """
+    if cell is None:
+        return False
+    if isinstance(value, str):
+        return compare_values(str(cell).lower(), value)
+    if (cell := as_number(cell)) is None:
+        return False
+    return compare_values(cell, value)
+
+
+class Comparison(NamedTuple):
+    field: str  # lowercase
+    operator: str  # a key of OPERATORS_MAP
+    value: Union[float, str]  # a string - lowercase
+
+    def evaluate(self, row: Dict[str, Any]) -> bool:
+        return _matches(row.get(self.field), getattr(operators, OPERATORS_MAP[self.operator]), self.value)
+
+    def mask(self, columns: Dict[str, Any]) -> Mask:
+        column = columns[self.field]
+        if isinstance(column, array) and column.typecode in NUMPY_DTYPES and not isinstance(self.value, str):
+            return compare(column, self.operator, self.value)
+        compare_values = getattr(operators, OPERATORS_MAP[self.operator])
+        return [_matches(cell, compare_values, self.value) for cell in column]
+
+
+class Not(NamedTuple):
+    operand: Any
+
+    def evaluate(self, row: Dict[str, Any]) -> bool:
+        return not self.operand.evaluate(row)
+
+    def mask(self, columns: Dict[str, Any]) -> Mask:
+        return negate(self.operand.mask(columns))
+
+
+class BinaryOperation(NamedTuple):
+    keyword: str  # 'and' | 'or'
+    left: Any
+    right: Any
+
+    def evaluate(self, row: Dict[str, Any]) -> bool:
+        if self.keyword == 'and':
+            return self.left.evaluate(row) and self.right.evaluate(row)
+        return self.left.evaluate(row) or self.right.evaluate(row)
+
+    def mask(self, columns: Dict[str, Any]) -> Mask:
+        combine = both if self.keyword == 'and' else either
+        return combine(self.left.mask(columns), self.right.mask(columns))
+
+
+class _ExpressionParser:
+    """ Recursive-descent parser: or_expr := and_expr ('or' and_expr)*, and_expr := not_expr ('and' not_expr)*,
+    not_expr := 'not' not_expr | '(' or_expr ')' | field operator value """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self.tokens: List[tuple] = []
+        position, expression = 0, expression.rstrip()
+        while position < len(expression):
+            if not (match := TOKEN_RE.match(expression, position)) or match.end() == position:
+                raise _invalid(self.expression, f'unexpected "{expression[position:].strip()}"')
+            kind = match.lastgroup
+            token = match.group(kind)
+            if kind == 'word' and token.lower() in KEYWORDS:
+                kind, token = 'keyword', token.lower()
+            self.tokens.append((kind, token))
+            position = match.end()
+        self.position = 0
+        self.fields: Set[str] = set()
+
+    def _peek(self) -> Optional[tuple]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def _next(self, expected: str) -> str:
+        token = self._peek()
+        if token is None or token[0] != expected:
+            found = f'"{token[1]}"' if token else 'the end'
+            raise _invalid(self.expression, f'expected {EXPECTED_TOKENS_NAMES[expected]}, found {found}')
+        self.position += 1
+        return token[1]
+
+    def parse(self):
+        if not self.tokens:
+            raise _invalid(self.expression, 'empty')
+        tree = self._or_expression()
+        if (token := self._peek()) is not None:
+            raise _invalid(self.expression, f'unexpected "{token[1]}"')
+        return tree
+
+    def _binary_expression(self, keyword: str, parse_operand: Callable):
+        tree = parse_operand()
+        while self._peek() == ('keyword', keyword):
+            self.position += 1
+            tree = BinaryOperation(keyword, tree, parse_operand())
+        return tree
+
+    def _or_expression(self):
+        return self._binary_expression('or', self._and_expression)
+
+    def _and_expression(self):
+        return self._binary_expression('and', self._not_expression)
+
+    def _not_expression(self):
+        token = self._peek()
+        if token == ('keyword', 'not'):
+            self.position += 1
+            return Not(self._not_expression())
+        if token == ('paren', '('):
+            self.position += 1
+            tree = self._or_expression()
+            self._next('paren')
+            return tree
+        return self._comparison()
+
+    def _comparison(self) -> Comparison:
+        field = self._next('word').lower()
+        operator = EXPRESSION_OPERATORS[self._next('operator')]
+        kind, value = self._peek() or (None, None)
+        if kind == 'number':
+            value = float(value)
+        elif kind == 'string':
+            value = value[1:-1].lower()
+        elif kind == 'word':
+            value = value.lower()
+        else:
+            self._next('value')  # raises
+        self.position += 1
+        self.fields.add(field)
+        return Comparison(field, operator, value)
+
+
+class RowFilter:
+    """ A '--where' expression (e.g. "cpa>5 and spent>=10"), compiled once into a predicate of a result's rows.
+    Parsed into comparisons, combined with and / or / not (and parentheses) - never evaluated as python.
+    Fields are case-insensitive, and a string matches case-insensitively. A missing value (None) never matches.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        parser = _ExpressionParser(expression)
+        self._tree = parser.parse()
+        self.fields = parser.fields
+
+    def __repr__(self):
+        return f'RowFilter({self.expression!r})'
+
+    def _check_fields(self, fields: Set[str]):
+        if (unknown := self.fields - fields):
+            raise InvalidCommandFlagError(message='Unknown --where Fields', flag=', '.join(sorted(unknown)))
+
+    def filter_table(self, table: ResultTable) -> ResultTable:
+        if not len(table):
+            return table
+        columns = {field.lower(): column for field, column in table.columns.items()}
+        self._check_fields(set(columns))
+        return table.filter(self._tree.mask(columns))
+
+    def filter_rows(self, rows: List[Any]) -> List[Any]:
+        """ The dicts (or models) of {rows} which match - other rows are kept as-is """
+        filtered, present = [], set()
+        keys_maps: Dict[tuple, Dict[str, Any]] = {}  # rows of the same model share their keys
+        for row in rows:
+            row_dict = row.dict() if hasattr(row, 'dict') and not isinstance(row, dict) else row
+            if not isinstance(row_dict, dict):
+                filtered.append(row)
+                continue
+            if (keys_map := keys_maps.get(row_keys := tuple(row_dict))) is None:
+                keys_map = keys_maps[row_keys] = {str(key).lower(): key for key in row_keys}
+                present.update(keys_map)
+            if self._tree.evaluate({field: row_dict[keys_map[field]] for field in self.fields if field in keys_map}):
+                filtered.append(row)
+        if keys_maps:
+            self._check_fields(present)
+        return filtered
+
+    def apply(self, resp: Any) -> Any:
+        """ {resp} of a command's handler - just its matching rows (if it's rows) """
+        if isinstance(resp, ResultTable):
+            return self.filter_table(resp)
+        if isinstance(resp, list):
+            return self.filter_rows(resp)
+        return resp
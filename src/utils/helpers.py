@@ -1,9 +1,10 @@
 import csv
+import heapq
 import re
 import tempfile
 from functools import reduce, wraps
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 GENERAL_RESP_TYPE = Union[str, List[Dict[Union[str, int], Union[str, int, float, bool]]]]
 
@@ -40,6 +41,19 @@ def chunks(lst: Iterable, n: int):
         yield lst[i:i + n]
 
 
+def sort_top(items: Iterable, /,
+             key: Callable[[Any], Any],
+             limit: Optional[int] = None,
+             reverse: bool = False) -> List:
+    """ Same as 'sorted(items, key=key, reverse=reverse)[:limit]' (including the order of ties),
+    but when {limit} is given - selects with a bounded heap, without sorting all the items. """
+    if not limit:
+        return sorted(items, key=key, reverse=reverse)
+    if reverse:
+        return heapq.nlargest(limit, items, key=key)
+    return heapq.nsmallest(limit, items, key=key)
+
+
 def merge_objs(*list_dicts: List[Dict], merge_types: Tuple[type] = (int, float)) -> dict:
     """ MERGED 2 dictionaries with the (int, float) types only.
     Every other Value Type will be OVERRIDDEN with the value from the SECOND DICT."""
@@ -80,6 +94,9 @@ def is_valid_uuid4(string: str):
 
 
 def convert_list_dicts_to_csv_file(list_dicts: GENERAL_RESP_TYPE) -> Path:
+    from .table import ResultTable  # (imports this module)
+    if isinstance(list_dicts, ResultTable):
+        return convert_table_to_csv_file(list_dicts)
     assert list_dicts and isinstance(list_dicts, list) and list_dicts[0] and isinstance(
         list_dicts[0], dict), 'Invalid list_dicts Type.'
     keys = list(set([key for obj in list_dicts for key in obj]))
@@ -92,5 +109,25 @@ def convert_list_dicts_to_csv_file(list_dicts: GENERAL_RESP_TYPE) -> Path:
     return Path(output_file.name)
 
 
+def convert_table_to_csv_file(table: 'ResultTable') -> Path:
+    """ Writes the rows straight from the table's columns """
+    assert len(table), 'Empty Table.'
+    with tempfile.NamedTemporaryFile('w', encoding='utf8', suffix='.csv', delete=False, newline='') as output_file:
+        writer = csv.writer(output_file)
+        writer.writerow(table.fields)
+        writer.writerows(zip(*table.columns.values()))
+    return Path(output_file.name)
+
+
 def format_float(num: Union[str, int, float]):
     return float(f'{num:0>5.2f}')
+
+
+def as_number(value: Any) -> Optional[Union[int, float]]:
+    """ {value} as a number (a bool / numeric string - as a float). None - if it isn't one """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,153 @@
+import json
+from array import array
+from operator import itemgetter
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Sequence, Union)
+
+from .helpers import sort_top
+from .vectorized import NUMPY_DTYPES, as_numpy, compare, np
+
+Column = Union[array, List[Any]]
+
+
+def make_column(values: Iterable[Any]) -> Column:
+    """ A typed array for an all-ints / all-floats column (8 bytes per value, no object per value),
+    else a list. """
+    values = list(values)
+    if values and all(type(value) is int for value in values):
+        try:
+            return array('q', values)
+        except OverflowError:
+            return values
+    if values and all(type(value) is float for value in values):
+        return array('d', values)
+    return values
+
+
+def _take(column: Column, indices: Sequence[int]) -> Column:
+    if np is not None and isinstance(indices, np.ndarray):
+        if isinstance(column, array) and column.typecode in NUMPY_DTYPES:
+            return array(column.typecode, as_numpy(column)[indices].tobytes())
+        indices = indices.tolist()
+    if len(indices) < 2:
+        values = [column[i] for i in indices]
+    else:
+        values = itemgetter(*indices)(column)
+    return array(column.typecode, values) if isinstance(column, array) else list(values)
+
+
+def _row_dict(row: Any) -> Dict[str, Any]:
+    return row if isinstance(row, dict) else row.dict()
+
+
+class ResultTable:
+    """ A columnar result-set: {field: column of values}, all the columns of the same length.
+    Iterating it gives its rows as dicts - so a handler may return it instead of a list of dicts,
+    while projection, filtering and sorting (top-K) run on the columns, without copying rows.
+    """
+
+    def __init__(self, columns: Optional[Dict[str, Iterable[Any]]] = None):
+        self.columns: Dict[str, Column] = {field: make_column(values)
+                                           for field, values in (columns or {}).items()}
+        lengths = {len(column) for column in self.columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f'Columns of different lengths: {lengths}')
+        self._length = lengths.pop() if lengths else 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any],
+                  fields: Optional[List[str]] = None,
+                  case_sensitive=False) -> 'ResultTable':
+        """ The table of {rows} (dicts or models) - just their {fields} (all - if not given).
+        Fields are matched case-insensitively (named in lowercase), unless {case_sensitive}.
+        A field some rows miss is None in them - a field all the (non-zero) rows miss is dropped.
+        """
+        rows = [_row_dict(row) for row in rows]
+        if not fields:
+            fields = list(dict.fromkeys(key for row in rows for key in row))
+            case_sensitive = True
+        elif not case_sensitive:
+            fields = [field.lower() for field in fields]
+        values: Dict[str, List[Any]] = {field: [] for field in fields}
+        present = set()
+        keys_maps: Dict[tuple, Dict[str, Any]] = {}  # rows of the same model share their keys
+        for row in rows:
+            if case_sensitive:
+                keys_map = row
+            elif (keys_map := keys_maps.get(row_keys := tuple(row))) is None:
+                keys_map = keys_maps[row_keys] = {str(key).lower(): key for key in row_keys}
+            for field in fields:
+                if field in keys_map:
+                    present.add(field)
+                    values[field].append(row[field if case_sensitive else keys_map[field]])
+                else:
+                    values[field].append(None)
+        return cls({field: values[field] for field in fields if field in present or not rows})
+
+    @property
+    def fields(self) -> List[str]:
+        return list(self.columns)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        fields = self.fields
+        for values in zip(*self.columns.values()):
+            yield dict(zip(fields, values))
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return {field: column[index] for field, column in self.columns.items()}
+
+    def __repr__(self):
+        return f'ResultTable(fields={self.fields}, rows={len(self)})'
+
+    def column(self, field: str) -> Column:
+        return self.columns[field]
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return list(self)
+
+    def take(self, indices: Sequence[int]) -> 'ResultTable':
+        """ The rows at {indices} (in their order) """
+        table = ResultTable()
+        table.columns = {field: _take(column, indices) for field, column in self.columns.items()}
+        table._length = len(indices)
+        return table
+
+    def select(self, fields: Optional[List[str]], case_sensitive=False) -> 'ResultTable':
+        """ Projection: just the existing of {fields} (all - if not given) - sharing the columns """
+        if not fields:
+            return self
+        table = ResultTable()
+        by_name = self.columns if case_sensitive else {field.lower(): column for field, column in self.columns.items()}
+        for field in fields:
+            field = field if case_sensitive else field.lower()
+            if field in by_name:
+                table.columns[field] = by_name[field]
+        table._length = self._length
+        return table
+
+    def filter(self, mask: Iterable[bool]) -> 'ResultTable':
+        if np is not None and isinstance(mask, np.ndarray):
+            return self.take(np.flatnonzero(mask))
+        return self.take([i for i, keep in enumerate(mask) if keep])
+
+    def where(self, field: str,
+              operator: str,
+              value: Any) -> 'ResultTable':
+        """ The rows whose {field} is {operator} (a key of OPERATORS_MAP - 'gt', 'le', ...) {value} -
+        vectorized for a numbers column (if numpy is installed) """
+        return self.filter(compare(self.columns[field], operator, value))
+
+    def sort(self, key: Union[str, Callable[[int], Any]],
+             reverse: bool = False,
+             limit: Optional[int] = None) -> 'ResultTable':
+        """ Sorted by the field {key} (or by {key}(row index)) - just the top {limit} rows, if given """
+        if isinstance(key, str):
+            column = self.columns[key]
+            key = column.__getitem__
+        return self.take(sort_top(range(len(self)), key=key, limit=limit, reverse=reverse))
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dicts(), default=str)
@@ -0,0 +1,77 @@
+import operator as operators
+from array import array
+from typing import Any, List, Sequence, Union
+
+try:
+    import numpy as np
+except ImportError:  # falling back to evaluating per value
+    np = None
+
+from .helpers import OPERATORS_MAP
+
+# below this number of values - evaluating per value is faster than converting to numpy arrays.
+MIN_VECTORIZED_SIZE = 512
+
+Values = Union[array, Sequence[Any]]
+Mask = Union['np.ndarray', List[bool]]
+NUMPY_DTYPES = {'d': 'float64', 'q': 'int64'}
+
+
+def _vectorize(*columns: Values) -> bool:
+    """ Just typed (all-numbers) columns - other values are compared as python objects """
+    return np is not None and all(isinstance(column, array) and column.typecode in NUMPY_DTYPES
+                                  and len(column) >= MIN_VECTORIZED_SIZE for column in columns)
+
+
+def as_numpy(column: array) -> 'np.ndarray':
+    return np.frombuffer(column, dtype=NUMPY_DTYPES[column.typecode])  # a view - no copy
+
+
+def compare(values: Values, operator: str, value: Any) -> Mask:
+    """ Mask of {values} which are {operator} (a key of OPERATORS_MAP - 'gt', 'le', ...) {value}.
+    None values never match.
+    """
+    compare_values = getattr(operators, OPERATORS_MAP[operator])
+    if not isinstance(value, (int, float)) or isinstance(value, bool):
+        pass
+    elif np is not None and isinstance(values, np.ndarray):  # e.g. a computed metric
+        return compare_values(values, value)
+    elif _vectorize(values):
+        return compare_values(as_numpy(values), value)
+    return [cell is not None and compare_values(cell, value) for cell in values]
+
+
+def both(mask: Mask, other_mask: Mask) -> Mask:
+    if np is not None and isinstance(mask, np.ndarray) and isinstance(other_mask, np.ndarray):
+        return mask & other_mask
+    return [keep and other_keep for keep, other_keep in zip(mask, other_mask)]
+
+
+def either(mask: Mask, other_mask: Mask) -> Mask:
+    if np is not None and isinstance(mask, np.ndarray) and isinstance(other_mask, np.ndarray):
+        return mask | other_mask
+    return [keep or other_keep for keep, other_keep in zip(mask, other_mask)]
+
+
+def negate(mask: Mask) -> Mask:
+    if np is not None and isinstance(mask, np.ndarray):
+        return ~mask
+    return [not keep for keep in mask]
+
+
+def bot_traffic_percents(tracker_clicks: Values, platform_clicks: Values) -> Union['np.ndarray', List[float]]:
+    """ Per widget: the percent of the platform's clicks which the tracker didn't get -
+    100 - tracker_clicks / platform_clicks * 100 (0 - for no platform clicks) """
+    if _vectorize(tracker_clicks, platform_clicks):
+        tracker, platform = as_numpy(tracker_clicks), as_numpy(platform_clicks)
+        ratios = np.divide(tracker, platform, out=np.ones(len(platform)), where=platform != 0)
+        return 100 - ratios * 100
+    return [100 - (tracker / platform * 100) if platform else 0
+            for tracker, platform in zip(tracker_clicks, platform_clicks)]
+
+
+def select(items: Sequence[Any], mask: Mask) -> List[Any]:
+    """ The {items} where {mask} is true """
+    if np is not None and isinstance(mask, np.ndarray):
+        return [items[i] for i in np.flatnonzero(mask).tolist()]
+    return [item for item, keep in zip(items, mask) if keep]
@@ -82,3 +82,11 @@ async def test_spent_all_campaigns_30d():
     data = data if data else 'no results for spent over 0'
     assert log_resp(data, f'{COMMAND}_all_campaigns_30d.txt')
     assert len(data) > 0
+
+
+@pytest.mark.asyncio
+async def test_spent_all_accounts_3d():
+    data = await handle_content(f'/{PLATFORM}* {COMMAND} 3d /fields:id,name,spent')
+    data = data if data else 'no results for spent over 0'
+    assert log_resp(data, f'{COMMAND}_all_accounts_3d.txt')
+    assert len(data) > 0
@@ -0,0 +1,47 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+from bot.controllers.command import CommandParser
+from services import MGid, Thrive, ZeroPark
+
+
+@pytest.fixture
+def fake_api_server():
+    """ Local HTTP server standing in for the platforms' APIs: serve(respond) starts it, and returns its url.
+    respond(path) -> the response's body (dumped as json), or (status_code, content_type, body)
+    serve.requests -- the requests served: (method, path, headers) """
+    servers = []
+
+    def serve(respond) -> str:
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                serve.requests.append((self.command, self.path, dict(self.headers)))
+                resp = respond(self.path)
+                status_code, content_type, body = resp if isinstance(resp, tuple) else \
+                    (200, 'application/json', json.dumps(resp))
+                self.send_response(status_code)
+                self.send_header('Content-Type', content_type)
+                self.end_headers()
+                self.wfile.write(body.encode())
+
+            def log_message(self, *args):
+                pass
+
+        server = HTTPServer(('127.0.0.1', 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f'http://127.0.0.1:{server.server_address[1]}'
+
+    serve.requests = []
+    yield serve
+    for server in servers:
+        server.shutdown()
+
+
+@pytest.fixture
+def command_parser():
+    thrive = Thrive('test-api-key', 'test-install-id')
+    return CommandParser([MGid('1234', 'test-token', thrive)], ZeroPark('test-token', thrive), thrive)
@@ -0,0 +1,71 @@
+import pytest
+
+from bot.controllers.command import CommandParser
+from bot.controllers.message import MessageHandler
+from services import MGid, Thrive, ZeroPark
+from services.mgid import urls as mgid_urls
+from services.thrive import urls as thrive_urls
+from utils.concurrency import run_coroutine
+
+TEST_CLIENT_ID = '1234'
+TEST_TOKEN = 'test-token'
+THRIVE_CAMPAIGNS = {'error': False, 'data': [{'campId': 123, 'name': 'one'}, {'campId': 124, 'name': 'two'}]}
+MGID_CAMPAIGNS = {'1': {'id': 1, 'name': '123 one MOB'}, '2': {'id': 2, 'name': '124 two DESK'}}
+
+
+@pytest.mark.asyncio
+async def test_async_transport_thrive_headers(fake_api_server):
+    thrive = Thrive('test-api-key', 'test-install-id')
+    thrive.base_url = fake_api_server(lambda path: {'ok': True})
+    resp = await thrive.aio.get(thrive_urls.CAMPAIGNS.LIST_CAMPAIGNS, headers={'X-Request': 'test'})
+    await thrive.aio.close()
+    assert resp.json_content == {'ok': True}
+    _, path, headers = fake_api_server.requests[0]
+    assert path == thrive_urls.CAMPAIGNS.LIST_CAMPAIGNS
+    # the request's headers are added to the session's
+    assert (headers['apiKey'], headers['installId'], headers['X-Request']) == ('test-api-key', 'test-install-id', 'test')
+
+
+@pytest.mark.asyncio
+async def test_async_transport_mgid_url_hooks(fake_api_server):
+    mgid = MGid(TEST_CLIENT_ID, TEST_TOKEN, Thrive('test-api-key', 'test-install-id'))
+    mgid.base_url = fake_api_server(lambda path: {'ok': True})
+    await mgid.aio.get(mgid_urls.CAMPAIGNS.LIST)
+    await mgid.aio.close()
+    _, path, _ = fake_api_server.requests[0]
+    assert path.startswith(mgid_urls.CAMPAIGNS.LIST.format(client_id=TEST_CLIENT_ID))
+    assert f'token={TEST_TOKEN}' in path
+
+
+@pytest.fixture
+def message_handler(fake_api_server):
+    base_url = fake_api_server(lambda path: THRIVE_CAMPAIGNS if path.startswith('/campaigns') else MGID_CAMPAIGNS)
+    thrive = Thrive('test-api-key', 'test-install-id')
+    mgid_instances = [MGid(TEST_CLIENT_ID, TEST_TOKEN, thrive), MGid('5678', TEST_TOKEN, thrive)]
+    for service in (thrive, *mgid_instances):
+        service.base_url = base_url
+    message_handler = MessageHandler()
+    message_handler._command_parser = CommandParser(mgid_instances, ZeroPark(TEST_TOKEN, thrive), thrive)
+    message_handler.services = [thrive, *mgid_instances]
+    return message_handler
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize('command, expected', [
+    ('/thrive list', [{'name': 'one', 'id': 123, 'source': None}, {'name': 'two', 'id': 124, 'source': None}]),
+    ('/mgid* list', [{'account': account, 'name': name, 'id': id}
+                     for account in (0, 1) for id, name in ((1, '123 one MOB'), (2, '124 two DESK'))]),
+])
+async def test_list_command_awaited_on_async_transport(message_handler, command, expected):
+    resp, errors, _ = await message_handler.handle_message_async(command, format_output=False)
+    for service in message_handler.services:
+        await service.aio.close()
+    assert (resp, errors) == (expected, [])
+
+
+def test_async_handler_run_off_the_event_loop(message_handler):
+    command_handler, command_args = message_handler.command_parser.parse_command('/thrive list')
+    for _ in range(2):  # on the same background event-loop
+        resp, _, _ = message_handler._run_command(command_handler, command_args, format_output=False)
+        assert [campaign['id'] for campaign in resp] == [123, 124]
+    run_coroutine(message_handler.services[0].aio.close())
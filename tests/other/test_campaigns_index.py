@@ -0,0 +1,102 @@
+import pytest
+
+from errors import InvalidCampaignIDError
+from services import MGid, Thrive, ZeroPark
+from services.common.campaigns_index import diff_campaigns
+from services.common.metadata_store import MetadataStore
+
+# the APIs' listings - with int ids
+MGID_CAMPAIGNS = {'1': {'id': 1, 'name': '123 one MOB'}, '2': {'id': 2, 'name': '124 two DESK'}}
+THRIVE_CAMPAIGNS = {'error': False, 'data': [{'campId': 123, 'name': 'one'}, {'campId': 124, 'name': 'two'}]}
+
+
+def test_diff_campaigns():
+    old = {'1': {'id': '1', 'name': 'one'}, '2': {'id': '2', 'name': 'two'}}
+    new = {'2': {'id': '2', 'name': 'two renamed'}, '3': {'id': '3', 'name': 'three'}}
+    diff = diff_campaigns(old, new)
+    assert diff.added == ['3']
+    assert diff.removed == ['1']
+    assert diff.renamed == ['2']
+    assert not diff_campaigns(new, dict(new))
+
+
+def test_campaigns_index_refresh_swaps_snapshot(monkeypatch):
+    monkeypatch.setattr('services.common.campaigns_index.metadata_store', MetadataStore(''))
+    zeropark = ZeroPark('test-token', Thrive('test-api-key', 'test-install-id'))
+    listed = {'1': {'id': '1', 'name': 'one'}}
+    monkeypatch.setattr(zeropark, '_list_campaigns_index', lambda: dict(listed))
+
+    snapshot = zeropark.campaigns
+    assert zeropark.campaigns_age < 60
+    assert not zeropark.reload_campaigns()
+    assert zeropark.campaigns is snapshot  # unchanged - kept
+
+    listed['2'] = {'id': '2', 'name': 'two'}
+    assert zeropark.reload_campaigns().added == ['2']
+    assert '2' in zeropark.campaigns
+    assert '2' not in snapshot
+
+
+def test_stale_campaigns_index_refreshed_in_background(monkeypatch):
+    monkeypatch.setattr('services.common.campaigns_index.metadata_store', MetadataStore(''))
+    zeropark = ZeroPark('test-token', Thrive('test-api-key', 'test-install-id'))
+    listed = {'1': {'id': '1', 'name': 'one'}}
+    monkeypatch.setattr(zeropark, '_list_campaigns_index', lambda: dict(listed))
+    zeropark.campaigns
+    listed['2'] = {'id': '2', 'name': 'two'}
+    zeropark._campaigns_updated_at -= 3600
+
+    stale_snapshot = zeropark.campaigns  # served, while refreshed
+    assert '2' not in stale_snapshot
+    zeropark._campaigns_refresh.result(timeout=5)
+    assert '2' in zeropark.campaigns
+    assert zeropark.campaigns_age < 60
+
+
+def test_empty_campaigns_index_loaded_once(monkeypatch):
+    monkeypatch.setattr('services.common.campaigns_index.metadata_store', MetadataStore(''))
+    zeropark = ZeroPark('test-token', Thrive('test-api-key', 'test-install-id'))
+    listings = []
+    monkeypatch.setattr(zeropark, '_list_campaigns_index', lambda: listings.append(1) or {})
+    snapshot = zeropark.campaigns
+    assert len(snapshot) == 0
+    assert zeropark.campaigns is snapshot  # an account without campaigns isn't listed again on each access
+    assert len(listings) == 1
+
+
+def test_campaign_names_index():
+    zeropark = ZeroPark('test-token', Thrive('test-api-key', 'test-install-id'))
+    zeropark.campaigns = {'1': {'id': '1', 'name': '123 Campaign MOB'},
+                          '2': {'id': '2', 'name': '124 Campaign Desktop'},
+                          '3': {'id': '3', 'name': 'No Tracker Campaign'}}
+    names = zeropark.campaigns.names
+    assert names.get('123 Campaign MOB')[:3] == ('1', '123 Campaign MOB', '123')
+    assert names.get('No Tracker Campaign').thrive_id is None
+    assert [ref.id for ref in names.by_prefix('12')] == ['1', '2']
+    assert [ref.id for ref in names.by_prefix('124 campaign')] == ['2']
+    assert names.by_prefix('9') == []
+
+
+def test_get_campaign_by_id_or_name():
+    zeropark = ZeroPark('test-token', Thrive('test-api-key', 'test-install-id'))
+    zeropark.campaigns = {'1': {'id': '1', 'name': '123 Campaign MOB'}}
+    assert zeropark.get_campaign(1) is zeropark.get_campaign('123 Campaign MOB') is zeropark.campaigns['1']
+    with pytest.raises(InvalidCampaignIDError):
+        zeropark.get_campaign('123 campaign')
+
+
+def test_unchanged_int_ids_listing_keeps_snapshot(monkeypatch, fake_api_server):
+    monkeypatch.setattr('services.common.campaigns_index.metadata_store', MetadataStore(''))
+    base_url = fake_api_server(lambda path: THRIVE_CAMPAIGNS if path.startswith('/campaigns/get') else MGID_CAMPAIGNS)
+    thrive = Thrive('test-api-key', 'test-install-id')
+    mgid = MGid('1234', 'test-token', thrive)
+    for service in (thrive, mgid):
+        service.base_url = base_url
+        snapshot = service.campaigns
+        assert len(snapshot) == 2
+        assert not service.reload_campaigns()
+        assert service.campaigns is snapshot
+        service.list_campaigns()  # listing doesn't change the index
+        assert service.campaigns is snapshot
+    assert thrive.campaigns['123'] == 'one'
+    assert mgid.campaigns['1']['name'] == '123 one MOB'
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import pytest
+
+from config import WRITE_REQUEST_RETRIES
+from errors import APIError
+from services import Thrive, ZeroPark
+from utils.concurrency import SingleFlight, TokenBucket, run_parallel
+
+
+def test_single_flight_coalesces_concurrent_calls():
+    single_flight = SingleFlight()
+    calls = []
+
+    def slow_call():
+        calls.append(threading.get_ident())
+        time.sleep(0.2)
+        return {'result': 1}
+
+    results = run_parallel(*[lambda: single_flight.do('key', slow_call) for _ in range(4)])
+    assert len(calls) == 1
+    assert results == [{'result': 1}] * 4
+
+
+def test_single_flight_shares_exception():
+    single_flight = SingleFlight()
+
+    def failing_call():
+        time.sleep(0.2)
+        raise ValueError('failed')
+
+    with pytest.raises(ValueError):
+        run_parallel(*[lambda: single_flight.do('key', failing_call) for _ in range(3)])
+    assert single_flight.do('key', lambda: 'called again') == 'called again'
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=1)
+    started_at = time.monotonic()
+    for _ in range(6):
+        bucket.acquire()
+    assert time.monotonic() - started_at >= 0.2
+
+
+def test_write_in_chunks_reports_failed_chunks():
+    zeropark = ZeroPark('test-token', Thrive('test-api-key', 'test-install-id'))
+    attempts = []
+
+    def write_chunk(chunk):
+        attempts.append(chunk)
+        if 'bad' in chunk:
+            raise APIError(platform='ZeroPark', message='Failed Writing')
+
+    widgets = ['bad'] + [f'widget-{i}' for i in range(5)]
+    written, errors = zeropark._write_in_chunks(write_chunk, widgets, chunk_size=2)
+    assert written == widgets[2:]
+    assert len(errors) == 1
+    assert errors[0]['message'] == 'Failed Writing'
+    assert errors[0]['attempts'] == WRITE_REQUEST_RETRIES + 1
+    assert len(attempts) == 2 + WRITE_REQUEST_RETRIES + 1
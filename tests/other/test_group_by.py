@@ -0,0 +1,61 @@
+import pytest
+
+from bot.controllers.command import COMPUTED_FIELDS, GROUP_BY_KEY
+from bot.controllers.message import MessageHandler
+from errors import InvalidCommandFlagError
+from utils import Aggregation, GroupBy, ResultTable
+
+ROWS = [{'id': 1, 'name': '1234 first MOB', 'Spent': 5, 'conv': 1, 'cpa': 5.0},
+        {'id': 2, 'name': '1235 second DESK', 'Spent': 2.5, 'conv': 0, 'cpa': None},
+        {'id': 3, 'name': '1236 third MOB', 'Spent': 1, 'conv': 2, 'cpa': 0.5}]
+
+
+def test_group_by_aggregates_rows_and_table_alike():
+    group_by = GroupBy(['name'], [Aggregation.parse('sum:spent'), Aggregation.parse('avg:cpa')])
+    expected = [{'name': row['name'], 'count': 1, 'sum_spent': row['Spent'], 'avg_cpa': row['cpa']} for row in ROWS]
+    assert group_by.apply(ROWS).to_dicts() == expected
+    assert group_by.apply(ResultTable.from_rows(ROWS)).to_dicts() == expected
+
+
+def test_group_by_computed_field():
+    group_by = GroupBy(['target_type'],
+                       [Aggregation.parse(spec) for spec in ('sum:spent', 'sum:conv', 'max:cpa', 'count:cpa')],
+                       computed_fields=COMPUTED_FIELDS)
+    summary = {row['target_type']: row for row in group_by.apply(ROWS)}
+    assert len(summary) == 2
+    mobile = next(row for row in summary.values() if row['count'] == 2)
+    assert (mobile['sum_spent'], mobile['sum_conv'], mobile['max_cpa'], mobile['count_cpa']) == (6, 3, 5.0, 2)
+
+
+def test_aggregate_without_group_by_totals():
+    assert GroupBy(aggregations=[Aggregation.parse('sum:Spent')]).apply(ROWS).to_dicts() == \
+        [{'count': 3, 'sum_spent': 8.5}]
+    assert GroupBy(['name']).apply([]) == []
+
+
+@pytest.mark.parametrize('group_by', [lambda: Aggregation.parse('total:spent'),
+                                      lambda: GroupBy(['missing']).apply(ROWS),
+                                      lambda: GroupBy(aggregations=[Aggregation.parse('sum:missing')]).apply(ROWS)])
+def test_group_by_invalid(group_by):
+    with pytest.raises(InvalidCommandFlagError):
+        group_by()
+
+
+def test_group_by_flags_parsed_and_applied(command_parser):
+    _, command_args = command_parser.parse_command(
+        '/mgid stats all 7d --where "spent>=1" --group-by target_type --agg sum:spent,sum:conv')
+    assert command_args['time_interval'] == '7d'
+    assert command_args[GROUP_BY_KEY].fields == ['target_type']
+
+    def handler(**kwargs):
+        assert GROUP_BY_KEY not in kwargs
+        return ROWS
+
+    resp, _, _ = MessageHandler()._run_command(handler, command_args, format_output=False)
+    assert sorted(resp.column('sum_spent')) == [2.5, 6]
+
+
+def test_group_by_source_fields_added_to_fields(command_parser):
+    _, command_args = command_parser.parse_command(
+        '/mgid stats all 7d --fields id,Spent --where "cpa>1" --group-by target_type --agg sum:spent')
+    assert command_args['fields'] == ['id', 'Spent', 'cpa', 'target_type', 'name']
@@ -0,0 +1,29 @@
+from services import Thrive, ZeroPark
+from services.common.metadata_store import MetadataStore
+
+
+def test_metadata_store_save_load(tmp_path):
+    store = MetadataStore(str(tmp_path / 'metadata.sqlite3'))
+    assert store.load('zeropark:campaigns') is None
+    store.save('zeropark:campaigns', {'123': {'id': '123', 'name': 'campaign 123'}})
+
+    stored = MetadataStore(store.path).load('zeropark:campaigns')  # as after a restart
+    assert stored.data == {'123': {'id': '123', 'name': 'campaign 123'}}
+    assert 0 <= stored.age < 60
+
+
+def test_disabled_metadata_store():
+    store = MetadataStore('')
+    store.save('zeropark:campaigns', {'123': 'campaign 123'})
+    assert store.load('zeropark:campaigns') is None
+
+
+def test_campaigns_loaded_from_metadata_store(tmp_path, monkeypatch):
+    store = MetadataStore(str(tmp_path / 'metadata.sqlite3'))
+    store.save('zeropark:campaigns', {'123': {'id': '123', 'name': 'campaign 123'}})
+    monkeypatch.setattr('services.common.campaigns_index.metadata_store', store)
+    zeropark = ZeroPark('test-token', Thrive('test-api-key', 'test-install-id'))
+    monkeypatch.setattr(zeropark, 'reload_campaigns', lambda: None)  # no API in the background
+
+    assert zeropark.campaigns['123']['name'] == 'campaign 123'
+    assert zeropark.campaigns.platform == 'ZeroPark'
@@ -0,0 +1,44 @@
+import json
+
+import pytest
+
+from errors import APIError, PydanticParseObjError
+from services import MGid, Thrive
+from services.common.streaming import iter_nested_items
+from services.common.utils import filter_result_by_fields
+from services.mgid.schemas import WidgetStats
+
+WIDGET = {'clicks': 10, 'spent': 5.0, 'buy': None, 'buyCost': 2.5, 'cpc': '0.1', 'qualityFactor': 1,
+          'sources': {'1': {'clicks': 1, 'spent': 1.0, 'cpc': '0.1', 'qualityFactor': 1}}}
+
+
+def test_projection_same_as_filtering_the_model():
+    fields = ['widget_id', 'Spent', 'conversions', 'cpa', 'platform_clicks', 'qualityFactor']
+    record = {**WIDGET, 'widget_id': 'w1'}
+    projection = WidgetStats.projection(fields)
+    assert projection(record) == filter_result_by_fields([WidgetStats.parse_obj(record)], fields)[0]
+
+
+def test_projection_of_nested_field_not_supported():
+    assert WidgetStats.projection(['widget_id', 'sources']) is None
+    assert WidgetStats.projection(['no_such_field']) is None
+
+
+def test_projection_validates():
+    with pytest.raises(PydanticParseObjError):
+        WidgetStats.projection(['spent'])({'spent': 'not a number'})
+
+
+def test_streaming_builds_just_kept_keys():
+    body = json.dumps({'1': {'today': {'w1': WIDGET, 'w2': WIDGET}}}).encode()
+    items = list(iter_nested_items(body, depth=3, keep_keys=['spent', 'buy']))
+    assert items == [(('1', 'today', 'w1'), {'spent': 5.0, 'buy': None}),
+                     (('1', 'today', 'w2'), {'spent': 5.0, 'buy': None})]
+
+
+def test_widgets_stats_not_json_response_raises(fake_api_server):
+    mgid = MGid('1234', 'test-token', Thrive('test-api-key', 'test-install-id'))
+    mgid.base_url = fake_api_server(lambda path: (200, 'text/html', '<html>maintenance</html>'))
+    with pytest.raises(APIError) as error:
+        mgid.widgets_stats(campaign_id='1')
+    assert error.value.data == {'status_code': 200, 'body': '<html>maintenance</html>'}
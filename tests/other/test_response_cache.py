@@ -0,0 +1,52 @@
+from types import SimpleNamespace
+
+from services.common.response_cache import ResponseCache
+from services.mgid import urls as mgid_urls
+
+
+def make_resp(content: dict):
+    return SimpleNamespace(is_json=True, json_content=content)
+
+
+def test_response_cache_ttl_by_endpoint():
+    cache = ResponseCache({mgid_urls.CAMPAIGNS.STATS_DAILY: 60})
+    assert cache.ttl_for('/goodhits/clients/123/campaigns-stat?dateInterval=today') == 60
+    assert cache.ttl_for('/goodhits/clients/123/campaigns') is None
+
+
+def test_response_cache_returns_copies():
+    cache = ResponseCache({mgid_urls.CAMPAIGNS.LIST: 60})
+    resp = make_resp({'campaigns': [1]})
+    cache.set('key', '/goodhits/clients/123/campaigns', resp, ttl=60)
+    resp.json_content['campaigns'].append(2)
+    cached_resp = cache.get('key')
+    assert cached_resp.json_content == {'campaigns': [1]}
+    cached_resp.json_content['campaigns'].append(3)
+    assert cache.get('key').json_content == {'campaigns': [1]}
+
+
+def test_response_cache_expired_and_bounded():
+    cache = ResponseCache({mgid_urls.CAMPAIGNS.LIST: 60}, max_entries=2)
+    cache.set('expired', '/url', make_resp({}), ttl=0)
+    assert cache.get('expired') is None
+    for key in ('a', 'b', 'c'):
+        cache.set(key, '/url', make_resp({}), ttl=60)
+    assert cache.get('a') is None
+    assert cache.get('c') is not None
+
+
+def test_response_cache_write_invalidates_campaign_and_aggregates():
+    cache = ResponseCache({mgid_urls.WIDGETS.LIST: 60,
+                           mgid_urls.CAMPAIGNS.LIST: 60,
+                           mgid_urls.CAMPAIGNS.STATS_DAILY: 60})
+    cache.set('campaign-12', '/goodhits/campaigns/12/quality-analysis', make_resp({}), ttl=60)
+    cache.set('campaign-123', '/goodhits/campaigns/123/quality-analysis', make_resp({}), ttl=60)
+    cache.set('campaign-12-query', '/campaigns/getWithMetrics?camps=12', make_resp({}), ttl=60)
+    cache.set('list', '/goodhits/clients/1/campaigns?token=token', make_resp({}), ttl=60)
+    cache.set('all-stats', '/goodhits/clients/1/campaigns-stat?dateInterval=today', make_resp({}), ttl=60)
+    cache.invalidate_by_write('/goodhits/clients/1/campaigns/12?token=token')
+    assert cache.get('campaign-12') is None
+    assert cache.get('campaign-12-query') is None
+    assert cache.get('list') is None
+    assert cache.get('all-stats') is None
+    assert cache.get('campaign-123') is not None
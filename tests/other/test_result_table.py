@@ -0,0 +1,37 @@
+import csv
+from array import array
+
+from bot.controllers.utils import convert_resp_to_raw_string
+from utils import ResultTable, convert_list_dicts_to_csv_file
+
+ROWS = [{'Widget_Id': 'w1', 'spent': 5.0, 'conversions': 2, 'cpa': 2.5},
+        {'Widget_Id': 'w2', 'spent': 1.0, 'conversions': 0, 'cpa': 0.0},
+        {'Widget_Id': 'w3', 'spent': 9.0, 'conversions': 1, 'cpa': 9.0}]
+
+
+def test_result_table_from_rows():
+    table = ResultTable.from_rows(ROWS, fields=['widget_id', 'spent', 'missing'])
+    assert table.fields == ['widget_id', 'spent']
+    assert len(table) == 3
+    assert isinstance(table.column('spent'), array)
+    assert list(table) == [{'widget_id': 'w1', 'spent': 5.0},
+                           {'widget_id': 'w2', 'spent': 1.0},
+                           {'widget_id': 'w3', 'spent': 9.0}]
+
+
+def test_result_table_sort_where_select():
+    table = ResultTable.from_rows(ROWS, fields=['widget_id', 'spent', 'conversions', 'cpa'])
+    assert list(table.sort('spent', reverse=True, limit=2).column('widget_id')) == ['w3', 'w1']
+    filtered = table.where('conversions', 'gt', 0).where('cpa', 'le', 5.0)
+    assert filtered.select(['Widget_Id', 'CPA']).to_dicts() == [{'widget_id': 'w1', 'cpa': 2.5}]
+
+
+def test_result_table_renderers():
+    rows = [{'name': 'first', 'id': 1, 'spent': 1.5, 'cpa': None},
+            {'name': '', 'id': 2, 'spent': 2.0, 'cpa': 1}]
+    table = ResultTable.from_rows(rows)
+    assert convert_resp_to_raw_string(table) == convert_resp_to_raw_string(rows)
+    with open(convert_list_dicts_to_csv_file(table), encoding='utf8', newline='') as csv_file:
+        assert list(csv.DictReader(csv_file)) == [{'name': 'first', 'id': '1', 'spent': '1.5', 'cpa': ''},
+                                                  {'name': '', 'id': '2', 'spent': '2.0', 'cpa': '1'}]
+    assert table.to_json().startswith('[{"name": "first"')
@@ -0,0 +1,30 @@
+from datetime import date, timedelta
+
+from services.common.stats_cache import DailyStatsCache, split_to_month_buckets
+
+
+def test_split_to_month_buckets():
+    buckets = split_to_month_buckets(date(2021, 1, 20), date(2021, 3, 5))
+    assert buckets == [(date(2021, 1, 20), date(2021, 1, 31)),
+                       (date(2021, 2, 1), date(2021, 2, 28)),
+                       (date(2021, 3, 1), date(2021, 3, 5))]
+
+
+def test_stats_cache_refetches_only_open_days():
+    fetched_ranges = []
+
+    def fetch_range(start: date, end: date) -> int:
+        fetched_ranges.append((start, end))
+        return (end - start).days + 1  # "stats" of a range: number of days
+
+    cache = DailyStatsCache(open_days=2)
+    today = date.today()
+    from_date = today - timedelta(days=99)
+    result = cache.fetch('stats', from_date, today, fetch_range, combine=lambda older, newer: older + newer)
+    assert result == 100
+    assert fetched_ranges[-1] == (today - timedelta(days=1), today)
+
+    fetched_ranges.clear()
+    result = cache.fetch('stats', from_date, today, fetch_range, combine=lambda older, newer: older + newer)
+    assert result == 100
+    assert fetched_ranges == [(today - timedelta(days=1), today)]
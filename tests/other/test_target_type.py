@@ -0,0 +1,16 @@
+from services.common.common_service import get_target_type_by_name
+
+
+def test_target_type_by_name():
+    assert get_target_type_by_name('123 Campaign MOB') == 'MOBILE'
+    assert get_target_type_by_name('123 Campaign mobile') == 'MOBILE'
+    assert get_target_type_by_name('123 Campaign Desktop') == 'DESKTOP'
+    assert get_target_type_by_name('123 Campaign desk-mob') == 'BOTH'
+    assert get_target_type_by_name('123 Campaign Mobiles') == 'BOTH'
+
+
+def test_target_type_memoized():
+    get_target_type_by_name.cache_clear()
+    for _ in range(3):
+        get_target_type_by_name('124 Campaign DESK')
+    assert get_target_type_by_name.cache_info().hits == 2
@@ -0,0 +1,87 @@
+import random
+import warnings
+from array import array
+
+import pytest
+
+from services import Thrive, ZeroPark
+from services.zeropark.schemas import TargetStatsMergedData
+from utils import ResultTable, both, bot_traffic_percents, compare, select
+from utils import vectorized
+from utils.helpers import OPERATORS_MAP
+
+
+# ZeroPark's widgets (targets) - an 'ecpa' may be missing (None) in the API's response
+ZEROPARK_TARGETS = [{'id': f't{i}', 'target': f'target{i}', 'source': 's', 'sourceId': '1', 'trafficSourceType': 'POP',
+                     'stats': {'spent': float(i), 'payout': 0, 'redirects': 10, 'conversions': i % 3,
+                               'ecpa': None if i % 4 == 0 else float(i % 7)},
+                     'state': {'state': 'ACTIVE', 'actions': []}, 'bidPosition': {}}
+                    for i in range(40)]
+
+
+@pytest.fixture(params=['vectorized', 'per-value'])
+def widgets(request, monkeypatch):
+    if request.param == 'per-value':
+        monkeypatch.setattr(vectorized, 'np', None)
+    random.seed(1)
+    rows = []
+    for i in range(2000):
+        platform_clicks = random.randint(1, 100)
+        rows.append({'widget_id': f'w{i}',
+                     'spent': random.uniform(0, 10),
+                     'conversions': random.randint(0, 3),
+                     'platform_clicks': platform_clicks,
+                     'thrive_clicks': random.randint(1, platform_clicks)})
+    return rows
+
+
+def test_compare_same_as_loop(widgets):
+    table = ResultTable.from_rows(widgets)
+    assert select(table.column('widget_id'), compare(table.column('spent'), 'lt', 2.5)) \
+        == [widget['widget_id'] for widget in widgets if widget['spent'] < 2.5]
+    assert list(table.where('conversions', 'ge', 2).column('widget_id')) \
+        == [widget['widget_id'] for widget in widgets if widget['conversions'] >= 2]
+
+
+def test_bot_traffic_same_as_loop(widgets):
+    table = ResultTable.from_rows(widgets)
+    bots_percents = bot_traffic_percents(table.column('thrive_clicks'), table.column('platform_clicks'))
+    with_conversions = compare(table.column('conversions'), 'gt', 0)
+    assert select(table.column('widget_id'), both(compare(bots_percents, 'gt', 30), with_conversions)) \
+        == [widget['widget_id'] for widget in widgets
+            if 100 - (widget['thrive_clicks'] / widget['platform_clicks'] * 100) > 30 and widget['conversions'] > 0]
+
+
+@pytest.mark.parametrize('size', [3, 1000])  # per-value, vectorized
+def test_bot_traffic_no_platform_clicks(size):
+    tracker_clicks = array('q', [5, 0, 5] * size)
+    platform_clicks = array('q', [10, 0, 0] * size)
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        assert list(bot_traffic_percents(tracker_clicks, platform_clicks)) == [50, 0, 0] * size
+
+
+def test_compare_none_never_matches():
+    assert compare([1.0, None, 3.0], 'gt', 0) == [True, False, True]
+
+
+@pytest.mark.parametrize('operator', ['le', 'ge'])
+def test_cpa_filter_same_as_loop_with_none_cpa(operator):
+    # the per-row loop the columnar filter replaced - on the widgets as parsed from the API (None ecpa -> 0)
+    widgets = [TargetStatsMergedData(**target, **target['stats']) for target in ZEROPARK_TARGETS * 25]
+    expected = [widget.id for widget in widgets
+                if widget.conversions > 0 and getattr(widget.ecpa, OPERATORS_MAP[operator])(3.0)]
+    table = ResultTable.from_rows(widgets)
+    assert select(table.column('id'), both(compare(table.column('conversions'), 'gt', 0),
+                                           compare(table.column('ecpa'), operator, 3.0))) == expected
+
+
+def test_zeropark_widgets_filter_cpa(fake_api_server):
+    zeropark = ZeroPark('test-token', Thrive('test-api-key', 'test-install-id'))
+    zeropark.base_url = fake_api_server(lambda path: {'page': 0, 'total': len(ZEROPARK_TARGETS),
+                                                      'elements': ZEROPARK_TARGETS})
+    high_cpa = zeropark.widgets_high_cpa(campaign_id='1', threshold=4, time_interval='7d')
+    assert sorted(high_cpa.column('target')) == sorted(
+        target['target'] for target in ZEROPARK_TARGETS
+        if target['stats']['conversions'] > 0 and (target['stats']['ecpa'] or 0) >= 4)
+    assert len(zeropark.widgets_low_cpa(campaign_id='1', threshold=4, time_interval='7d')) > 0
@@ -0,0 +1,57 @@
+import pytest
+
+from bot.controllers.command import WHERE_KEY
+from bot.controllers.message import MessageHandler
+from errors import InvalidCommandFlagError
+from utils import ResultTable, RowFilter
+
+ROWS = [{'id': str(i), 'CPA': float(i % 10), 'spent': i, 'target_type': 'MOB' if i % 2 else 'DESK'}
+        for i in range(1000)]
+
+
+def test_where_filters_rows_and_table_alike():
+    where = RowFilter('cpa>5 and (spent>=100 or not target_type="mob")')
+    expected = [row['id'] for row in ROWS
+                if row['CPA'] > 5 and (row['spent'] >= 100 or row['target_type'] != 'MOB')]
+    assert [row['id'] for row in where.apply(ROWS)] == expected
+    assert list(where.apply(ResultTable.from_rows(ROWS)).column('id')) == expected
+    assert where.apply('not rows') == 'not rows'
+
+
+def test_where_missing_values_never_match():
+    rows = [{'cpa': None}, {'cpa': 'n/a'}, {'cpa': '7'}, {'cpa': 3}]
+    assert RowFilter('cpa != 3').apply(rows) == [{'cpa': '7'}]
+
+
+@pytest.mark.parametrize('expression', ['cpa>', 'cpa>5 and', '(cpa>5', 'cpa 5', '', 'cpa>5; import os'])
+def test_where_invalid_expression(expression):
+    with pytest.raises(InvalidCommandFlagError):
+        RowFilter(expression)
+
+
+def test_where_unknown_field():
+    with pytest.raises(InvalidCommandFlagError):
+        RowFilter('__class__>1').apply(ROWS)
+
+
+def test_where_flag_parsed_and_applied(command_parser):
+    command_handler, command_args = command_parser.parse_command(
+        '/mgid stats all 7d --where "cpa>8 and spent>=990" --fields id,cpa')
+    assert command_args['time_interval'] == '7d'
+    assert command_args['fields'] == ['id', 'cpa', 'spent']  # the filtered-by fields are returned too
+    assert command_args[WHERE_KEY].expression == 'cpa>8 and spent>=990'
+
+    def handler(**kwargs):
+        assert WHERE_KEY not in kwargs
+        return ROWS
+
+    resp, _, _ = MessageHandler()._run_command(handler, command_args, format_output=False)
+    assert [row['id'] for row in resp] == ['999']
+
+
+@pytest.mark.parametrize('command', ['/mgid widgets-kill-longtail 123 5 --where "spent>1"',
+                                     '/mgid kill-bot 123 50 7d --group-by name',
+                                     '/zeropark widgets-turn-on-all 123 --agg sum:spent'])
+def test_where_rejected_for_write_commands(command_parser, command):
+    with pytest.raises(InvalidCommandFlagError):
+        command_parser.parse_command(command)